@@ -12,5 +12,19 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Project_tracker.settings')
+# Serve the async versions of the JSON task and sprint endpoints.
+os.environ.setdefault('TRACKER_ASYNC_VIEWS', '1')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after setup, since it loads the tracker models.
+from tracker.realtime import websocket_application  # noqa: E402
+
+
+async def application(scope, receive, send):
+    # Board sockets (/ws/projects/<id>/, /ws/sprints/<id>/) are served by
+    # tracker.realtime; everything else is a normal Django request.
+    if scope['type'] == 'websocket':
+        await websocket_application(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 from pathlib import Path
 import os
 
+import django
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -43,7 +45,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'tracker.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'tracker.routers.PrimaryPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -76,12 +80,82 @@ WSGI_APPLICATION = 'Project_tracker.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# The profile is chosen with TRACKER_DB_ENGINE: "sqlite3" (default) or a
+# server backend such as "postgresql" or "mysql", configured through the
+# TRACKER_DB_* variables below.
+
+DB_ENGINE = os.environ.get('TRACKER_DB_ENGINE', 'sqlite3')
+
+# Persistent connections: reuse a connection for this many seconds instead of
+# opening one per request, and check it is still usable before reusing it.
+DB_CONN_MAX_AGE = int(os.environ.get('TRACKER_DB_CONN_MAX_AGE', '60'))
+
+if DB_ENGINE == 'sqlite3':
+    DATABASES = {
+        'default': {
+            # Stock SQLite backend with write transactions opened as BEGIN IMMEDIATE.
+            'ENGINE': 'tracker.backends.sqlite3',
+            'NAME': os.environ.get('TRACKER_DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            # How long to wait on a locked database is the busy_timeout pragma
+            # in tracker.db (TRACKER_SQLITE_PRAGMAS), set on every connection.
+            'OPTIONS': {},
+        }
     }
-}
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': f'django.db.backends.{DB_ENGINE}',
+            'NAME': os.environ.get('TRACKER_DB_NAME', 'project_tracker'),
+            'USER': os.environ.get('TRACKER_DB_USER', ''),
+            'PASSWORD': os.environ.get('TRACKER_DB_PASSWORD', ''),
+            'HOST': os.environ.get('TRACKER_DB_HOST', ''),
+            'PORT': os.environ.get('TRACKER_DB_PORT', ''),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+
+# Connection pooling, with TRACKER_DB_POOL=1. PostgreSQL on Django 5.1+ uses
+# psycopg 3's driver-side pool. Everywhere else, the pinned Django 4.2
+# included, the stand-in keeps one connection per worker thread open for the
+# life of the worker (CONN_MAX_AGE=None), health-checked before each reuse:
+# a pool as large as the server's thread count. Put PgBouncer in front for a
+# pool shared between processes.
+if os.environ.get('TRACKER_DB_POOL') == '1':
+    if DB_ENGINE == 'postgresql' and django.VERSION >= (5, 1):
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('TRACKER_DB_POOL_MIN', '2')),
+            'max_size': int(os.environ.get('TRACKER_DB_POOL_MAX', '20')),
+        }
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+    else:
+        DATABASES['default']['CONN_MAX_AGE'] = None
+
+# Read replicas: a comma-separated list of SQLite files (or, for server
+# backends, hosts) in TRACKER_DB_REPLICAS. Each becomes a "replicaN" alias
+# that read-only views read from; see tracker.routers. Copying db.sqlite3 to
+# a second file is enough to try this locally.
+TRACKER_DB_REPLICAS = []
+for index, replica in enumerate(filter(None, os.environ.get('TRACKER_DB_REPLICAS', '').split(',')), start=1):
+    alias = f'replica{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        **({'NAME': replica} if DB_ENGINE == 'sqlite3' else {'HOST': replica}),
+        'TEST': {'MIRROR': 'default'},
+    }
+    TRACKER_DB_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['tracker.routers.ReplicaRouter']
+
+# Seconds a client keeps reading from the primary after it writes.
+TRACKER_PRIMARY_PIN_SECONDS = int(os.environ.get('TRACKER_PRIMARY_PIN_SECONDS', '5'))
+
+# New SQLite connections get busy_timeout, WAL, synchronous=NORMAL and
+# mmap_size from tracker.db.DEFAULT_SQLITE_PRAGMAS; set TRACKER_SQLITE_PRAGMAS
+# to a dict to override them.
 
 
 # Password validation
@@ -120,6 +194,29 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+# Uploaded files (task screenshots and their generated variants)
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Threads generating screenshot thumbnails and WebP copies (tracker.media).
+TRACKER_MEDIA_WORKERS = int(os.environ.get('TRACKER_MEDIA_WORKERS', '2'))
+
+# Serve the async versions of the JSON task and sprint endpoints
+# (tracker.async_views). Project_tracker/asgi.py turns this on; WSGI servers
+# keep the sync views.
+TRACKER_ASYNC_VIEWS = os.environ.get('TRACKER_ASYNC_VIEWS', '0') == '1'
+
+# Pub/sub used to push task events to sprint board websockets (served by the
+# ASGI application). The in-process broker only reaches sockets connected to
+# the same server process.
+TRACKER_REALTIME_BROKER = os.environ.get('TRACKER_REALTIME_BROKER', 'tracker.realtime.InProcessBroker')
+
+# Per-view request metrics (tracker.instrumentation): wall time, query count,
+# SQL time, duplicate queries and response size, sent as a Server-Timing
+# header and served to staff and INTERNAL_IPS at /tracker/metrics/ in the
+# Prometheus text format. Off unless TRACKER_INSTRUMENTATION=1.
+TRACKER_INSTRUMENTATION = os.environ.get('TRACKER_INSTRUMENTATION', '0') == '1'
+
 # Only needed if you want to use custom static directories
 STATICFILES_DIRS = [
     BASE_DIR / "static",  # Add your project's static directory
@@ -1,10 +1,15 @@
 # project_tracker/urls.py
 
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include  # Import 'include'
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('tracker/', include('tracker.urls')),  # Include URLs from the tracker app
+    # Include URLs from the tracker app; under ASGI, with async JSON endpoints.
+    path('tracker/', include('tracker.async_urls' if settings.TRACKER_ASYNC_VIEWS else 'tracker.urls')),
 ]
 
+# Serve uploaded screenshots and their variants in development.
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
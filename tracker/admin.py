@@ -3,8 +3,10 @@ from django.contrib import admin
 from .models import Project, Account
 from django.contrib.auth.models import User
 from django.contrib.admin import SimpleListFilter
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import ValidationError
+from django.db.models import Prefetch
 from django.utils.html import format_html
-import random
 
 from django.urls import path
 from django.shortcuts import render, redirect
@@ -12,11 +14,39 @@ from django.contrib import messages
 from django.http import HttpResponseRedirect
 from django.urls import reverse
 from .models import Sprint, Task
+from .badges import render_participant_badges
+from .directory import get_participant_directory, stamp_version
+from .routers import replica_reads
+from .services import create_sprint_with_tasks
+from .versions import plan_sprint_condition
 
+SPRINT_CARD_FIELDS = ('project', 'name', 'start_date', 'end_date', 'version', 'updated_at', 'task_count', 'completed_count')
 
 
 
-class AccountAdmin(admin.ModelAdmin):
+
+class ReplicaChangelistMixin:
+    """Serve changelist pages (GET only) from a read replica."""
+
+    def changelist_view(self, request, extra_context=None):
+        if request.method != 'GET':
+            return super().changelist_view(request, extra_context)
+        with replica_reads():
+            response = super().changelist_view(request, extra_context)
+            # Rows are fetched while the template renders, so render here.
+            if hasattr(response, 'render'):
+                response.render()
+        return response
+
+
+class ListProfileChangeList(ChangeList):
+    """Changelist that loads rows with the model's "list" field profile."""
+
+    def get_queryset(self, request, *args, **kwargs):
+        return super().get_queryset(request, *args, **kwargs).for_list()
+
+
+class AccountAdmin(ReplicaChangelistMixin, admin.ModelAdmin):
     list_display = ('name', 'owner', 'description')
     search_fields = ('name', 'description')
     list_filter = ('owner',)
@@ -44,10 +74,11 @@ class AccountOwnerFilter(SimpleListFilter):
         return queryset
 
 
-class ProjectAdmin(admin.ModelAdmin):
-    list_display = ('name', 'account', 'owner', 'participants_initials', 'add_sprint_button')
+class ProjectAdmin(ReplicaChangelistMixin, admin.ModelAdmin):
+    list_display = ('name', 'account', 'owner', 'participants_initials', 'task_progress', 'add_sprint_button')
     search_fields = ('name', 'description')
     list_filter = (AccountOwnerFilter,)
+    list_select_related = ('account', 'owner')
     fields = ('name', 'description', 'account', 'owner', 'participants')
 
     class Media:
@@ -59,7 +90,7 @@ class ProjectAdmin(admin.ModelAdmin):
     def get_list_display(self, request):
         if request.user.is_superuser:
             # Exclude 'add_sprint_button' for superadmins
-            return ('name', 'account', 'owner', 'participants_initials')
+            return ('name', 'account', 'owner', 'participants_initials', 'task_progress')
         return self.list_display
 
     def get_form(self, request, obj=None, **kwargs):
@@ -79,25 +110,21 @@ class ProjectAdmin(admin.ModelAdmin):
         obj.save()
 
     def participants_initials(self, obj):
-        initials_list = []
-        participants = obj.participants.all()
-        if obj.owner and obj.owner not in participants:
-            participants = [obj.owner] + list(participants)
-        color_list = ['#FF5733', '#33FF57', '#3357FF', '#FF33A1', '#A133FF', '#33FFF6', '#FFC300', '#FF6F61']
-        for user in participants:
-            name_parts = user.get_full_name().split()
-            initials = ''.join([part[0].upper() for part in name_parts if part]) or user.username[0].upper()
-            random_color = random.choice(color_list)
-            user_type = 'Owner' if user == obj.owner else 'Participant'
-            tooltip = f'{user.get_full_name()} ({user_type})'
-            initials_list.append(f'<span style="display:inline-block; border-radius:50%; background:{random_color}; '
-                                 f'color:#fff; text-align:center; width:25px; height:25px; '
-                                 f'line-height:25px; margin:2px; cursor:pointer; transition: transform 0.2s, border 0.2s;" '
-                                 f'title="{tooltip}" class="participant-circle">{initials}</span>')
-        return format_html(' '.join(initials_list))
+        # Participants come from the changelist prefetch.
+        return render_participant_badges(obj.participants.all(), obj.owner)
 
     participants_initials.short_description = "Participants"
 
+    def task_progress(self, obj):
+        # Read from the denormalized counters, so no per-row aggregate query.
+        return format_html(
+            '<div class="task-progress" title="{} of {} tasks completed">'
+            '<div class="task-progress-bar" style="width:{}%"></div></div>',
+            obj.completed_count, obj.task_count, obj.progress,
+        )
+
+    task_progress.short_description = "Progress"
+
     def has_change_permission(self, request, obj=None):
         if obj and obj.owner != request.user:
             return False
@@ -128,8 +155,14 @@ class ProjectAdmin(admin.ModelAdmin):
         return super().change_view(request, object_id, form_url, extra_context)
 
 
+    def get_changelist(self, request, **kwargs):
+        # Only the changelist skips descriptions; the change form needs them.
+        return ListProfileChangeList
+
     def get_queryset(self, request):
-        queryset = super().get_queryset(request)
+        # Participants are rendered on every changelist row, so load them in one
+        # extra query for the whole page instead of one query per project.
+        queryset = super().get_queryset(request).select_related('account', 'owner').prefetch_related('participants')
         if request.user.is_superuser:
             return queryset
         return queryset.filter(owner=request.user)
@@ -148,7 +181,7 @@ class ProjectAdmin(admin.ModelAdmin):
         """
         urls = super().get_urls()
         custom_urls = [
-            path('plan_sprint/<int:project_id>/', self.admin_site.admin_view(self.plan_sprint), name='plan_sprint'),
+            path('plan_sprint/<int:project_id>/', self.admin_site.admin_view(plan_sprint_condition(self.plan_sprint)), name='plan_sprint'),
         ]
         return custom_urls + urls
 
@@ -156,10 +189,17 @@ class ProjectAdmin(admin.ModelAdmin):
         """
         Render the custom view for planning a sprint for a project.
         """
-        project = Project.objects.get(pk=project_id)
+        # The sprint cards only need these columns; the task counts are
+        # denormalized onto the sprint, so one query loads every card.
+        project = Project.objects.for_list().prefetch_related(
+            Prefetch('sprints', queryset=Sprint.objects.only(*SPRINT_CARD_FIELDS)),
+        ).get(pk=project_id)
         
         # Pass project context to the template for consistent navigation
-        extra_context = {'project': project}
+        extra_context = {
+            'project': project,
+            'participant_directory': get_participant_directory(project.pk, stamp_version(project.version, project.updated_at)),
+        }
         
         if request.method == "POST":
             # Handle form submission and create the sprint with tasks
@@ -168,20 +208,18 @@ class ProjectAdmin(admin.ModelAdmin):
             end_date = request.POST.get("end_date")
             tasks = request.POST.getlist("tasks")  # List of task titles
 
-            # Create the Sprint
-            sprint = Sprint.objects.create(
-                project=project,
-                name=sprint_name,
-                start_date=start_date,
-                end_date=end_date
-            )
-
-            # Create tasks
-            for task_title in tasks:
-                Task.objects.create(
-                    sprint=sprint,
-                    title=task_title
+            # Create the Sprint and its tasks in one transaction
+            try:
+                create_sprint_with_tasks(
+                    project,
+                    sprint_name,
+                    start_date,
+                    end_date,
+                    [{'title': task_title} for task_title in tasks if task_title.strip()],
                 )
+            except ValidationError as e:
+                messages.error(request, e.messages[0])
+                return render(request, 'admin/plan_sprint.html', {'project': project, **extra_context})
 
             messages.success(request, "Sprint created successfully!")
             return HttpResponseRedirect(reverse('admin:tracker_project_change', args=[project.id]))
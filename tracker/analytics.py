@@ -0,0 +1,155 @@
+"""
+Sprint burndown and velocity from the daily SprintSnapshot and
+AssigneeSnapshot rows that take_snapshots() appends (run by the
+snapshot_sprints command). Each report reads the snapshot rows it needs in
+one query per table and aggregates them with NumPy, so its cost follows the
+number of snapshots rather than the tasks' history.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .counters import COUNTER_FIELDS, status_filters
+from .models import AssigneeSnapshot, Sprint, SprintSnapshot, Task
+
+BATCH_SIZE = 2000
+DEFAULT_WINDOW = 3
+
+
+def take_snapshots(day):
+    """
+    Record the task counts of every sprint running on ``day`` (start and end
+    dates included), per sprint and per assignee. Snapshots already taken
+    that day are replaced, so a rerun keeps the latest counts. Returns the
+    number of sprints recorded.
+    """
+    running = Sprint.objects.filter(start_date__lte=day, end_date__gte=day)
+    per_assignee = (
+        Task.assigned_to.through.objects.filter(task__sprint__in=running)
+        .values('task__sprint_id', 'user_id')
+        .annotate(**{field: Count('pk', filter=condition) for field, condition in status_filters('task__').items()})
+        .order_by()
+    )
+    with transaction.atomic():
+        SprintSnapshot.objects.filter(date=day).delete()
+        # Sprints carry their own counters (tracker.counters); only the
+        # per-assignee counts need the tasks.
+        created = SprintSnapshot.objects.bulk_create(
+            [SprintSnapshot(sprint_id=row.pop('pk'), date=day, **row) for row in running.values('pk', *COUNTER_FIELDS)],
+            batch_size=BATCH_SIZE,
+        )
+        snapshot_ids = {snapshot.sprint_id: snapshot.pk for snapshot in created}
+        AssigneeSnapshot.objects.bulk_create(
+            [AssigneeSnapshot(snapshot_id=snapshot_ids[row.pop('task__sprint_id')], **row) for row in per_assignee],
+            batch_size=BATCH_SIZE,
+        )
+    return len(created)
+
+
+def _to_list(values):
+    """A float array as JSON-ready numbers, None where it is NaN."""
+    return [None if value != value else (int(value) if value.is_integer() else round(value, 2)) for value in values.tolist()]
+
+
+def rolling_mean(values, window):
+    """Mean of each value and the ``window - 1`` before it (fewer at the start), along the last axis."""
+    sums = np.cumsum(values, axis=-1, dtype=float)
+    before = np.zeros_like(sums)
+    before[..., window:] = sums[..., :-window]
+    return (sums - before) / np.minimum(np.arange(1, values.shape[-1] + 1), window)
+
+
+def burndown(sprint):
+    """
+    The day-by-day burndown of ``sprint`` from its start to its end date:
+    ``scope`` (all tasks), ``completed`` and ``remaining`` per day, and the
+    ``ideal`` line from the first snapshot's scope down to zero on the end
+    date. A day the snapshot job missed repeats the day before; days before
+    the first snapshot or after the last one are None.
+    """
+    length = max((sprint.end_date - sprint.start_date).days + 1, 0)
+    report = {'dates': [sprint.start_date + timedelta(days=n) for n in range(length)]}
+    rows = list(
+        SprintSnapshot.objects.filter(sprint=sprint, date__range=(sprint.start_date, sprint.end_date))
+        .order_by('date').values_list('date', 'task_count', 'completed_count')
+    )
+    if not rows:
+        return {**report, **dict.fromkeys(('scope', 'completed', 'remaining', 'ideal'), [None] * length)}
+
+    dates, scope, completed = zip(*rows)
+    days = (np.array(dates, dtype='datetime64[D]') - np.datetime64(sprint.start_date, 'D')).astype(int)
+    # For each day, the index of the latest snapshot on or before it.
+    latest = np.full(length, -1)
+    latest[days] = np.arange(len(days))
+    latest = np.maximum.accumulate(latest)
+    latest[days[-1] + 1:] = -1
+    observed = latest >= 0
+    scope = np.where(observed, np.array(scope, dtype=float)[latest], np.nan)
+    completed = np.where(observed, np.array(completed, dtype=float)[latest], np.nan)
+    ideal = np.full(length, np.nan)
+    ideal[days[0]:] = np.linspace(scope[days[0]], 0, length - days[0])
+    return {
+        **report,
+        'scope': _to_list(scope),
+        'completed': _to_list(completed),
+        'remaining': _to_list(scope - completed),
+        'ideal': _to_list(ideal),
+    }
+
+
+def velocity(project_id, window=DEFAULT_WINDOW, today=None):
+    """
+    Tasks completed in each finished sprint of a project (ended before
+    ``today``), oldest first, with their rolling mean over ``window``
+    sprints, for the whole team and per assignee. A sprint counts what its
+    last snapshot up to its end date showed as completed; sprints without
+    snapshots are left out.
+    """
+    today = today or timezone.localdate()
+    finished = Sprint.objects.filter(project_id=project_id, end_date__lt=today)
+    rows = list(
+        SprintSnapshot.objects.filter(sprint__in=finished, date__lte=F('sprint__end_date'))
+        .order_by('sprint__end_date', 'sprint_id', 'date')
+        .values_list('pk', 'sprint_id', 'completed_count')
+    )
+    report = {'window': window, 'sprints': [], 'completed': [], 'rolling': [], 'assignees': []}
+    if not rows:
+        return report
+
+    snapshot_ids, sprint_ids, completed = np.array(rows, dtype=np.int64).T
+    # Rows come in sprint order, oldest snapshot first: a sprint's final
+    # snapshot is the last row of its run.
+    final = np.flatnonzero(np.append(sprint_ids[1:] != sprint_ids[:-1], True))
+    snapshot_ids, sprint_ids, done = snapshot_ids[final], sprint_ids[final], completed[final].astype(float)
+    sprints = {pk: (name, end_date) for pk, name, end_date in finished.values_list('pk', 'name', 'end_date')}
+    report.update(
+        sprints=[{'id': pk, 'name': sprints[pk][0], 'end_date': sprints[pk][1]} for pk in sprint_ids.tolist()],
+        completed=_to_list(done),
+        rolling=_to_list(rolling_mean(done, window)),
+    )
+
+    assignee_rows = list(
+        AssigneeSnapshot.objects.filter(snapshot_id__in=snapshot_ids.tolist())
+        .values_list('snapshot_id', 'user_id', 'completed_count')
+    )
+    if not assignee_rows:
+        return report
+    row_snapshots, row_users, row_done = np.array(assignee_rows, dtype=np.int64).T
+    # Assignee x sprint matrix of completed counts; 0 where an assignee had
+    # no tasks in a sprint.
+    order = np.argsort(snapshot_ids)
+    columns = order[np.searchsorted(snapshot_ids, row_snapshots, sorter=order)]
+    users, user_rows = np.unique(row_users, return_inverse=True)
+    per_user = np.zeros((len(users), len(snapshot_ids)))
+    np.add.at(per_user, (user_rows, columns), row_done)
+    rolling = rolling_mean(per_user, window)
+    usernames = dict(User.objects.filter(pk__in=users.tolist()).values_list('pk', 'username'))
+    report['assignees'] = [
+        {'id': pk, 'username': usernames.get(pk), 'completed': _to_list(per_user[n]), 'rolling': _to_list(rolling[n])}
+        for n, pk in enumerate(users.tolist())
+    ]
+    return report
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class TrackerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tracker'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .db import configure_connection
+        from .instrumentation import install
+
+        connection_created.connect(configure_connection, dispatch_uid='tracker_configure_connection')
+        connection_created.connect(install, dispatch_uid='tracker_instrument_connection')
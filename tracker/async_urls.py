@@ -0,0 +1,18 @@
+from django.urls import path
+
+from . import async_views
+from .urls import urlpatterns as sync_urlpatterns
+
+# URL name: async view replacing the sync one of the same name.
+ASYNC_VIEWS = {
+    'save_sprint': async_views.save_sprint,
+    'check_sprint_exists': async_views.check_sprint_exists,
+    'update_task': async_views.update_task,
+    'add_task': async_views.add_task,
+    'save_task': async_views.save_task,
+}
+
+urlpatterns = [
+    path(str(pattern.pattern), ASYNC_VIEWS[pattern.name], name=pattern.name) if pattern.name in ASYNC_VIEWS else pattern
+    for pattern in sync_urlpatterns
+]
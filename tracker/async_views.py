@@ -0,0 +1,133 @@
+"""
+Async versions of the JSON task and sprint endpoints, using the async ORM.
+Under the ASGI entry point (TRACKER_ASYNC_VIEWS) tracker.async_urls serves
+them in place of the views in tracker.views, so a request waiting on the
+database does not hold a worker thread. Request and response formats match
+the sync views.
+"""
+import json
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.http import HttpResponseNotAllowed, JsonResponse
+
+from .models import Sprint, Task
+from .routers import read_only_view
+from .services import aresolve_users, clean_date
+
+
+@read_only_view
+async def check_sprint_exists(request, project_id):
+    sprint_name = request.GET.get('sprint_name')
+    if sprint_name:
+        exists = await Sprint.objects.filter(project_id=project_id, name=sprint_name).aexists()
+        return JsonResponse({'exists': exists})
+    return JsonResponse({'exists': False})
+
+
+# Django's method and CSRF decorators wrap views synchronously before 5.0, so
+# the async views check the method themselves; CsrfViewMiddleware already
+# protects save_sprint.
+async def save_sprint(request, project_id):
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+    try:
+        data = json.loads(request.body)
+        sprint_name = data.get('sprint_name', '').strip()
+
+        if await Sprint.objects.filter(project_id=project_id, name=sprint_name).aexists():
+            return JsonResponse({'success': False, 'error': "The sprint with the sprint name already exists for this project. Try editing the same or create the sprint with a different name."}, status=400)
+
+        await Sprint.objects.acreate(
+            project_id=project_id,
+            name=sprint_name,
+            start_date=data.get('start_date'),
+            end_date=data.get('end_date'),
+        )
+        return JsonResponse({'success': True}, status=200)
+
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'error': 'Invalid JSON format in the request body.'}, status=400)
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=500)
+
+
+async def update_task(request, task_id):
+    if request.method != "PUT":
+        return HttpResponseNotAllowed(["PUT"])
+    try:
+        data = json.loads(request.body)
+        task = await Task.objects.aget(pk=task_id)
+        task.title = data.get("title", task.title)
+        await task.asave()
+        return JsonResponse({"message": "Task updated successfully."}, status=200)
+    except Task.DoesNotExist:
+        return JsonResponse({"error": "Task not found."}, status=404)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+async def add_task(request):
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+    try:
+        data = json.loads(request.body)
+        sprint_id = data.get("sprint_id")
+        title = data.get("title")
+        status = data.get("status")
+
+        if not sprint_id or not title:
+            return JsonResponse({"error": "Sprint ID and title are required."}, status=400)
+
+        try:
+            sprint = await Sprint.objects.aget(id=sprint_id)
+        except Sprint.DoesNotExist:
+            return JsonResponse({"error": "Sprint not found."}, status=404)
+
+        try:
+            assigned_to = list((await aresolve_users(data.get("assigned_to") or [])).values())
+        except ValidationError as e:
+            return JsonResponse({"error": e.messages[0]}, status=404)
+
+        status = Task.normalize_status(status) if isinstance(status, str) else None
+        if status is None:
+            return JsonResponse({"error": "Invalid status."}, status=400)
+
+        task = await Task.objects.acreate(
+            title=title, sprint=sprint, due_date=clean_date(data.get("due_date"), "Due date"), status=status,
+        )
+        await task.assigned_to.aset(assigned_to)
+        return JsonResponse({"id": task.id, "message": "Task added successfully."}, status=201)
+
+    except ValidationError as e:
+        return JsonResponse({"error": e.messages[0]}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+async def save_task(request):
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+    try:
+        data = json.loads(request.body)
+        status = data.get("status")
+        status = Task.normalize_status(status) if isinstance(status, str) else None
+        if status is None:
+            return JsonResponse({"success": False, "error": "Invalid status."}, status=400)
+        sprint = await Sprint.objects.aget(id=data.get("sprint_id"))
+        users = [user async for user in User.objects.filter(id__in=data.get("participants"))]
+
+        task = await Task.objects.acreate(
+            sprint=sprint,
+            title=data.get("title"),
+            due_date=data.get("due_date"),
+            status=status,
+        )
+        await task.assigned_to.aset(users)
+        return JsonResponse({"success": True, "message": "Task saved successfully!"})
+    except Exception as e:
+        return JsonResponse({"success": False, "error": str(e)}, status=400)
+
+
+# Same as @csrf_exempt on the sync view.
+save_task.csrf_exempt = True
@@ -0,0 +1,16 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite backend whose transactions start with BEGIN IMMEDIATE.
+
+    A deferred BEGIN takes the write lock only at the first write, and in WAL
+    mode that upgrade fails at once with "database is locked" if another
+    connection committed in between; busy_timeout cannot help. Taking the
+    lock up front makes concurrent writers queue on busy_timeout instead.
+    (Django 5.1 exposes this as the "transaction_mode" option.)
+    """
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
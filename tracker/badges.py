@@ -0,0 +1,45 @@
+import zlib
+
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+BADGE_COLORS = ['#FF5733', '#33FF57', '#3357FF', '#FF33A1', '#A133FF', '#33FFF6', '#FFC300', '#FF6F61']
+
+
+def badge_color(user_id):
+    """Return a colour that stays the same for a user across renders and processes."""
+    return BADGE_COLORS[zlib.crc32(str(user_id).encode()) % len(BADGE_COLORS)]
+
+
+def user_initials(full_name, username=''):
+    """Return the initials of a full name, falling back to the first letter of the username."""
+    initials = ''.join(part[0].upper() for part in full_name.split() if part)
+    return initials or username[:1].upper()
+
+
+def _render_badge(user, role):
+    full_name = user.get_full_name()
+    return format_html(
+        '<span style="display:inline-block; border-radius:50%; background:{}; '
+        'color:#fff; text-align:center; width:25px; height:25px; '
+        'line-height:25px; margin:2px; cursor:pointer; transition: transform 0.2s, border 0.2s;" '
+        'title="{} ({})" class="participant-circle">{}</span>',
+        badge_color(user.pk), full_name, role, user_initials(full_name, user.username),
+    )
+
+
+# Badges are rendered on every request rather than cached: rendering one
+# takes about as long as a cache hit, so a cache only added invalidation.
+def render_user_badge(user, role='Participant'):
+    """Return the badge HTML for a single user."""
+    return _render_badge(user, role)
+
+
+def render_participant_badges(participants, owner=None):
+    """Return the badges for a project's owner and participants."""
+    users = list(participants)
+    if owner and owner not in users:
+        users = [owner] + users
+    return mark_safe(' '.join(
+        str(_render_badge(user, 'Owner' if user == owner else 'Participant')) for user in users
+    ))
@@ -0,0 +1,130 @@
+import posixpath
+import time
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Blob, Task
+from .storage import is_temp_name, name_digest
+
+
+def storage():
+    return Task._meta.get_field('screenshots').storage
+
+
+def retain(name):
+    """Count one more task referencing the stored file ``name``."""
+    if Blob.objects.filter(name=name).update(refcount=F('refcount') + 1):
+        return
+    store = storage()
+    size = store.size(name) if store.exists(name) else 0
+    try:
+        with transaction.atomic():
+            Blob.objects.create(name=name, sha256=name_digest(name), size=size, refcount=1)
+    except IntegrityError:
+        Blob.objects.filter(name=name).update(refcount=F('refcount') + 1)
+
+
+def release(name):
+    """
+    Count one task fewer referencing ``name``. Once the transaction commits,
+    a blob nobody references any more is deleted together with its file.
+    """
+    Blob.objects.filter(name=name).update(refcount=F('refcount') - 1)
+    transaction.on_commit(lambda: reclaim(name))
+
+
+def reclaim(name):
+    # The conditional delete loses cleanly to a concurrent retain().
+    deleted, _ = Blob.objects.filter(name=name, refcount__lte=0).delete()
+    if deleted:
+        storage().delete(name)
+    return bool(deleted)
+
+
+def find_blob(sha256):
+    """A stored blob with this SHA-256 whose file is still on disk, or None."""
+    sha256 = (sha256 or '').lower()
+    if len(sha256) != 64:
+        return None
+    store = storage()
+    for blob in Blob.objects.filter(sha256=sha256, refcount__gt=0):
+        if store.exists(blob.name):
+            return blob
+    return None
+
+
+def attach_existing(task, sha256):
+    """
+    Point ``task`` at an already stored file with this SHA-256 instead of
+    uploading it again. Returns the task, or None if no such file is stored.
+    """
+    blob = find_blob(sha256)
+    if blob is None:
+        return None
+    task.screenshots.name = blob.name
+    task.save(update_fields=['screenshots'])
+    return task
+
+
+def _walk(directory):
+    store = storage()
+    directories, files = store.listdir(directory)
+    for filename in files:
+        yield posixpath.join(directory, filename)
+    for subdirectory in directories:
+        yield from _walk(posixpath.join(directory, subdirectory))
+
+
+def collect_garbage(min_age=3600, dry_run=False):
+    """
+    Bring blob reference counts back in line with the Task table and delete
+    what nothing references: blobs whose count dropped to zero, and
+    content-addressed files with no Blob row and temporary files left by an
+    interrupted save, both once older than ``min_age`` seconds (younger ones
+    may belong to an upload still being saved).
+    Returns the names that were (or, with ``dry_run``, would be) deleted.
+    """
+    upload_to = Task._meta.get_field('screenshots').upload_to
+    with transaction.atomic():
+        # Files attached without going through the signals (e.g. a queryset
+        # update) get a row first, so the recount below covers them too.
+        referenced = set(
+            Task.objects.exclude(screenshots='').exclude(screenshots__isnull=True)
+            .values_list('screenshots', flat=True).distinct()
+        )
+        missing = referenced - set(Blob.objects.filter(name__in=referenced).values_list('name', flat=True))
+        Blob.objects.bulk_create([Blob(name=name, sha256=name_digest(name)) for name in missing], ignore_conflicts=True)
+        Blob.objects.update(refcount=Coalesce(
+            Subquery(
+                Task.objects.filter(screenshots=OuterRef('name'))
+                .values('screenshots')
+                .annotate(total=Count('pk'))
+                .values('total')[:1],
+                output_field=IntegerField(),
+            ),
+            Value(0),
+        ))
+        unreferenced = list(Blob.objects.filter(refcount__lte=0).values_list('name', flat=True))
+        if dry_run:
+            transaction.set_rollback(True)
+
+    removed = []
+    for name in unreferenced:
+        if dry_run or reclaim(name):
+            removed.append(name)
+
+    store = storage()
+    known = set(Blob.objects.values_list('name', flat=True))
+    cutoff = time.time() - min_age
+    if store.exists(upload_to):
+        for name in _walk(upload_to.rstrip('/')):
+            if name in known or not (name_digest(name) or is_temp_name(name)):
+                continue
+            if store.get_modified_time(name).timestamp() > cutoff:
+                continue
+            if not dry_run:
+                store.delete(name)
+            removed.append(name)
+    return removed
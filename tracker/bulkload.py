@@ -0,0 +1,242 @@
+import csv
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import date
+from itertools import chain
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.contrib.auth.models import User
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.db.models import CharField, DateField, DateTimeField, IntegerField, TextField
+from django.db.models.fields import AutoFieldMixin
+
+from .models import Account, Project, Sprint, Task
+
+# (file name, model, accepted columns), in load order: every table only
+# refers to ones listed above it.
+ENTITIES = (
+    ('users', User, ('id', 'username', 'first_name', 'last_name', 'email', 'password', 'is_staff', 'is_active')),
+    ('accounts', Account, ('id', 'name', 'description', 'owner_id')),
+    ('projects', Project, ('id', 'name', 'description', 'account_id', 'owner_id')),
+    ('project_participants', Project.participants.through, ('project_id', 'user_id')),
+    ('sprints', Sprint, ('id', 'project_id', 'name', 'start_date', 'end_date')),
+    ('tasks', Task, ('id', 'sprint_id', 'title', 'description', 'due_date', 'status')),
+    ('task_assignees', Task.assigned_to.through, ('task_id', 'user_id')),
+)
+FORMATS = ('.ndjson', '.jsonl', '.csv')
+# Values for columns a file leaves out, where the model default won't do.
+COLUMN_DEFAULTS = {
+    'users': {'password': UNUSABLE_PASSWORD_PREFIX},  # no login until a password is set
+}
+
+
+class LoadError(Exception):
+    pass
+
+
+def find_file(directory, name):
+    """The ``name`` file in ``directory`` with a supported extension, or None."""
+    for extension in FORMATS:
+        path = os.path.join(directory, name + extension)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def read_rows(path):
+    """Stream the rows of a CSV (with a header line) or NDJSON file as dicts."""
+    if path.endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as f:
+            yield from csv.DictReader(f)
+        return
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise LoadError(f"{path}:{number}: {e}") from e
+
+
+def _converter(field, db):
+    """Turn a file value into what the column stores, checking it on the way."""
+    target = field.target_field if field.is_relation else field
+    if field.choices:
+        allowed = {choice for choice, _ in field.flatchoices}
+
+        def convert(value):
+            if value not in allowed:
+                raise ValueError(f"{value!r} is not one of {', '.join(map(repr, sorted(allowed)))}")
+            return value
+    elif isinstance(target, (CharField, TextField)):
+        convert = str
+    elif isinstance(target, (AutoFieldMixin, IntegerField)):
+        convert = int
+    elif isinstance(target, DateField) and not isinstance(target, DateTimeField):
+        def convert(value):
+            return (value if isinstance(value, date) else date.fromisoformat(value)).isoformat()
+    else:
+        def convert(value):
+            return field.get_db_prep_save(field.to_python(value), db)
+
+    nullable = field.null
+
+    def prepare(value):
+        # CSV has no null: an empty cell in a nullable column means NULL.
+        if value is None or (nullable and value == ''):
+            return None
+        return convert(value)
+    return prepare
+
+
+def _batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def load_rows(model, rows, fields, defaults=None, batch_size=5000, commit_every=200_000, progress=None):
+    """
+    Insert ``rows`` (dicts with the same keys, a subset of ``fields``) into
+    ``model``'s table, ``batch_size`` rows per executemany() of one prepared
+    INSERT, committing every ``commit_every`` rows. Columns missing from the
+    rows get their value in ``defaults`` (by field name), else the model
+    default. No model instances are built and no signals are sent. Calls
+    ``progress(count)`` after each commit and returns the number of rows
+    inserted.
+    """
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        return 0
+    columns = list(first)
+    unknown = set(columns) - set(fields)
+    if unknown:
+        raise LoadError(f"{model._meta.label}: unknown column(s) {', '.join(sorted(unknown))}")
+
+    opts = model._meta
+    given = [opts.get_field(name) for name in columns]
+    db = connections[DEFAULT_DB_ALIAS]  # resolved once, not per value
+    converters = [_converter(field, db) for field in given]
+    overrides = defaults or {}
+    defaults = [
+        (field, field.get_db_prep_save(overrides[field.name] if field.name in overrides else field.get_default(), db))
+        for field in opts.concrete_fields
+        if field not in given and not field.primary_key
+    ]
+    default_values = tuple(value for _, value in defaults)
+    quote = db.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(opts.db_table),
+        ', '.join(quote(field.column) for field in given + [field for field, _ in defaults]),
+        ', '.join(['%s'] * (len(given) + len(defaults))),
+    )
+
+    expected = set(columns)
+
+    def prepare(number, row):
+        if row.keys() != expected:
+            raise LoadError(f"{opts.label} row {number}: expected the columns {', '.join(columns)}")
+        try:
+            return tuple(convert(row[name]) for convert, name in zip(converters, columns)) + default_values
+        except (TypeError, ValueError) as e:
+            raise LoadError(f"{opts.label} row {number}: {e}") from e
+
+    batches = _batches((prepare(number, row) for number, row in enumerate(chain([first], rows), start=1)), batch_size)
+    count = 0
+    while True:
+        inserted = 0
+        with transaction.atomic(), db.cursor() as cursor:
+            for batch in batches:
+                cursor.executemany(sql, batch)
+                inserted += len(batch)
+                if inserted >= commit_every:
+                    break
+        if not inserted:
+            return count
+        count += inserted
+        if progress:
+            progress(count)
+
+
+@contextmanager
+def deferred_indexes(models):
+    """
+    On SQLite, drop the secondary (non-unique) indexes of the models' tables
+    and recreate them afterwards: building an index once over the loaded rows
+    is much cheaper than keeping it up to date on every insert. Yields the
+    names of the dropped indexes; other databases keep theirs.
+    """
+    if connection.vendor != 'sqlite' or not models:
+        yield []
+        return
+    tables = {model._meta.db_table for model in models}
+    with connection.cursor() as cursor:
+        # Indexes backing primary keys and unique constraints have no SQL of
+        # their own or start with CREATE UNIQUE; those stay.
+        cursor.execute("SELECT name, tbl_name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")
+        indexes = [
+            (name, sql) for name, table, sql in cursor.fetchall()
+            if table in tables and not sql.upper().startswith('CREATE UNIQUE')
+        ]
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX "{name}"')
+    try:
+        yield [name for name, _ in indexes]
+    finally:
+        with connection.cursor() as cursor:
+            for _, sql in indexes:
+                cursor.execute(sql)
+
+
+@contextmanager
+def fast_sqlite():
+    """
+    Relax durability for the load: no fsync and a large page cache. A crash
+    mid-load can corrupt the database, which a staging refresh can simply
+    redo. Foreign keys are checked once at the end instead of per row.
+    Inside a transaction, where SQLite refuses both changes, it does nothing.
+    """
+    if connection.vendor != 'sqlite' or connection.in_atomic_block:
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA synchronous')
+        synchronous = cursor.fetchone()[0]
+        cursor.execute('PRAGMA cache_size')
+        cache_size = cursor.fetchone()[0]
+        cursor.execute('PRAGMA synchronous = OFF')
+        cursor.execute('PRAGMA cache_size = -262144')  # 256 MiB
+    try:
+        with connection.constraint_checks_disabled():
+            yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA synchronous = {synchronous}')
+            cursor.execute(f'PRAGMA cache_size = {cache_size}')
+
+
+def reset_sequences(models):
+    """Move ID sequences past explicitly loaded ids (a no-op on SQLite)."""
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def timed_progress(write, label):
+    started = time.perf_counter()
+
+    def progress(count):
+        elapsed = time.perf_counter() - started
+        write(f"  {label}: {count:,} rows ({count / elapsed if elapsed else 0:,.0f} rows/s)")
+    return progress
@@ -0,0 +1,87 @@
+"""
+Append-only change feed of tasks, sprints and projects.
+
+Every create, update and delete, including rows removed by a cascade, adds a
+Change row whose id is its sequence number, so a client that remembers the
+last number it saw can ask for the rest with changes_since(). Rows written
+with bulk_create() outside bulk_create_tasks(), such as by load_dataset and
+the synthetic dataset, are not recorded; resync from the export after those.
+
+A change's sequence number is its autoincrement id. Ids are handed out when
+a row is inserted, not when it commits, so a transaction can still be open
+below a number that is already visible; on databases that run writers side
+by side (PostgreSQL) that leaves a gap a reader must not step over. Readers
+therefore stop at the first gap, the watermark, until it fills or is older
+than TRACKER_CHANGE_GAP_TIMEOUT seconds, when the missing ids are taken to be
+rolled back. A transaction left open longer than that can have its changes
+skipped.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Change, Project, Sprint, Task
+
+# Fields copied into Change.data: what users edit, not the derived counters
+# and version stamps.
+FIELDS = {
+    Task: ('sprint_id', 'title', 'description', 'due_date', 'status'),
+    Sprint: ('project_id', 'name', 'start_date', 'end_date'),
+    Project: ('account_id', 'name', 'description', 'owner_id'),
+}
+KINDS = {Task: Change.TASK, Sprint: Change.SPRINT, Project: Change.PROJECT}
+BATCH_SIZE = 500
+DEFAULT_GAP_TIMEOUT = 60
+
+
+def snapshot(instance):
+    """The feed fields loaded on ``instance``; deferred ones are left out rather than fetched."""
+    return {field: instance.__dict__[field] for field in FIELDS[instance._meta.model] if field in instance.__dict__}
+
+
+def append(changes):
+    """Insert unsaved Change rows, one INSERT per batch."""
+    if changes:
+        Change.objects.bulk_create(changes, batch_size=BATCH_SIZE)
+
+
+def record(instance, action):
+    """Append one change of a Task, Sprint or Project instance."""
+    append([Change(kind=KINDS[instance._meta.model], object_id=instance.pk, action=action, data=snapshot(instance))])
+
+
+def record_queryset(queryset, action):
+    """Append ``action`` for every row of ``queryset``, one INSERT per batch."""
+    model = queryset.model
+    append([
+        Change(kind=KINDS[model], object_id=row.pop('id'), action=action, data=row)
+        for row in queryset.order_by('pk').values('id', *FIELDS[model])
+    ])
+
+
+def record_tasks(tasks, action):
+    """Append ``action`` for Task instances already in memory, one INSERT per batch."""
+    append([Change(kind=Change.TASK, object_id=task.pk, action=action, data=snapshot(task)) for task in tasks])
+
+
+def changes_since(seq, limit, using=None):
+    """
+    Up to ``limit`` changes with a sequence number above ``seq``, oldest
+    first, as dicts, and whether more follow. Stops short of a gap that may
+    still be filled by an open transaction (see the module docstring).
+    """
+    rows = list(
+        Change.objects.using(using).filter(pk__gt=seq).order_by('pk')
+        .values_list('id', 'kind', 'object_id', 'action', 'data', 'created_at')[:limit + 1]
+    )
+    settled = timezone.now() - timedelta(seconds=getattr(settings, 'TRACKER_CHANGE_GAP_TIMEOUT', DEFAULT_GAP_TIMEOUT))
+    changes = []
+    for row_seq, kind, object_id, action, data, created_at in rows:
+        if row_seq != seq + 1 and created_at > settled:
+            return changes, False
+        if len(changes) == limit:
+            return changes, True
+        changes.append({'seq': row_seq, 'kind': kind, 'id': object_id, 'action': action, 'data': data, 'at': created_at})
+        seq = row_seq
+    return changes, False
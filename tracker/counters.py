@@ -0,0 +1,85 @@
+from collections import Counter
+
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Project, Sprint, Task
+
+COUNTER_FIELDS = ('task_count', 'to_do_count', 'in_progress_count', 'blocked_count', 'completed_count')
+
+
+def counter_field(status):
+    """Return the per-status counter column for a task status, or None if it has none."""
+    return Task.STATUS_COUNTER_FIELDS.get(Task.normalize_status(status))
+
+
+def _field_deltas(status_deltas):
+    deltas = Counter()
+    for status, delta in status_deltas.items():
+        deltas['task_count'] += delta
+        field = counter_field(status)
+        if field:
+            deltas[field] += delta
+    return {field: delta for field, delta in deltas.items() if delta}
+
+
+def adjust_task_counters(sprint_id, status_deltas):
+    """
+    Apply ``{status: delta}`` to a sprint's counters and to its project's
+    counters, as two atomic ``UPDATE ... SET x = x + n`` statements.
+    """
+    deltas = _field_deltas(status_deltas)
+    if not deltas:
+        return
+    updates = {field: F(field) + delta for field, delta in deltas.items()}
+    Sprint.objects.filter(pk=sprint_id).update(**updates)
+    Project.objects.filter(sprints__id=sprint_id).update(**updates)
+
+
+def subtract_sprint_counters(sprint_id):
+    """Remove a sprint's counters from its project before the sprint is deleted."""
+    sprint = Sprint.objects.filter(pk=sprint_id)
+    Project.objects.filter(sprints__id=sprint_id).update(**{
+        field: F(field) - Subquery(sprint.values(field)[:1]) for field in COUNTER_FIELDS
+    })
+
+
+def status_filters(prefix=''):
+    """
+    Counter field -> the Q() selecting the tasks it counts (None for all),
+    with ``prefix`` (e.g. ``'task__'``) in front of the status lookup.
+    """
+    statuses = {field: [] for field in Task.STATUS_COUNTER_FIELDS.values()}
+    for status in list(dict(Task.TASK_STATUS_CHOICES)) + list(Task.STATUS_ALIASES):
+        statuses[counter_field(status)].append(status)
+    return {'task_count': None, **{field: Q(**{f'{prefix}status__in': values}) for field, values in statuses.items()}}
+
+
+def rebuild_task_counters():
+    """Recompute every Sprint and Project counter from the Task table."""
+    Sprint.objects.update(**{
+        field: Coalesce(
+            Subquery(
+                Task.objects.filter(sprint=OuterRef('pk'))
+                .values('sprint')
+                .annotate(total=Count('pk', filter=condition))
+                .values('total')[:1],
+                output_field=IntegerField(),
+            ),
+            Value(0),
+        )
+        for field, condition in status_filters().items()
+    })
+    Project.objects.update(**{
+        field: Coalesce(
+            Subquery(
+                Sprint.objects.filter(project=OuterRef('pk'))
+                .values('project')
+                .annotate(total=Sum(field))
+                .values('total')[:1],
+                output_field=IntegerField(),
+            ),
+            Value(0),
+        )
+        for field in COUNTER_FIELDS
+    })
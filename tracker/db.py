@@ -0,0 +1,23 @@
+from django.conf import settings
+
+# Applied to every new SQLite connection; override with TRACKER_SQLITE_PRAGMAS.
+DEFAULT_SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,           # wait up to 5s for a lock instead of failing
+    'journal_mode': 'WAL',          # readers no longer block the writer
+    'synchronous': 'NORMAL',        # fsync at checkpoints only; safe with WAL
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+def sqlite_pragmas():
+    return getattr(settings, 'TRACKER_SQLITE_PRAGMAS', DEFAULT_SQLITE_PRAGMAS)
+
+
+def configure_connection(sender, connection, **kwargs):
+    """connection_created hook that tunes SQLite connections."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in sqlite_pragmas().items():
+            cursor.execute(f'PRAGMA {pragma} = {value}')
@@ -0,0 +1,60 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import Project
+
+# Entries are keyed on the project's version stamp, so a stale one is never
+# read again; the timeout only bounds how long it occupies the cache.
+DIRECTORY_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def stamp_version(version, updated_at):
+    """The directory version for a project's (version, updated_at) stamp."""
+    return f'{version}.{updated_at.timestamp():.6f}'
+
+
+def directory_version(project_id):
+    """
+    The version of a project's participant directory, or None if there is no
+    such project. It is the project's version stamp (see tracker.versions),
+    which every change of the owner, the participants or their names bumps,
+    and it is read from the database, so all workers see a bump at once.
+    """
+    stamp = Project.objects.filter(pk=project_id).values_list('version', 'updated_at').first()
+    return stamp and stamp_version(*stamp)
+
+
+def get_participant_directory(project_id, version=None):
+    """
+    Return the project's owner and participants as compact
+    ``(id, full_name, username, role)`` tuples, owner first, or None if the
+    project does not exist. Pass ``version`` when it is already known. A
+    cache hit costs the version lookup only; a miss adds two queries.
+    """
+    version = version or directory_version(project_id)
+    if version is None:
+        return None
+    key = f'tracker:directory:{project_id}:{version}'
+    directory = cache.get(key)
+    if directory is None:
+        owner_id = Project.objects.filter(pk=project_id).values_list('owner_id', flat=True).first()
+        rows = (
+            User.objects.filter(Q(pk=owner_id) | Q(project_participants=project_id))
+            .distinct()
+            .order_by('first_name', 'last_name', 'username')
+            .values_list('id', 'first_name', 'last_name', 'username')
+        )
+        directory = [
+            (pk, f'{first_name} {last_name}'.strip(), username, 'Owner' if pk == owner_id else 'Participant')
+            for pk, first_name, last_name, username in rows
+        ]
+        directory.sort(key=lambda entry: entry[3] != 'Owner')
+        cache.set(key, directory, DIRECTORY_CACHE_TIMEOUT)
+    return directory
+
+
+def filter_directory(directory, query):
+    """Match entries whose full name or username contains ``query``, as the sprint planner does client-side."""
+    query = query.lower()
+    return [entry for entry in directory if query in entry[1].lower() or query in entry[2].lower()]
@@ -0,0 +1,139 @@
+import csv
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS
+
+from .models import Account, Task
+
+# Export column: the field it is read from, relative to Account or to Task.
+# The reverse relations are outer joins, so an account without projects and
+# a project without sprints still give one row each.
+SPRINT_COLUMNS = {
+    'account_id': 'id',
+    'account_name': 'name',
+    'project_id': 'projects__id',
+    'project_name': 'projects__name',
+    'sprint_id': 'projects__sprints__id',
+    'sprint_name': 'projects__sprints__name',
+    'sprint_start_date': 'projects__sprints__start_date',
+    'sprint_end_date': 'projects__sprints__end_date',
+}
+TASK_COLUMNS = {
+    'task_id': 'id',
+    'task_title': 'title',
+    'task_status': 'status',
+    'task_due_date': 'due_date',
+}
+# One row per task, or per sprint without tasks, project without sprints or
+# account without projects (the columns below them left empty), in
+# account -> project -> sprint -> task order.
+COLUMNS = (*SPRINT_COLUMNS, *TASK_COLUMNS, 'assignees')
+NO_TASK = {**dict.fromkeys(TASK_COLUMNS), 'assignees': []}
+
+FORMATS = {'csv': 'text/csv; charset=utf-8', 'ndjson': 'application/x-ndjson'}
+# Sprints whose tasks are read with one query; bounds what the database sorts.
+SPRINT_BATCH = 200
+CHUNK_SIZE = 2000
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _assignees(task_ids, using):
+    assignees = {}
+    pairs = (
+        Task.assigned_to.through.objects.using(using)
+        .filter(task_id__in=task_ids)
+        .order_by('task_id', 'user_id')
+        .values_list('task_id', 'user_id', 'user__username')
+    )
+    for task_id, user_id, username in pairs:
+        assignees.setdefault(task_id, []).append({'id': user_id, 'username': username})
+    return assignees
+
+
+def _batch_rows(sprints, using, chunk_size):
+    """Rows for a batch of sprints (in export order) and their tasks."""
+    tasks = (
+        Task.objects.using(using)
+        .filter(sprint_id__in=[sprint['sprint_id'] for sprint in sprints if sprint['sprint_id'] is not None])
+        .order_by('sprint__project__account_id', 'sprint__project_id', 'sprint_id', 'id')
+        .values_list('sprint_id', *TASK_COLUMNS.values())
+        .iterator(chunk_size=chunk_size)
+    )
+    remaining = iter(sprints)
+    sprint, has_tasks = None, True
+    for chunk in _chunks(tasks, chunk_size):
+        assignees = _assignees([task[1] for task in chunk], using)
+        for sprint_id, *values in chunk:
+            # Both sides are in the same order: step to this task's sprint,
+            # emitting the sprints without tasks on the way.
+            while sprint is None or sprint['sprint_id'] != sprint_id:
+                if not has_tasks:
+                    yield {**sprint, **NO_TASK}
+                sprint, has_tasks = next(remaining), False
+            has_tasks = True
+            task = dict(zip(TASK_COLUMNS, values))
+            yield {**sprint, **task, 'assignees': assignees.get(task['task_id'], [])}
+    if not has_tasks:
+        yield {**sprint, **NO_TASK}
+    for sprint in remaining:
+        yield {**sprint, **NO_TASK}
+
+
+def export_rows(account_ids=None, using=DEFAULT_DB_ALIAS, chunk_size=CHUNK_SIZE):
+    """
+    Yield the export rows (dicts keyed by COLUMNS) of the given accounts, or
+    of all of them. Accounts, projects and sprints come from one chunked
+    iterator and the tasks and assignees are fetched a batch of sprints at a
+    time, so memory stays flat however large the export. Rows are read as
+    they are written, not as one snapshot.
+    """
+    sprints = Account.objects.using(using).order_by('id', 'projects__id', 'projects__sprints__id')
+    if account_ids is not None:
+        sprints = sprints.filter(pk__in=account_ids)
+    sprints = (
+        dict(zip(SPRINT_COLUMNS, values))
+        for values in sprints.values_list(*SPRINT_COLUMNS.values()).iterator(chunk_size=chunk_size)
+    )
+    for batch in _chunks(sprints, SPRINT_BATCH):
+        yield from _batch_rows(batch, using, chunk_size)
+
+
+class _Echo:
+    """A file-like object whose write() hands back what it was given."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    """
+    Encode rows as CSV, header first. Assignees go in one cell as
+    ``id:username`` pairs separated by semicolons.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(COLUMNS)
+    for row in rows:
+        row = {**row, 'assignees': ';'.join(f"{user['id']}:{user['username']}" for user in row['assignees'])}
+        yield writer.writerow([row[column] for column in COLUMNS])
+
+
+def ndjson_lines(rows):
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode(row) + '\n'
+
+
+def encode(rows, format, lines_per_block=500):
+    """
+    ``rows`` encoded as ``format`` ('csv' or 'ndjson'), in blocks of
+    ``lines_per_block`` lines rather than one write per row.
+    """
+    lines = csv_lines(rows) if format == 'csv' else ndjson_lines(rows)
+    for block in _chunks(lines, lines_per_block):
+        yield ''.join(block)
@@ -0,0 +1,279 @@
+import logging
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds, in seconds, of the request duration histogram buckets.
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Requests repeating one statement this many times are logged as likely N+1s.
+DEFAULT_DUPLICATE_WARNING = 5
+
+_current = ContextVar('tracker_request_metrics', default=None)
+
+
+def enabled():
+    return getattr(settings, 'TRACKER_INSTRUMENTATION', False)
+
+
+class RequestMetrics:
+    """What one request cost: wall time, queries, SQL time and response size."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.statements = {}  # SQL text -> times run
+        self.executions = set()  # (SQL, parameters) seen
+
+    def record_query(self, sql, params, duration):
+        self.queries += 1
+        self.sql_time += duration
+        self.statements[sql] = self.statements.get(sql, 0) + 1
+        self.executions.add((sql, repr(params)))
+
+    @property
+    def duplicates(self):
+        """
+        Queries repeating the SQL of an earlier one of the request, whatever
+        their parameters: an N+1 runs one statement per row, each with its id.
+        """
+        return self.queries - len(self.statements)
+
+    @property
+    def exact_duplicates(self):
+        """Queries repeating an earlier one with the same parameters too; their result could be reused."""
+        return self.queries - len(self.executions)
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        return (
+            f'app;dur={self.elapsed() * 1000:.1f}, '
+            f'db;dur={self.sql_time * 1000:.1f};desc="{self.queries} queries", '
+            f'dup;desc="{self.duplicates} repeated statements, {self.exact_duplicates} exact"'
+        )
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Execute wrapper installed on every connection (see install()); times the
+    query against the current request, if it is being measured.
+    """
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.record_query(sql, params, time.perf_counter() - started)
+
+
+def install(sender=None, connection=None, **kwargs):
+    """
+    connection_created hook adding record_query() to new connections. With
+    no connection, covers the current thread's already open ones.
+    """
+    for conn in [connection] if connection is not None else connections.all(initialized_only=True):
+        if record_query not in conn.execute_wrappers:
+            conn.execute_wrappers.append(record_query)
+
+
+class ViewStats:
+    __slots__ = (
+        'requests', 'duration', 'buckets', 'queries', 'sql_time', 'duplicates', 'exact_duplicates', 'response_bytes',
+    )
+
+    def __init__(self):
+        self.requests = 0
+        self.duration = 0.0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.queries = 0
+        self.sql_time = 0.0
+        self.duplicates = 0
+        self.exact_duplicates = 0
+        self.response_bytes = 0
+
+
+class Registry:
+    """
+    Totals per resolved view name for this process. Each server process
+    keeps its own, so scrape every process (or run one) to see them all.
+    """
+
+    def __init__(self):
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def observe(self, view, metrics, response_bytes):
+        duration = metrics.elapsed()
+        with self._lock:
+            stats = self._views.get(view)
+            if stats is None:
+                stats = self._views[view] = ViewStats()
+            stats.requests += 1
+            stats.duration += duration
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    stats.buckets[index] += 1
+            stats.queries += metrics.queries
+            stats.sql_time += metrics.sql_time
+            stats.duplicates += metrics.duplicates
+            stats.exact_duplicates += metrics.exact_duplicates
+            stats.response_bytes += response_bytes
+
+    def snapshot(self):
+        with self._lock:
+            return {view: _copy(stats) for view, stats in self._views.items()}
+
+    def clear(self):
+        with self._lock:
+            self._views.clear()
+
+
+def _copy(stats):
+    copy = ViewStats()
+    for name in ViewStats.__slots__:
+        value = getattr(stats, name)
+        setattr(copy, name, list(value) if isinstance(value, list) else value)
+    return copy
+
+
+registry = Registry()
+
+
+def _label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(views=None):
+    """The registry's totals in the Prometheus text exposition format."""
+    views = registry.snapshot() if views is None else views
+    lines = []
+
+    def family(name, kind, help_text, samples):
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        lines.extend(samples)
+
+    ordered = sorted(views.items())
+    histogram = []
+    for view, stats in ordered:
+        label = f'view="{_label(view)}"'
+        for bound, count in zip(DURATION_BUCKETS, stats.buckets):
+            histogram.append(f'tracker_view_duration_seconds_bucket{{{label},le="{bound}"}} {count}')
+        histogram.append(f'tracker_view_duration_seconds_bucket{{{label},le="+Inf"}} {stats.requests}')
+        histogram.append(f'tracker_view_duration_seconds_sum{{{label}}} {stats.duration:.6f}')
+        histogram.append(f'tracker_view_duration_seconds_count{{{label}}} {stats.requests}')
+    family('tracker_view_duration_seconds', 'histogram', 'Wall time of requests, per view.', histogram)
+
+    counters = (
+        ('tracker_view_db_queries_total', 'Database queries run, per view.', 'queries', '{}'),
+        ('tracker_view_db_seconds_total', 'Time spent in SQL, per view.', 'sql_time', '{:.6f}'),
+        ('tracker_view_duplicate_queries_total', 'Queries repeating the SQL of an earlier one of the same request, per view.', 'duplicates', '{}'),
+        ('tracker_view_exact_duplicate_queries_total', 'Queries repeating an earlier one, parameters included, per view.', 'exact_duplicates', '{}'),
+        ('tracker_view_response_bytes_total', 'Response body bytes sent, per view.', 'response_bytes', '{}'),
+    )
+    for name, help_text, attribute, fmt in counters:
+        family(name, 'counter', help_text, [
+            f'{name}{{view="{_label(view)}"}} {fmt.format(getattr(stats, attribute))}' for view, stats in ordered
+        ])
+    return '\n'.join(lines) + '\n'
+
+
+class InstrumentationMiddleware:
+    """
+    Measure each request (wall time, queries, SQL time, duplicate queries and
+    response size), add a Server-Timing header and fold the numbers into the
+    per-view registry served by the metrics view. Only loaded when
+    TRACKER_INSTRUMENTATION is on; put it first so it sees the whole request.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.duplicate_warning = getattr(settings, 'TRACKER_INSTRUMENTATION_DUPLICATE_WARNING', DEFAULT_DUPLICATE_WARNING)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        install()
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        # Sync views run on a thread that inherits this context, and their
+        # connections get record_query() when they are opened.
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        match = request.resolver_match
+        view = match.view_name if match else '<unresolved>'
+        response['Server-Timing'] = metrics.server_timing()
+        if response.streaming:
+            # Streamed bodies run their queries while being sent; count them
+            # and the bytes once the stream is exhausted or closed.
+            measure = self.measure_async_stream if response.is_async else self.measure_stream
+            response.streaming_content = measure(response.streaming_content, view, metrics)
+        else:
+            self.observe(view, metrics, len(response.content))
+        return response
+
+    def measure_stream(self, content, view, metrics):
+        # The server may close the stream from another context than the one
+        # iterating it, so restore the variable rather than reset a token.
+        previous = _current.get()
+        _current.set(metrics)
+        size = 0
+        try:
+            for chunk in content:
+                size += len(chunk)
+                yield chunk
+        finally:
+            _current.set(previous)
+            self.observe(view, metrics, size)
+
+    async def measure_async_stream(self, content, view, metrics):
+        previous = _current.get()
+        _current.set(metrics)
+        size = 0
+        try:
+            async for chunk in content:
+                size += len(chunk)
+                yield chunk
+        finally:
+            _current.set(previous)
+            self.observe(view, metrics, size)
+
+    def observe(self, view, metrics, response_bytes):
+        registry.observe(view, metrics, response_bytes)
+        if metrics.duplicates >= self.duplicate_warning:
+            repeated = max(metrics.statements.items(), key=lambda item: item[1])
+            logger.warning(
+                "%s repeated statements %d times (%d with the same parameters); most repeated (%d times): %s",
+                view, metrics.duplicates, metrics.exact_duplicates, repeated[1], repeated[0],
+            )
@@ -0,0 +1,142 @@
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection, connections
+from django.db.backends.signals import connection_created
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from tracker.models import Account, Project, Sprint
+
+# "baseline" is Django's stock SQLite setup; "tuned" is the profile from
+# settings; "pooled" adds the TRACKER_DB_POOL=1 stand-in (one connection per
+# worker thread, kept open).
+PROFILES = {
+    'baseline': {'ENGINE': 'django.db.backends.sqlite3', 'CONN_MAX_AGE': 0, 'OPTIONS': {}, 'PRAGMAS': {}},
+    'tuned': {},
+    'pooled': {'CONN_MAX_AGE': None},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Run many concurrent writers through save_sprint and save_task against a "
+        "scratch file database and report throughput, latency, lock errors and "
+        "connections opened for each database profile."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=16)
+        parser.add_argument('--requests', type=int, default=50, help='Iterations per writer (one sprint and one task each).')
+        parser.add_argument('--profile', choices=sorted(PROFILES), action='append',
+                            help='Profile(s) to run; defaults to all.')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        try:
+            for name in options['profile'] or list(PROFILES):
+                self.run_profile(name, options)
+        finally:
+            teardown_test_environment()
+
+    def run_profile(self, name, options):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Profile: {name}"))
+        with tempfile.TemporaryDirectory() as tmp, self.profile(name, os.path.join(tmp, 'bench.sqlite3')):
+            old_name = connection.settings_dict['NAME']
+            connection.creation.create_test_db(verbosity=0, autoclobber=True)
+            try:
+                self.report(self.run(options['writers'], options['requests']))
+            finally:
+                connections.close_all()
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    @contextmanager
+    def profile(self, name, path):
+        db = connections.settings['default']
+        overrides = PROFILES[name]
+        saved = {key: db.get(key) for key in ('ENGINE', 'CONN_MAX_AGE', 'OPTIONS', 'TEST')}
+        if db['ENGINE'].endswith('sqlite3'):
+            # A file database, so writers really contend for the lock.
+            db['TEST'] = {**(db.get('TEST') or {}), 'NAME': path}
+        for key in ('ENGINE', 'CONN_MAX_AGE', 'OPTIONS'):
+            if key in overrides and db['ENGINE'].endswith('sqlite3'):
+                db[key] = overrides[key]
+        pragmas = {'TRACKER_SQLITE_PRAGMAS': overrides['PRAGMAS']} if 'PRAGMAS' in overrides else {}
+        self.stdout.write(f"  ENGINE={db['ENGINE']} CONN_MAX_AGE={db.get('CONN_MAX_AGE')} OPTIONS={db.get('OPTIONS')}")
+        try:
+            with override_settings(**pragmas):
+                yield
+        finally:
+            db.update(saved)
+
+    def run(self, writers, requests):
+        owner = User.objects.create_user('bench-owner')
+        account = Account.objects.create(name='Concurrency', description='', owner=owner)
+        project = Project.objects.create(name='Concurrency', description='', account=account, owner=owner)
+        sprints = [
+            Sprint.objects.create(project=project, name=f'Base {n}', start_date='2025-01-01', end_date='2025-01-14')
+            for n in range(writers)
+        ]
+        connections.close_all()
+
+        lock = threading.Lock()
+        opened = [0]
+
+        def count_connection(sender, **kwargs):
+            with lock:
+                opened[0] += 1
+
+        connection_created.connect(count_connection, weak=False)
+        save_sprint_url = reverse('save_sprint', args=[project.pk])
+        save_task_url = reverse('save_task')
+
+        def writer(n):
+            client = Client()
+            samples = []
+            for i in range(requests):
+                for url, body in (
+                    (save_sprint_url, {'sprint_name': f'W{n}-{i}', 'start_date': '2025-02-01', 'end_date': '2025-02-14'}),
+                    (save_task_url, {'title': f'W{n}-{i}', 'due_date': '2025-01-10', 'status': 'To Do',
+                                     'sprint_id': sprints[n].pk, 'participants': [owner.pk]}),
+                ):
+                    started = time.perf_counter()
+                    response = client.post(url, json.dumps(body), content_type='application/json')
+                    elapsed = (time.perf_counter() - started) * 1000
+                    error = None if response.status_code == 200 else response.content.decode(errors='replace')
+                    samples.append((elapsed, error))
+                    # The test client keeps connections open across requests;
+                    # apply the same end-of-request handling a server would.
+                    close_old_connections()
+            connections.close_all()
+            return samples
+
+        started = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=writers) as pool:
+                samples = [sample for result in pool.map(writer, range(writers)) for sample in result]
+        finally:
+            connection_created.disconnect(count_connection)
+        return samples, time.perf_counter() - started, opened[0]
+
+    def report(self, result):
+        samples, elapsed, opened = result
+        latencies = sorted(ms for ms, _ in samples)
+        errors = [error for _, error in samples if error is not None]
+        locked = sum('locked' in error for error in errors)
+        quantiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f"  requests={len(samples)} throughput={len(samples) / elapsed:.0f} req/s "
+            f"p50={quantiles[49]:.1f}ms p95={quantiles[94]:.1f}ms p99={quantiles[98]:.1f}ms"
+        )
+        self.stdout.write(f"  errors={len(errors)} (database is locked: {locked}) connections opened={opened}")
+        for error in sorted(set(errors))[:3]:
+            self.stdout.write(f"    e.g. {error[:200]}")
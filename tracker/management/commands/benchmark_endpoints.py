@@ -0,0 +1,213 @@
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from tracker.models import Task
+from tracker.synthetic import generate_dataset
+
+SCALE_OPTIONS = ('users', 'accounts', 'projects_per_account', 'participants_per_project',
+                 'sprints_per_project', 'tasks_per_sprint', 'assignees_per_task')
+# Metrics compared by --compare; all of them get worse as they grow.
+COMPARED = ('p50', 'p95', 'p99', 'queries_mean')
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    return ordered[max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a scratch test database with a synthetic dataset and drive scripted "
+        "scenarios through the tracker endpoints and admin pages: save_task, "
+        "add_task, save_sprint, get_user_suggestions, the project changelist and "
+        "plan_sprint. Reports throughput, p50/p95/p99 latency and queries per "
+        "request as JSON, to compare between commits with --compare. "
+        "The configured database is never touched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--accounts', type=int, default=5)
+        parser.add_argument('--projects-per-account', type=int, default=10)
+        parser.add_argument('--participants-per-project', type=int, default=15)
+        parser.add_argument('--sprints-per-project', type=int, default=20)
+        parser.add_argument('--tasks-per-sprint', type=int, default=25)
+        parser.add_argument('--assignees-per-task', type=int, default=2)
+        parser.add_argument('--requests', type=int, default=200, help='Measured requests per scenario.')
+        parser.add_argument('--warmup', type=int, default=10, help='Unmeasured requests per scenario first.')
+        parser.add_argument('--scenario', action='append', choices=sorted(self.scenarios()),
+                            help='Scenario(s) to run; defaults to all.')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout.')
+        parser.add_argument('--compare', metavar='BASELINE', help='A previous JSON report to compare against.')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Relative slowdown --compare accepts before failing (default 0.2 = 20%%).')
+
+    def scenarios(self):
+        return {
+            'save_task': self.save_task,
+            'add_task': self.add_task,
+            'save_sprint': self.save_sprint,
+            'get_user_suggestions': self.get_user_suggestions,
+            'project_changelist': self.project_changelist,
+            'plan_sprint': self.plan_sprint,
+        }
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            report = self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stderr.write(f"Report written to {options['output']}")
+        else:
+            self.stdout.write(output)
+        if baseline is not None:
+            self.compare(baseline, report, options['tolerance'])
+
+    def run(self, options):
+        scale = {name: options[name] for name in SCALE_OPTIONS}
+        started = time.perf_counter()
+        self.data = generate_dataset(seed=options['seed'], **scale)
+        self.stderr.write(f"Seeded {self.data['tasks']} tasks in {time.perf_counter() - started:.1f}s")
+
+        self.rng = random.Random(options['seed'])
+        self.admin = User.objects.create_superuser('bench-admin', password='bench')
+        results = {}
+        for name in options['scenario'] or list(self.scenarios()):
+            results[name] = self.measure(name, options['warmup'], options['requests'])
+            self.stderr.write(
+                f"{name}: {results[name]['throughput']:.0f} req/s p50={results[name]['p50']:.1f}ms "
+                f"p99={results[name]['p99']:.1f}ms queries={results[name]['queries_mean']:.1f}"
+            )
+        return {
+            'meta': {
+                'commit': self.commit(),
+                'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'seed': options['seed'],
+                'scale': scale,
+                'requests': options['requests'],
+            },
+            'scenarios': results,
+        }
+
+    def commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def measure(self, name, warmup, requests):
+        client = Client()
+        client.force_login(self.admin)
+        scenario = self.scenarios()[name]
+        for n in range(warmup):
+            scenario(client, f'warmup-{n}')
+
+        latencies, queries, errors = [], [], 0
+        for n in range(requests):
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                response = scenario(client, n)
+                elapsed = time.perf_counter() - started
+            latencies.append(elapsed * 1000)
+            queries.append(len(ctx.captured_queries))
+            errors += response.status_code >= 400
+
+        total = sum(latencies) / 1000
+        latencies.sort()
+        return {
+            'requests': requests,
+            'errors': errors,
+            'throughput': round(requests / total, 1) if total else 0,
+            'p50': round(percentile(latencies, 0.50), 3),
+            'p95': round(percentile(latencies, 0.95), 3),
+            'p99': round(percentile(latencies, 0.99), 3),
+            'queries_mean': round(statistics.fmean(queries), 2),
+            'queries_max': max(queries),
+        }
+
+    def compare(self, baseline, report, tolerance):
+        regressions = []
+        self.stderr.write(self.style.MIGRATE_HEADING(f"Compared with {baseline['meta'].get('commit')}"))
+        for name, result in report['scenarios'].items():
+            before = baseline['scenarios'].get(name)
+            if before is None:
+                continue
+            for metric in COMPARED:
+                old, new = before[metric], result[metric]
+                change = (new - old) / old if old else 0
+                line = f"  {name} {metric}: {old:.1f} -> {new:.1f} ({change:+.0%})"
+                if change > tolerance:
+                    regressions.append(line)
+                    line = self.style.ERROR(line)
+                self.stderr.write(line)
+        if regressions:
+            raise CommandError(f"{len(regressions)} metric(s) regressed by more than {tolerance:.0%}.")
+
+    # Scenarios: each sends one request and returns the response -------------
+
+    def post_json(self, client, url, body):
+        return client.post(url, json.dumps(body), content_type='application/json')
+
+    def random_sprint(self):
+        return self.rng.choice(self.data['sprints'])
+
+    def save_task(self, client, n):
+        return self.post_json(client, reverse('save_task'), {
+            'sprint_id': self.random_sprint(), 'title': f'Bench save {n}', 'due_date': '2025-01-10',
+            'status': Task.TO_DO, 'participants': self.rng.sample(self.data['users'], 2),
+        })
+
+    def add_task(self, client, n):
+        return self.post_json(client, reverse('add_task'), {
+            'sprint_id': self.random_sprint(), 'title': f'Bench add {n}', 'due_date': '2025-01-10',
+            'status': 'to-do', 'assigned_to': self.rng.sample(self.data['users'], 2),
+        })
+
+    def save_sprint(self, client, n):
+        return self.post_json(client, reverse('save_sprint', args=[self.rng.choice(self.data['projects'])]), {
+            'sprint_name': f'Bench {n}', 'start_date': '2026-01-05', 'end_date': '2026-01-18',
+        })
+
+    def get_user_suggestions(self, client, n):
+        query = self.rng.choice(('a', 'al', 'gr', 'ho', 'tu', 'li', ''))
+        return client.get(reverse('get_user_suggestions', args=[self.rng.choice(self.data['projects'])]), {'query': query})
+
+    def project_changelist(self, client, n):
+        return client.get(reverse('admin:tracker_project_changelist'))
+
+    def plan_sprint(self, client, n):
+        return client.get(reverse('admin:plan_sprint', args=[self.rng.choice(self.data['projects'])]))
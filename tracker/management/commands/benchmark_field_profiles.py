@@ -0,0 +1,106 @@
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from tracker.models import Account, Project, Sprint, Task
+from tracker.views import TASK_LIST_FIELDS
+
+
+def _size(value):
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value.encode())
+    if isinstance(value, (bytes, memoryview)):
+        return len(value)
+    return len(str(value))
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a scratch test database with tasks that have large descriptions and "
+        "compare loading them as full model rows against the columns the task list "
+        "endpoint reads with values(): bytes read from the database and rows per second. "
+        "The configured database is never touched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=100_000, help='Number of tasks to seed.')
+        parser.add_argument('--description-size', type=int, default=4096, help='Characters per task description.')
+        parser.add_argument('--tasks-per-sprint', type=int, default=500)
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per profile; the median is reported.')
+        parser.add_argument('--batch-size', type=int, default=5_000)
+
+    def handle(self, *args, **options):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            self.seed(options)
+            querysets = {
+                'full row': Task.objects.all(),
+                'task list columns': Task.objects.values(*TASK_LIST_FIELDS),
+            }
+            for label, queryset in querysets.items():
+                self.report(label, queryset, options['repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def seed(self, options):
+        total = options['tasks']
+        per_sprint = options['tasks_per_sprint']
+        started = time.perf_counter()
+
+        owner = User.objects.create_user('bench-owner')
+        account = Account.objects.create(name='Benchmark', description='', owner=owner)
+        project = Project.objects.create(name='Benchmark', description='', account=account, owner=owner)
+        start = date(2024, 1, 1)
+        sprints = Sprint.objects.bulk_create([
+            Sprint(project=project, name=f'Sprint {i}', start_date=start, end_date=start + timedelta(days=13))
+            for i in range(max(1, -(-total // per_sprint)))
+        ])
+        description = ('Steps to reproduce, logs and notes. ' * (options['description_size'] // 36 + 1))[:options['description_size']]
+        batch = []
+        for i in range(total):
+            batch.append(Task(
+                sprint=sprints[i // per_sprint],
+                title=f'Task {i}',
+                description=description,
+                due_date=start + timedelta(days=i % 14),
+            ))
+            if len(batch) >= options['batch_size']:
+                Task.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Task.objects.bulk_create(batch)
+        self.stdout.write(f"Seeded {total} tasks in {time.perf_counter() - started:.1f}s\n")
+
+    def payload_bytes(self, queryset):
+        """Bytes of column data the query returns, measured on the raw cursor."""
+        sql, params = queryset.query.sql_with_params()
+        total = 0
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(2000)
+                if not rows:
+                    break
+                total += sum(_size(value) for row in rows for value in row)
+        return total
+
+    def report(self, label, queryset, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows = sum(1 for _ in queryset.iterator(chunk_size=2000))
+            timings.append(time.perf_counter() - started)
+        elapsed = statistics.median(timings)
+        payload = self.payload_bytes(queryset)
+        self.stdout.write(self.style.MIGRATE_HEADING(label))
+        self.stdout.write(
+            f"  rows={rows} payload={payload / 1024 / 1024:.1f} MiB "
+            f"({payload / max(rows, 1):.0f} B/row) {rows / elapsed:,.0f} rows/s"
+        )
@@ -0,0 +1,131 @@
+import random
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from tracker.models import Account, Project, Sprint, Task
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a scratch test database with tasks and compare query plans and "
+        "latencies of the hot tracker lookups without and with the model indexes. "
+        "The configured database is never touched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=1_000_000, help='Number of tasks to seed.')
+        parser.add_argument('--tasks-per-sprint', type=int, default=500)
+        parser.add_argument('--sprints-per-project', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=25, help='Runs per query; the median is reported.')
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            indexes = [(model, index) for model in (Project, Task) for index in model._meta.indexes]
+            with connection.schema_editor() as editor:
+                for model, index in indexes:
+                    editor.remove_index(model, index)
+
+            self.seed(options)
+            before = self.measure(options['repeat'])
+
+            started = time.perf_counter()
+            with connection.schema_editor() as editor:
+                for model, index in indexes:
+                    editor.add_index(model, index)
+            self.stdout.write(f"Built {len(indexes)} indexes in {time.perf_counter() - started:.1f}s\n")
+            after = self.measure(options['repeat'])
+
+            self.report(before, after)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def seed(self, options):
+        total = options['tasks']
+        per_sprint = options['tasks_per_sprint']
+        per_project = options['sprints_per_project']
+        sprint_count = max(1, -(-total // per_sprint))
+        project_count = max(1, -(-sprint_count // per_project))
+        started = time.perf_counter()
+
+        users = User.objects.bulk_create([User(username=f'bench{i}') for i in range(50)])
+        account = Account.objects.create(name='Benchmark', description='', owner=users[0])
+        projects = Project.objects.bulk_create([
+            Project(name=f'Project {i}', description='', account=account, owner=users[i % len(users)])
+            for i in range(project_count)
+        ])
+        start = date(2024, 1, 1)
+        sprints = Sprint.objects.bulk_create([
+            Sprint(
+                project=projects[i // per_project],
+                name=f'Sprint {i}',
+                start_date=start + timedelta(days=14 * (i % per_project)),
+                end_date=start + timedelta(days=14 * (i % per_project) + 13),
+            )
+            for i in range(sprint_count)
+        ])
+
+        statuses = [value for value, _ in Task.TASK_STATUS_CHOICES]
+        batch = []
+        for i in range(total):
+            sprint = sprints[i // per_sprint]
+            batch.append(Task(
+                sprint=sprint,
+                title=f'Task {i}',
+                due_date=sprint.start_date + timedelta(days=self.rng.randrange(14)),
+                status=self.rng.choice(statuses),
+            ))
+            if len(batch) >= options['batch_size']:
+                Task.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Task.objects.bulk_create(batch)
+
+        self.sample_sprint = sprints[len(sprints) // 2]
+        self.sample_user = users[1]
+        self.stdout.write(
+            f"Seeded {project_count} projects, {sprint_count} sprints and {total} tasks "
+            f"in {time.perf_counter() - started:.1f}s\n"
+        )
+
+    def queries(self):
+        sprint = self.sample_sprint
+        return {
+            'board: sprint tasks by status': Task.objects.filter(
+                sprint_id=sprint.pk, status=Task.IN_PROGRESS
+            ).order_by('due_date').values_list('id', 'title'),
+            'due on a day': Task.objects.filter(due_date=sprint.start_date).values_list('id', flat=True),
+            'sprint by name': Sprint.objects.filter(project_id=sprint.project_id, name=sprint.name),
+            'owner projects in account': Project.objects.filter(
+                owner=self.sample_user, account_id=sprint.project.account_id
+            ),
+        }
+
+    def measure(self, repeat):
+        results = {}
+        for label, queryset in self.queries().items():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            plan = queryset.explain().replace('\n', '\n' + ' ' * 33)
+            results[label] = (plan, statistics.median(timings))
+        return results
+
+    def report(self, before, after):
+        for label in before:
+            plan_before, ms_before = before[label]
+            plan_after, ms_after = after[label]
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(f"  without indexes: {ms_before:9.3f} ms  {plan_before}")
+            self.stdout.write(f"  with indexes:    {ms_after:9.3f} ms  {plan_after}")
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from tracker.blobs import collect_garbage
+from tracker.uploads import DEFAULT_UPLOAD_MAX_AGE, expire_uploads
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount attachment blob references from the Task table and delete "
+        "stored files that no task references any more and temporary files "
+        "left by interrupted saves, along with upload sessions abandoned for "
+        "longer than --upload-max-age and their partial files."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-age', type=int, default=3600,
+                            help='Only delete untracked files older than this many seconds.')
+        parser.add_argument('--upload-max-age', type=int, default=DEFAULT_UPLOAD_MAX_AGE,
+                            help='Expire upload sessions idle for this many seconds.')
+        parser.add_argument('--dry-run', action='store_true', help='List what would be deleted.')
+
+    def handle(self, *args, **options):
+        removed = collect_garbage(min_age=options['min_age'], dry_run=options['dry_run'])
+        for name in removed:
+            self.stdout.write(f"  {name}")
+        expired = expire_uploads(max_age=options['upload_max_age'], dry_run=options['dry_run'])
+        for name in expired:
+            self.stdout.write(f"  {name}")
+        verb = "Would delete" if options['dry_run'] else "Deleted"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {len(removed)} unreferenced file(s) and {len(expired)} abandoned upload file(s)."
+        ))
@@ -0,0 +1,190 @@
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection, connections
+from django.test import AsyncClient, Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from tracker.models import Account, Project, Sprint, Task
+
+# mode: (handler, serve the async views)
+MODES = {
+    'wsgi': ('wsgi', False),
+    'asgi-sync': ('asgi', False),
+    'asgi-async': ('asgi', True),
+}
+
+# Share of requests per endpoint.
+MIX = [
+    ('check_sprint_exists', 50),
+    ('save_task', 25),
+    ('update_task', 15),
+    ('add_task', 5),
+    ('save_sprint', 5),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the JSON task and sprint endpoints at high concurrency: the sync "
+        "views behind the WSGI handler (one thread per request), the same views "
+        "behind the ASGI handler, and the async views behind the ASGI handler. "
+        "Each mode runs in its own process against a scratch file database and "
+        "reports requests per second and tail latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=64, help='Requests in flight at once.')
+        parser.add_argument('--requests', type=int, default=5000, help='Total requests per mode.')
+        parser.add_argument('--mode', choices=sorted(MODES), action='append', help='Mode(s) to run; defaults to all.')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--child', choices=sorted(MODES), help='Internal: run one mode in this process.')
+
+    def handle(self, *args, **options):
+        if options['child']:
+            return self.run_child(options)
+        results = {}
+        for mode in options['mode'] or list(MODES):
+            self.stdout.write(self.style.MIGRATE_HEADING(f"Mode: {mode}"))
+            results[mode] = self.spawn(mode, options)
+            self.report(results[mode])
+
+    def spawn(self, mode, options):
+        # URL routing is fixed at import time, so each mode gets a fresh process.
+        env = {**os.environ, 'TRACKER_ASYNC_VIEWS': '1' if MODES[mode][1] else '0'}
+        command = [
+            sys.executable, str(settings.BASE_DIR / 'manage.py'), 'loadtest_json_views', '--child', mode,
+            '--concurrency', str(options['concurrency']), '--requests', str(options['requests']),
+            '--seed', str(options['seed']),
+        ]
+        completed = subprocess.run(command, env=env, capture_output=True, text=True)
+        if completed.returncode != 0:
+            raise CommandError(f"{mode} run failed:\n{completed.stderr[-2000:]}")
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+
+    def report(self, result):
+        self.stdout.write(
+            f"  requests={result['requests']} throughput={result['throughput']:.0f} req/s "
+            f"p50={result['p50']:.1f}ms p95={result['p95']:.1f}ms p99={result['p99']:.1f}ms "
+            f"errors={result['errors']}"
+        )
+
+    # Child process -----------------------------------------------------------
+
+    def run_child(self, options):
+        setup_test_environment()
+        with tempfile.TemporaryDirectory() as tmp:
+            db = connections.settings['default']
+            if db['ENGINE'].endswith('sqlite3'):
+                # A file database, so concurrent writers really contend for it.
+                db['TEST'] = {**(db.get('TEST') or {}), 'NAME': os.path.join(tmp, 'loadtest.sqlite3')}
+            old_name = connection.settings_dict['NAME']
+            connection.creation.create_test_db(verbosity=0, autoclobber=True)
+            try:
+                requests = self.plan(options)
+                handler = MODES[options['child']][0]
+                if handler == 'wsgi':
+                    samples, elapsed = self.run_wsgi(requests, options['concurrency'])
+                else:
+                    samples, elapsed = asyncio.run(self.run_asgi(requests, options['concurrency']))
+            finally:
+                connections.close_all()
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                teardown_test_environment()
+
+        latencies = sorted(ms for ms, _ in samples)
+        quantiles = statistics.quantiles(latencies, n=100)
+        self.stdout.write(json.dumps({
+            'requests': len(samples),
+            'throughput': len(samples) / elapsed,
+            'p50': quantiles[49], 'p95': quantiles[94], 'p99': quantiles[98],
+            'errors': sum(not ok for _, ok in samples),
+        }))
+
+    def plan(self, options):
+        """Seed the database and build the request list: (method, url, body or query)."""
+        rng = random.Random(options['seed'])
+        owner = User.objects.create_user('load-owner')
+        account = Account.objects.create(name='Load', description='', owner=owner)
+        project = Project.objects.create(name='Load', description='', account=account, owner=owner)
+        sprints = [
+            Sprint.objects.create(project=project, name=f'Sprint {n}', start_date='2025-01-01', end_date='2025-01-14')
+            for n in range(20)
+        ]
+        tasks = [
+            Task.objects.create(sprint=sprints[n % len(sprints)], title=f'Seed {n}', due_date='2025-01-10')
+            for n in range(200)
+        ]
+        connections.close_all()
+
+        names, weights = zip(*MIX)
+        requests = []
+        for n in range(options['requests']):
+            name = rng.choices(names, weights)[0]
+            sprint = rng.choice(sprints)
+            if name == 'check_sprint_exists':
+                requests.append(('get', reverse(name, args=[project.pk]), {'sprint_name': sprint.name}))
+            elif name == 'save_sprint':
+                requests.append(('post', reverse(name, args=[project.pk]),
+                                 {'sprint_name': f'Load {n}', 'start_date': '2025-02-01', 'end_date': '2025-02-14'}))
+            elif name == 'update_task':
+                requests.append(('put', reverse(name, args=[rng.choice(tasks).pk]), {'title': f'Updated {n}'}))
+            elif name == 'add_task':
+                requests.append(('post', reverse(name), {'sprint_id': sprint.pk, 'title': f'Added {n}',
+                                                         'due_date': '2025-01-10', 'status': 'to-do',
+                                                         'assigned_to': [owner.pk]}))
+            else:
+                requests.append(('post', reverse(name), {'sprint_id': sprint.pk, 'title': f'Saved {n}',
+                                                         'due_date': '2025-01-10', 'status': Task.TO_DO,
+                                                         'participants': [owner.pk]}))
+        return requests
+
+    def run_wsgi(self, requests, concurrency):
+        def send(request):
+            method, url, data = request
+            client = Client()
+            started = time.perf_counter()
+            if method == 'get':
+                response = client.get(url, data)
+            else:
+                response = getattr(client, method)(url, json.dumps(data), content_type='application/json')
+            elapsed = (time.perf_counter() - started) * 1000
+            # The test client keeps connections open across requests; apply the
+            # same end-of-request handling a server would.
+            close_old_connections()
+            return elapsed, response.status_code < 400
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            samples = list(pool.map(send, requests))
+        return samples, time.perf_counter() - started
+
+    async def run_asgi(self, requests, concurrency):
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def send(request):
+            method, url, data = request
+            async with semaphore:
+                started = time.perf_counter()
+                if method == 'get':
+                    response = await client.get(url, data)
+                else:
+                    response = await getattr(client, method)(url, json.dumps(data), content_type='application/json')
+                return (time.perf_counter() - started) * 1000, response.status_code < 400
+
+        started = time.perf_counter()
+        samples = await asyncio.gather(*(send(request) for request in requests))
+        return samples, time.perf_counter() - started
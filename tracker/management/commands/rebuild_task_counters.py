@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tracker.counters import rebuild_task_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized per-sprint and per-project task counters from the Task table."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuild_task_counters()
+        self.stdout.write(self.style.SUCCESS("Task counters rebuilt."))
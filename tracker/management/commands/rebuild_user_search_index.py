@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tracker.search import rebuild_user_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the user search term index used by the user autocomplete endpoints."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = rebuild_user_search_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} users."))
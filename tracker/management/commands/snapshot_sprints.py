@@ -0,0 +1,26 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from tracker.analytics import take_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Record today's task counts, per sprint and per assignee, for every running "
+        "sprint; the burndown and velocity reports are drawn from these rows. Schedule "
+        "it daily, e.g. from cron shortly before midnight. Rerunning it on the same day "
+        "replaces that day's snapshots."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Day to record (YYYY-MM-DD); defaults to today.')
+
+    def handle(self, *args, **options):
+        try:
+            day = date.fromisoformat(options['date']) if options['date'] else timezone.localdate()
+        except ValueError:
+            raise CommandError(f"Invalid date: {options['date']}")
+        count = take_snapshots(day)
+        self.stdout.write(self.style.SUCCESS(f"Recorded snapshots of {count} sprint(s) for {day}."))
@@ -0,0 +1,109 @@
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .models import ScreenshotVariant, Task
+
+logger = logging.getLogger(__name__)
+
+# kind: (bounding box or None for full size, Pillow format, save options)
+VARIANT_SPECS = {
+    ScreenshotVariant.THUMBNAIL: ((320, 320), 'JPEG', {'quality': 80, 'optimize': True}),
+    ScreenshotVariant.THUMBNAIL_WEBP: ((320, 320), 'WEBP', {'quality': 80, 'method': 4}),
+    ScreenshotVariant.WEBP: (None, 'WEBP', {'quality': 82, 'method': 4}),
+}
+EXTENSIONS = {'JPEG': 'jpg', 'WEBP': 'webp'}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """The shared worker pool; TRACKER_MEDIA_WORKERS threads (Pillow releases the GIL while resizing)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'TRACKER_MEDIA_WORKERS', 2),
+                thread_name_prefix='tracker-media',
+            )
+        return _executor
+
+
+def render_variant(image, box, fmt, options):
+    """Return (bytes, width, height) of ``image`` resized into ``box`` and encoded as ``fmt``."""
+    variant = image.copy()
+    if box:
+        variant.thumbnail(box, Image.LANCZOS)
+    if fmt == 'JPEG' and variant.mode not in ('RGB', 'L'):
+        variant = variant.convert('RGB')
+    buffer = io.BytesIO()
+    variant.save(buffer, fmt, **options)
+    return buffer.getvalue(), variant.width, variant.height
+
+
+def process_screenshot(task_id):
+    """Generate every variant of a task's current screenshot, replacing stale ones."""
+    task = Task.objects.only('screenshots').filter(pk=task_id).first()
+    if task is None or not task.screenshots:
+        return []
+    source = task.screenshots.name
+    try:
+        with task.screenshots.open('rb') as original:
+            image = ImageOps.exif_transpose(Image.open(original))
+            image.load()
+    except UnidentifiedImageError:
+        return []  # e.g. a screen recording; there is nothing to resize
+
+    variants = []
+    for kind, (box, fmt, options) in VARIANT_SPECS.items():
+        data, width, height = render_variant(image, box, fmt, options)
+        stem = source.rsplit('/', 1)[-1].rsplit('.', 1)[0]
+        variant = ScreenshotVariant.objects.filter(task_id=task_id, kind=kind).first()
+        if variant is None:
+            variant = ScreenshotVariant(task_id=task_id, kind=kind)
+        elif variant.image:
+            variant.image.delete(save=False)
+        variant.source = source
+        variant.size = len(data)
+        variant.image.save(f'{stem}_{kind}.{EXTENSIONS[fmt]}', ContentFile(data), save=False)
+        variant.width, variant.height = width, height
+        variant.save()
+        variants.append(variant)
+    return variants
+
+
+def _run(task_id):
+    try:
+        process_screenshot(task_id)
+    except Exception:
+        logger.exception("Screenshot processing failed for task %s", task_id)
+    finally:
+        # Worker threads keep their own connections; don't leak them.
+        connections.close_all()
+
+
+def enqueue_screenshot_processing(task_id):
+    """
+    Schedule variant generation once the current transaction commits, on the
+    worker pool or inline when TRACKER_MEDIA_PROCESS_INLINE is set.
+    """
+    if getattr(settings, 'TRACKER_MEDIA_PROCESS_INLINE', False):
+        transaction.on_commit(lambda: process_screenshot(task_id))
+    else:
+        transaction.on_commit(lambda: get_executor().submit(_run, task_id))
+
+
+def thumbnail_urls(task_ids, kind=ScreenshotVariant.THUMBNAIL_WEBP, using=None):
+    """Map task id to thumbnail URL for the given tasks with one query."""
+    if not task_ids:
+        return {}
+    storage = ScreenshotVariant._meta.get_field('image').storage
+    variants = ScreenshotVariant.objects.using(using).filter(task_id__in=task_ids, kind=kind)
+    return {task_id: storage.url(name) for task_id, name in variants.values_list('task_id', 'image')}
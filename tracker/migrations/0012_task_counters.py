@@ -0,0 +1,96 @@
+# Generated by Django 4.2.17 on 2026-10-18 17:19
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+COUNTER_STATUSES = {
+    'task_count': None,
+    'to_do_count': ['To Do', 'to-do'],
+    'in_progress_count': ['In Progress', 'in-progress'],
+    'completed_count': ['Completed', 'completed'],
+}
+
+
+def backfill_counters(apps, schema_editor):
+    Project = apps.get_model('tracker', 'Project')
+    Sprint = apps.get_model('tracker', 'Sprint')
+    Task = apps.get_model('tracker', 'Task')
+
+    Sprint.objects.update(**{
+        field: Coalesce(
+            Subquery(
+                Task.objects.filter(sprint=OuterRef('pk'))
+                .values('sprint')
+                .annotate(total=Count('pk', filter=Q(status__in=statuses) if statuses else None))
+                .values('total')[:1],
+                output_field=IntegerField(),
+            ),
+            Value(0),
+        )
+        for field, statuses in COUNTER_STATUSES.items()
+    })
+    Project.objects.update(**{
+        field: Coalesce(
+            Subquery(
+                Sprint.objects.filter(project=OuterRef('pk'))
+                .values('project')
+                .annotate(total=Sum(field))
+                .values('total')[:1],
+                output_field=IntegerField(),
+            ),
+            Value(0),
+        )
+        for field in COUNTER_STATUSES
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0011_task_and_project_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='completed_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='in_progress_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='task_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='to_do_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='sprint',
+            name='completed_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='sprint',
+            name='in_progress_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='sprint',
+            name='task_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='sprint',
+            name='to_do_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
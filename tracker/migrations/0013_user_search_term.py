@@ -0,0 +1,45 @@
+# Generated by Django 4.2.17 on 2026-10-18 17:21
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_search_terms(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    UserSearchTerm = apps.get_model('tracker', 'UserSearchTerm')
+    rows = []
+    for user in User.objects.only('first_name', 'last_name', 'username').iterator():
+        full_name = ' '.join(f'{user.first_name} {user.last_name}'.lower().split())
+        parts = full_name.split()
+        terms = {}
+        for term, weight in [(full_name, 1), (parts[0] if parts else '', 2),
+                             (' '.join(user.username.lower().split()), 3)] + [(part, 4) for part in parts[1:]]:
+            if term and weight < terms.get(term, 5):
+                terms[term] = weight
+        rows.extend(UserSearchTerm(user_id=user.pk, term=term[:255], weight=weight) for term, weight in terms.items())
+    UserSearchTerm.objects.bulk_create(rows, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tracker', '0012_task_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=255)),
+                ('weight', models.PositiveSmallIntegerField(choices=[(1, 'Full name'), (2, 'First name'), (3, 'Username'), (4, 'Other name part')])),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term', 'weight', 'user'], name='user_search_term_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_search_terms, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.17 on 2026-10-18 17:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0013_user_search_term'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScreenshotVariant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('thumbnail', 'Thumbnail (JPEG)'), ('thumbnail_webp', 'Thumbnail (WebP)'), ('webp', 'Full size (WebP)')], max_length=20)),
+                ('source', models.CharField(max_length=255)),
+                ('image', models.ImageField(upload_to='task_screenshots/variants/')),
+                ('width', models.PositiveIntegerField(default=0)),
+                ('height', models.PositiveIntegerField(default=0)),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='screenshot_variants', to='tracker.task')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='screenshotvariant',
+            constraint=models.UniqueConstraint(fields=('task', 'kind'), name='unique_variant_per_task'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.17 on 2026-10-18 17:32
+
+import hashlib
+
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+from django.db.models import Count
+import tracker.storage
+
+
+def backfill_blobs(apps, schema_editor):
+    # Files uploaded before content addressing keep their names; they get a
+    # Blob row so deleting their last task reclaims them as well.
+    Task = apps.get_model('tracker', 'Task')
+    Blob = apps.get_model('tracker', 'Blob')
+    rows = []
+    referenced = (
+        Task.objects.exclude(screenshots='').exclude(screenshots__isnull=True)
+        .values_list('screenshots').annotate(total=Count('pk'))
+    )
+    for name, total in referenced:
+        sha256, size = '', 0
+        if default_storage.exists(name):
+            digest = hashlib.sha256()
+            with default_storage.open(name, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+            sha256, size = digest.hexdigest(), default_storage.size(name)
+        rows.append(Blob(name=name, sha256=sha256, size=size, refcount=total))
+    Blob.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0015_upload_session'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('sha256', models.CharField(blank=True, db_index=True, max_length=64)),
+                ('size', models.BigIntegerField(default=0)),
+                ('refcount', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='screenshots',
+            field=models.ImageField(blank=True, null=True, storage=tracker.storage.ContentAddressedStorage(), upload_to='task_screenshots/'),
+        ),
+        migrations.RunPython(backfill_blobs, migrations.RunPython.noop),
+    ]
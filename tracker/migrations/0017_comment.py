@@ -0,0 +1,58 @@
+# Generated by Django 4.2.17 on 2026-10-18 17:34
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def split_comment_blobs(apps, schema_editor):
+    # The old field was free text with no author or time, so each non-empty
+    # blob becomes one comment.
+    Task = apps.get_model('tracker', 'Task')
+    Comment = apps.get_model('tracker', 'Comment')
+    rows = (
+        Comment(task_id=pk, body=text.strip())
+        for pk, text in Task.objects.exclude(comments='').values_list('pk', 'comments').iterator()
+        if text.strip()
+    )
+    Comment.objects.bulk_create(rows, batch_size=1000)
+
+
+def join_comment_blobs(apps, schema_editor):
+    Task = apps.get_model('tracker', 'Task')
+    Comment = apps.get_model('tracker', 'Comment')
+    threads = {}
+    for task_id, body in Comment.objects.order_by('created_at', 'pk').values_list('task_id', 'body').iterator():
+        threads.setdefault(task_id, []).append(body)
+    for task_id, bodies in threads.items():
+        Task.objects.filter(pk=task_id).update(comments='\n\n'.join(bodies))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tracker', '0016_blob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Comment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('body', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('author', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='task_comments', to=settings.AUTH_USER_MODEL)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='tracker.task')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['task', 'created_at'], name='comment_task_created_idx')],
+            },
+        ),
+        migrations.RunPython(split_comment_blobs, join_comment_blobs),
+        migrations.RemoveField(
+            model_name='task',
+            name='comments',
+        ),
+    ]
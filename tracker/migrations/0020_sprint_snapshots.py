@@ -0,0 +1,48 @@
+# Generated by Django 4.2.17 on 2026-10-18 18:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tracker', '0019_change'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SprintSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_count', models.IntegerField(default=0, editable=False)),
+                ('to_do_count', models.IntegerField(default=0, editable=False)),
+                ('in_progress_count', models.IntegerField(default=0, editable=False)),
+                ('completed_count', models.IntegerField(default=0, editable=False)),
+                ('date', models.DateField()),
+                ('sprint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='tracker.sprint')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AssigneeSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_count', models.IntegerField(default=0, editable=False)),
+                ('to_do_count', models.IntegerField(default=0, editable=False)),
+                ('in_progress_count', models.IntegerField(default=0, editable=False)),
+                ('completed_count', models.IntegerField(default=0, editable=False)),
+                ('snapshot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignees', to='tracker.sprintsnapshot')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sprint_snapshots', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='sprintsnapshot',
+            constraint=models.UniqueConstraint(fields=('sprint', 'date'), name='unique_snapshot_per_sprint_day'),
+        ),
+        migrations.AddConstraint(
+            model_name='assigneesnapshot',
+            constraint=models.UniqueConstraint(fields=('snapshot', 'user'), name='unique_assignee_per_snapshot'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.17 on 2026-10-18 18:36
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_blocked(apps, schema_editor):
+    """Store the 'blocked' slug add_task used to save as is, and count it."""
+    Project = apps.get_model('tracker', 'Project')
+    Sprint = apps.get_model('tracker', 'Sprint')
+    Task = apps.get_model('tracker', 'Task')
+
+    Task.objects.filter(status='blocked').update(status='Blocked')
+    Sprint.objects.update(blocked_count=Coalesce(
+        Subquery(
+            Task.objects.filter(sprint=OuterRef('pk'), status='Blocked')
+            .values('sprint')
+            .annotate(total=Count('pk'))
+            .values('total')[:1],
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    ))
+    Project.objects.update(blocked_count=Coalesce(
+        Subquery(
+            Sprint.objects.filter(project=OuterRef('pk'))
+            .values('project')
+            .annotate(total=Sum('blocked_count'))
+            .values('total')[:1],
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0021_change_sequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assigneesnapshot',
+            name='blocked_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='blocked_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='sprint',
+            name='blocked_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='sprintsnapshot',
+            name='blocked_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='status',
+            field=models.CharField(choices=[('To Do', 'To Do'), ('In Progress', 'In Progress'), ('Blocked', 'Blocked'), ('Completed', 'Completed')], default='To Do', max_length=20),
+        ),
+        migrations.RunPython(backfill_blocked, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 4.2.17 on 2026-10-18 18:42
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0023_upload_claim'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='ChangeSequence',
+        ),
+    ]
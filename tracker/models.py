@@ -1,9 +1,25 @@
-from django.db import models
+import uuid
+
+from django.db import models, router, transaction
 from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .storage import ContentAddressedStorage
+
+
+# Version stamps for conditional GETs (ETag / Last-Modified). Bumped by
+# tracker.versions whenever something shown on the object's pages changes.
+class VersionStamp(models.Model):
+    version = models.PositiveBigIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        abstract = True
 
 
 # Account Model
-class Account(models.Model):
+class Account(VersionStamp):
     name = models.CharField(max_length=255, unique=True)
     description = models.TextField()
     owner = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="accounts")
@@ -12,25 +28,75 @@ class Account(models.Model):
         return self.name
 
 
+# Denormalized task counters shared by Sprint and Project. They are kept in
+# step with Task rows by tracker.counters and can be rebuilt with the
+# rebuild_task_counters management command.
+class TaskCounters(models.Model):
+    task_count = models.IntegerField(default=0, editable=False)
+    to_do_count = models.IntegerField(default=0, editable=False)
+    in_progress_count = models.IntegerField(default=0, editable=False)
+    blocked_count = models.IntegerField(default=0, editable=False)
+    completed_count = models.IntegerField(default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def progress(self):
+        """Percentage of tasks completed."""
+        return round(100 * self.completed_count / self.task_count) if self.task_count else 0
+
+
+# QuerySets with named column profiles: "list" skips the large text columns
+# that list pages never display, "detail" loads the full row.
+class ProfiledQuerySet(models.QuerySet):
+    # profile name: ('only' or 'defer', field names)
+    field_profiles = {}
+
+    def profile(self, name):
+        method, fields = self.field_profiles[name]
+        return getattr(self, method)(*fields)
+
+    def for_list(self):
+        return self.profile('list')
+
+    def for_detail(self):
+        return self.profile('detail')
+
+
+class ProjectQuerySet(ProfiledQuerySet):
+    field_profiles = {
+        # account__description only applies when the account is select_related.
+        'list': ('defer', ('description', 'account__description')),
+        'detail': ('defer', ()),
+    }
+
+
 # Project Model
-class Project(models.Model):
+class Project(TaskCounters, VersionStamp):
     name = models.CharField(max_length=255)
     description = models.TextField()
     account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name="projects")
     owner = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="projects")
     participants = models.ManyToManyField(User, related_name="project_participants", blank=True)
 
+    objects = ProjectQuerySet.as_manager()
+
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=['account', 'name'], name='unique_project_per_account')
         ]
+        indexes = [
+            # Changelist: owner's projects narrowed by the account filter.
+            models.Index(fields=['owner', 'account'], name='project_owner_account_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
 
 # Sprint Model
-class Sprint(models.Model):
+class Sprint(TaskCounters, VersionStamp):
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name="sprints")
     name = models.CharField(max_length=255)
     start_date = models.DateField()
@@ -49,32 +115,247 @@ class Sprint(models.Model):
 class Task(models.Model):
     TO_DO = 'To Do'
     IN_PROGRESS = 'In Progress'
+    BLOCKED = 'Blocked'
     COMPLETED = 'Completed'
     
     TASK_STATUS_CHOICES = [
         (TO_DO, 'To Do'),
         (IN_PROGRESS, 'In Progress'),
+        (BLOCKED, 'Blocked'),
         (COMPLETED, 'Completed'),
     ]
-    
+
+    # Slugs sent by the sprint planning UI for each stored status.
+    STATUS_ALIASES = {
+        'to-do': TO_DO,
+        'in-progress': IN_PROGRESS,
+        'blocked': BLOCKED,
+        'completed': COMPLETED,
+    }
+
     sprint = models.ForeignKey(Sprint, on_delete=models.CASCADE, related_name="tasks")
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     assigned_to = models.ManyToManyField(User)
     due_date = models.DateField()
     status = models.CharField(max_length=20, choices=TASK_STATUS_CHOICES, default=TO_DO)
-    comments = models.TextField(blank=True)
-    screenshots = models.ImageField(upload_to='task_screenshots/', blank=True, null=True)
+    screenshots = models.ImageField(upload_to='task_screenshots/', storage=ContentAddressedStorage(), blank=True, null=True)
 
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=['sprint', 'title'], name='unique_task_per_sprint')
         ]
+        indexes = [
+            # Board views: a sprint's tasks in one status, ordered by due date.
+            models.Index(fields=['sprint', 'status', 'due_date'], name='task_sprint_status_due_idx'),
+            # Cross-sprint "due soon" / overdue lookups.
+            models.Index(fields=['due_date'], name='task_due_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.sprint.name} - {self.title}"
 
+    # Counter column on Sprint and Project for each stored status.
+    STATUS_COUNTER_FIELDS = {
+        TO_DO: 'to_do_count',
+        IN_PROGRESS: 'in_progress_count',
+        BLOCKED: 'blocked_count',
+        COMPLETED: 'completed_count',
+    }
+
+    @classmethod
+    def normalize_status(cls, status):
+        """Return the stored value for a status or UI slug, or None if it is unknown."""
+        if status in dict(cls.TASK_STATUS_CHOICES):
+            return status
+        return cls.STATUS_ALIASES.get(status)
+
+    def save(self, *args, **kwargs):
+        # The counter signals (tracker.signals) lock the stored row in
+        # pre_save and adjust the counters in post_save; one transaction
+        # holds the lock in between.
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            super().save(*args, **kwargs)
+
     def reassign_task(self, new_assignee):
         self.assigned_to = new_assignee
         self.save()
 
+
+
+
+# A single comment on a task. Threads are read a page at a time (see
+# views.task_comments) instead of riding along with every Task load.
+class Comment(models.Model):
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="comments")
+    author = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="task_comments")
+    body = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['task', 'created_at'], name='comment_task_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task_id} - {self.body[:50]}"
+
+
+# Resized copies of Task.screenshots, generated in the background by
+# tracker.media so list views never have to ship the full-resolution upload.
+class ScreenshotVariant(models.Model):
+    THUMBNAIL = 'thumbnail'
+    THUMBNAIL_WEBP = 'thumbnail_webp'
+    WEBP = 'webp'
+
+    KIND_CHOICES = [
+        (THUMBNAIL, 'Thumbnail (JPEG)'),
+        (THUMBNAIL_WEBP, 'Thumbnail (WebP)'),
+        (WEBP, 'Full size (WebP)'),
+    ]
+
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="screenshot_variants")
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    source = models.CharField(max_length=255)  # name of the original the variant was made from
+    image = models.ImageField(upload_to='task_screenshots/variants/')
+    width = models.PositiveIntegerField(default=0)
+    height = models.PositiveIntegerField(default=0)
+    size = models.PositiveIntegerField(default=0)  # bytes
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'kind'], name='unique_variant_per_task')
+        ]
+
+    def __str__(self):
+        return f"{self.task_id} - {self.kind}"
+
+
+# A resumable, chunked upload of a file that will be attached to a Task.
+# Chunks are appended to a partial file on disk (see tracker.uploads); the row
+# only tracks how many bytes have arrived.
+class UploadSession(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="upload_sessions")
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    sha256 = models.CharField(max_length=64)
+    received = models.BigIntegerField(default=0)
+    # Set while a request writes the chunk at ``received``; see tracker.uploads.write_chunk.
+    claim = models.UUIDField(null=True, blank=True, editable=False)
+    claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
+    completed = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
+
+
+# One stored attachment file and the number of tasks pointing at it. Files are
+# content-addressed (see tracker.storage), so tasks with the same screenshot
+# share a Blob; tracker.blobs deletes the file once the last task lets go.
+class Blob(models.Model):
+    name = models.CharField(max_length=255, unique=True)  # storage name, as in Task.screenshots
+    sha256 = models.CharField(max_length=64, db_index=True, blank=True)
+    size = models.BigIntegerField(default=0)
+    refcount = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount})"
+
+# User search index: one row per searchable lowercase term of a user, so
+# autocomplete can run an indexed prefix range scan instead of a LIKE '%q%'
+# table scan. Maintained by tracker.search.
+class UserSearchTerm(models.Model):
+    FULL_NAME = 1
+    FIRST_NAME = 2
+    USERNAME = 3
+    OTHER_NAME = 4
+
+    WEIGHT_CHOICES = [
+        (FULL_NAME, 'Full name'),
+        (FIRST_NAME, 'First name'),
+        (USERNAME, 'Username'),
+        (OTHER_NAME, 'Other name part'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="search_terms")
+    term = models.CharField(max_length=255)
+    weight = models.PositiveSmallIntegerField(choices=WEIGHT_CHOICES)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['term', 'weight', 'user'], name='user_search_term_idx'),
+        ]
+
+    def __str__(self):
+        return self.term
+
+
+# Append-only feed of task, sprint and project changes (tracker.changes). The
+# auto-increment id is the sequence number clients resume from.
+class Change(models.Model):
+    TASK = 'task'
+    SPRINT = 'sprint'
+    PROJECT = 'project'
+
+    KIND_CHOICES = [
+        (TASK, 'Task'),
+        (SPRINT, 'Sprint'),
+        (PROJECT, 'Project'),
+    ]
+
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+
+    ACTION_CHOICES = [
+        (CREATED, 'Created'),
+        (UPDATED, 'Updated'),
+        (DELETED, 'Deleted'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    data = models.JSONField(default=dict, encoder=DjangoJSONEncoder)  # the row's fields after the change
+    created_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"#{self.pk} {self.kind} {self.object_id} {self.action}"
+
+
+# Daily task counts of a running sprint, appended by the snapshot_sprints
+# command. tracker.analytics draws burndowns and velocity from these rows
+# instead of replaying task history.
+class SprintSnapshot(TaskCounters):
+    sprint = models.ForeignKey(Sprint, on_delete=models.CASCADE, related_name="snapshots")
+    date = models.DateField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['sprint', 'date'], name='unique_snapshot_per_sprint_day')
+        ]
+
+    def __str__(self):
+        return f"{self.sprint_id} - {self.date}"
+
+
+# The same counts over one assignee's tasks, taken with a SprintSnapshot.
+class AssigneeSnapshot(TaskCounters):
+    snapshot = models.ForeignKey(SprintSnapshot, on_delete=models.CASCADE, related_name="assignees")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="sprint_snapshots")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['snapshot', 'user'], name='unique_assignee_per_snapshot')
+        ]
+
+    def __str__(self):
+        return f"{self.snapshot_id} - {self.user_id}"
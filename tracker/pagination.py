@@ -0,0 +1,92 @@
+import base64
+import datetime
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 10000
+STREAM_CHUNK_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(value, pk):
+    """Encode a (date or datetime, id) keyset position as an opaque URL-safe token."""
+    raw = f'{value.isoformat()}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, parse=datetime.date.fromisoformat):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        value, pk = raw.split('|')
+        return parse(value), int(pk)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor("Invalid cursor.") from e
+
+
+def page_size(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    try:
+        size = int(value) if value else default
+    except ValueError:
+        size = default
+    return max(1, min(size, maximum))
+
+
+def keyset_page(queryset, cursor, limit, field='due_date', descending=False, parse=datetime.date.fromisoformat):
+    """
+    Return the slice of ``queryset`` after ``cursor`` ordered by (``field``, id),
+    newest first when ``descending``. One extra row is fetched so the caller
+    can tell whether a next page exists.
+    """
+    lookup = 'lt' if descending else 'gt'
+    if cursor:
+        value, pk = decode_cursor(cursor, parse)
+        queryset = queryset.filter(Q(**{f'{field}__{lookup}': value}) | Q(**{field: value, f'pk__{lookup}': pk}))
+    prefix = '-' if descending else ''
+    return queryset.order_by(f'{prefix}{field}', f'{prefix}pk')[:limit + 1]
+
+
+def stream_json_rows(rows, limit, key, field='due_date', enrich=None, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Yield ``{"<key>": [...], "next_cursor": ...}`` piece by piece from an
+    iterator of ``.values()`` dicts that holds at most ``limit + 1`` rows.
+    The next cursor is built from the last row's ``field`` and ``id``, the
+    ordering given to keyset_page().
+
+    ``enrich`` is called with each chunk of rows before it is written, so
+    related data can be fetched with one query per chunk rather than per row.
+    """
+    encoder = DjangoJSONEncoder()
+    yield f'{{"{key}": ['
+    written = 0
+    last = None
+    has_more = False
+    chunk = []
+
+    def flush(chunk, first):
+        if enrich:
+            enrich(chunk)
+        body = ','.join(encoder.encode(row) for row in chunk)
+        return body if first else ',' + body
+
+    for row in rows:
+        if written + len(chunk) == limit:
+            has_more = True
+            break
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            last = chunk[-1]
+            yield flush(chunk, written == 0)
+            written += len(chunk)
+            chunk = []
+    if chunk:
+        last = chunk[-1]
+        yield flush(chunk, written == 0)
+
+    next_cursor = encode_cursor(last[field], last['id']) if has_more and last else None
+    yield f'], "next_cursor": {json.dumps(next_cursor)}}}'
@@ -0,0 +1,237 @@
+import asyncio
+import json
+import re
+import threading
+from importlib import import_module
+from urllib.parse import urlsplit
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.signals import setting_changed
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .models import Project, Sprint
+
+DEFAULT_BROKER = 'tracker.realtime.InProcessBroker'
+DEFAULT_MAX_QUEUE = 1000
+COUNTER_FIELDS = ('task_count', 'to_do_count', 'in_progress_count', 'blocked_count', 'completed_count')
+RESYNC_MESSAGE = json.dumps({'type': 'resync'})
+
+# /ws/projects/<id>/ and /ws/sprints/<id>/
+SOCKET_PATH_RE = re.compile(r'^/ws/(?P<kind>projects|sprints)/(?P<pk>\d+)/$')
+
+
+def project_channel(project_id):
+    return f'project:{project_id}'
+
+
+def sprint_channel(sprint_id):
+    return f'sprint:{sprint_id}'
+
+
+class Subscription:
+    """JSON messages for one websocket, read with ``async for`` on the loop that subscribed."""
+
+    def __init__(self, broker, channels, max_queue):
+        self.broker = broker
+        self.channels = channels
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(max_queue)
+
+    def deliver(self, message):
+        # Runs on self.loop. A client too slow to keep up is told to reload
+        # its board rather than letting the queue grow without bound.
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC_MESSAGE)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """
+    Fan messages out to the websockets connected to this process. publish()
+    may be called from any thread, e.g. a sync view's on_commit callback.
+    With several server processes, configure a broker backed by a shared
+    service instead; it only needs the same subscribe/unsubscribe/publish
+    methods.
+    """
+
+    def __init__(self, max_queue=None):
+        self.max_queue = max_queue or getattr(settings, 'TRACKER_REALTIME_MAX_QUEUE', DEFAULT_MAX_QUEUE)
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channels):
+        subscription = Subscription(self, tuple(channels), self.max_queue)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscriptions.get(channel)
+                if subscribers:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[channel]
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscriptions.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, message)
+            except RuntimeError:
+                self.unsubscribe(subscription)  # its event loop has shut down
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """The broker named by TRACKER_REALTIME_BROKER, created once per process."""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(getattr(settings, 'TRACKER_REALTIME_BROKER', DEFAULT_BROKER))()
+        return _broker
+
+
+@receiver(setting_changed)
+def reset_broker(setting, **kwargs):
+    global _broker
+    if setting in ('TRACKER_REALTIME_BROKER', 'TRACKER_REALTIME_MAX_QUEUE'):
+        with _broker_lock:
+            _broker = None
+
+
+# Publishing ------------------------------------------------------------------
+
+def task_payload(task):
+    return {
+        'id': task.pk,
+        'sprint_id': task.sprint_id,
+        'title': task.title,
+        'status': task.status,
+        'due_date': task.due_date,
+    }
+
+
+def _broadcast(sprint_id, events):
+    sprint = Sprint.objects.filter(pk=sprint_id).values('project_id', *COUNTER_FIELDS).first()
+    if sprint is None:
+        return  # deleted in the same transaction; the sprint page is gone anyway
+    project_id = sprint.pop('project_id')
+    # Encoded once here, not once per subscriber.
+    messages = [
+        json.dumps({**event, 'project_id': project_id, 'sprint': {'id': sprint_id, **sprint}}, cls=DjangoJSONEncoder)
+        for event in events
+    ]
+    broker = get_broker()
+    for channel in (project_channel(project_id), sprint_channel(sprint_id)):
+        for message in messages:
+            broker.publish(channel, message)
+
+
+def publish_task_events(sprint_id, events):
+    """
+    Send ``events`` (dicts with a ``type``) to the sprint's and its project's
+    channels once the current transaction commits, along with the sprint's
+    fresh task counters.
+    """
+    transaction.on_commit(lambda: _broadcast(sprint_id, events))
+
+
+# Websocket endpoint ----------------------------------------------------------
+
+def _headers(scope):
+    return {name.decode('latin1').lower(): value.decode('latin1') for name, value in scope.get('headers', [])}
+
+
+def _same_origin(headers):
+    # Browsers send Origin on websocket handshakes; refuse other sites, which
+    # would otherwise ride on the user's session cookie.
+    origin = headers.get('origin')
+    return origin is None or urlsplit(origin).netloc == headers.get('host')
+
+
+def _allowed_channel(headers, kind, pk):
+    """The channel the session's user may follow, or None."""
+    close_old_connections()
+    try:
+        cookies = dict(
+            part.strip().split('=', 1) for part in headers.get('cookie', '').split(';') if '=' in part
+        )
+        session_key = cookies.get(settings.SESSION_COOKIE_NAME)
+        if not session_key:
+            return None
+        session = import_module(settings.SESSION_ENGINE).SessionStore(session_key)
+        user = User.objects.filter(pk=session.get(SESSION_KEY), is_active=True).first()
+        if user is None:
+            return None
+        if kind == 'sprints':
+            project_id = Sprint.objects.filter(pk=pk).values_list('project_id', flat=True).first()
+            channel = sprint_channel(pk)
+        else:
+            project_id, channel = pk, project_channel(pk)
+        members = Project.objects.filter(pk=project_id)
+        if not user.is_superuser:
+            members = members.filter(Q(owner=user) | Q(participants=user))
+        return channel if project_id is not None and members.exists() else None
+    finally:
+        close_old_connections()
+
+
+async def websocket_application(scope, receive, send):
+    """
+    ASGI app for board sockets. After the handshake the server only sends:
+    one JSON message per task event on the project or sprint.
+    """
+    match = SOCKET_PATH_RE.match(scope['path'])
+    event = await receive()
+    if event['type'] != 'websocket.connect':
+        return
+    headers = _headers(scope)
+    channel = None
+    if match and _same_origin(headers):
+        channel = await sync_to_async(_allowed_channel)(headers, match['kind'], int(match['pk']))
+    if channel is None:
+        await send({'type': 'websocket.close', 'code': 4403})
+        return
+
+    subscription = get_broker().subscribe([channel])
+    await send({'type': 'websocket.accept'})
+
+    async def forward():
+        async for message in subscription:
+            await send({'type': 'websocket.send', 'text': message})
+
+    forwarder = asyncio.ensure_future(forward())
+    try:
+        while True:
+            event = await receive()
+            if event['type'] == 'websocket.disconnect':
+                break
+    finally:
+        forwarder.cancel()
+        subscription.close()
@@ -0,0 +1,140 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Requests after a write are pinned to the primary for this many seconds so
+# users read their own writes despite replication lag.
+PIN_COOKIE = 'tracker_pin_primary'
+DEFAULT_PIN_SECONDS = 5
+
+_replica_reads = ContextVar('tracker_replica_reads', default=False)
+_request_state = ContextVar('tracker_request_state', default=None)
+
+
+def _target(alias):
+    settings_dict = connections[alias].settings_dict
+    return settings_dict['NAME'], settings_dict.get('HOST'), settings_dict.get('PORT')
+
+
+def replica_aliases():
+    """
+    Configured replicas, skipping any that resolve to the primary database
+    itself (e.g. TEST mirrors under the test runner).
+    """
+    primary = _target(DEFAULT_DB_ALIAS)
+    return [alias for alias in getattr(settings, 'TRACKER_DB_REPLICAS', ()) if _target(alias) != primary]
+
+
+def pin_seconds():
+    return getattr(settings, 'TRACKER_PRIMARY_PIN_SECONDS', DEFAULT_PIN_SECONDS)
+
+
+def read_database():
+    """The alias reads should use right now: a replica inside a read-only view, else the primary."""
+    if not _replica_reads.get():
+        return DEFAULT_DB_ALIAS
+    state = _request_state.get()
+    if state and (state['pinned'] or state['wrote']):
+        return DEFAULT_DB_ALIAS
+    replicas = replica_aliases()
+    return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def replica_reads():
+    """Let reads inside the block go to a replica."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def read_only_view(view):
+    """Decorator for views (sync or async) that only read and can tolerate replication lag."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            with replica_reads():
+                return await view(request, *args, **kwargs)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with replica_reads():
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    """
+    Send reads from read-only views to a replica from TRACKER_DB_REPLICAS and
+    everything else, including every write, to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return read_database()
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state['wrote'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+
+class PrimaryPinningMiddleware:
+    """
+    Pin a client to the primary for a short window after it writes, using a
+    cookie so no session lookup is needed to decide where to read.
+    Async-capable, so it does not push async views onto a thread under ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = self.request_state(request)
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        return self.pin(request, state, response)
+
+    async def __acall__(self, request):
+        state = self.request_state(request)
+        token = _request_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        return self.pin(request, state, response)
+
+    def request_state(self, request):
+        try:
+            pinned_until = float(request.COOKIES.get(PIN_COOKIE, 0))
+        except ValueError:
+            pinned_until = 0
+        return {'pinned': pinned_until > time.time(), 'wrote': False}
+
+    def pin(self, request, state, response):
+        if state['wrote'] or request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            seconds = pin_seconds()
+            response.set_cookie(PIN_COOKIE, str(time.time() + seconds), max_age=seconds, httponly=True, samesite='Lax')
+        return response
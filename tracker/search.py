@@ -0,0 +1,98 @@
+from django.contrib.auth.models import User
+
+from .models import UserSearchTerm
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+# Upper bound for a prefix range scan: sorts after every other code point.
+PREFIX_END = chr(0x10FFFF)
+
+
+def normalize(text):
+    return ' '.join((text or '').lower().split())
+
+
+def user_terms(first_name, last_name, username):
+    """Return the (term, weight) pairs a user is searchable by."""
+    full_name = normalize(f'{first_name} {last_name}')
+    terms = {}
+
+    def add(term, weight):
+        if term and weight < terms.get(term, UserSearchTerm.OTHER_NAME + 1):
+            terms[term] = weight
+
+    add(full_name, UserSearchTerm.FULL_NAME)
+    parts = full_name.split()
+    if parts:
+        add(parts[0], UserSearchTerm.FIRST_NAME)
+    add(normalize(username), UserSearchTerm.USERNAME)
+    for part in parts[1:]:
+        add(part, UserSearchTerm.OTHER_NAME)
+    return sorted(terms.items())
+
+
+def index_user(user):
+    """Replace the search terms of a single user."""
+    UserSearchTerm.objects.filter(user=user).delete()
+    UserSearchTerm.objects.bulk_create([
+        UserSearchTerm(user=user, term=term[:255], weight=weight)
+        for term, weight in user_terms(user.first_name, user.last_name, user.username)
+    ])
+
+
+def rebuild_user_search_index(batch_size=2000):
+    """Rebuild the whole index from the User table; returns the number of users indexed."""
+    UserSearchTerm.objects.all().delete()
+    batch = []
+    count = 0
+    for pk, first_name, last_name, username in User.objects.values_list(
+        'pk', 'first_name', 'last_name', 'username'
+    ).iterator(chunk_size=batch_size):
+        batch.extend(
+            UserSearchTerm(user_id=pk, term=term[:255], weight=weight)
+            for term, weight in user_terms(first_name, last_name, username)
+        )
+        count += 1
+        if len(batch) >= batch_size:
+            UserSearchTerm.objects.bulk_create(batch)
+            batch = []
+    UserSearchTerm.objects.bulk_create(batch)
+    return count
+
+
+def search_users(query, limit=DEFAULT_LIMIT, users=None):
+    """
+    Return up to ``limit`` users whose name or username starts with ``query``,
+    best matches first: exact matches, then full-name, first-name, username
+    and other name-part prefixes.
+
+    ``users`` optionally restricts the search to a User queryset.
+    """
+    query = normalize(query)
+    if not query:
+        return []
+    limit = max(1, min(limit, MAX_LIMIT))
+
+    terms = UserSearchTerm.objects.filter(term__gte=query, term__lt=query + PREFIX_END)
+    if users is not None:
+        terms = terms.filter(user__in=users)
+
+    # One small query per relevance tier, each walking the (term, weight, user)
+    # index in order and stopping at the limit, instead of grouping every
+    # matching row; short prefixes usually fill the limit in the first tier.
+    tiers = [terms.filter(term=query)]
+    tiers += [terms.filter(weight=weight) for weight, _ in UserSearchTerm.WEIGHT_CHOICES]
+    ids = []
+    for tier in tiers:
+        for user_id in tier.order_by('term', 'user_id').values_list('user_id', flat=True)[:limit + len(ids)]:
+            if user_id not in ids:
+                ids.append(user_id)
+        if len(ids) >= limit:
+            break
+    ids = ids[:limit]
+    found = User.objects.in_bulk(ids)
+    return [found[pk] for pk in ids if pk in found]
+
+
+def user_data(user):
+    return {"id": user.id, "full_name": user.get_full_name(), "username": user.username}
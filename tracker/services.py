@@ -0,0 +1,147 @@
+import datetime
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .changes import record_tasks
+from .counters import adjust_task_counters
+from .models import Change, Sprint, Task
+from .realtime import publish_task_events, task_payload
+from .versions import bump_versions
+
+
+def resolve_users(user_ids):
+    """
+    Return a {id: User} mapping for the given ids using a single query.
+    Raises ValidationError naming any id that does not exist.
+    """
+    user_ids = {int(user_id) for user_id in user_ids}
+    users = User.objects.in_bulk(user_ids)
+    missing = sorted(user_ids - users.keys())
+    if missing:
+        raise ValidationError(f"Assigned user(s) with ID {', '.join(map(str, missing))} not found.")
+    return users
+
+
+async def aresolve_users(user_ids):
+    """Async version of resolve_users()."""
+    user_ids = {int(user_id) for user_id in user_ids}
+    users = await User.objects.ain_bulk(user_ids)
+    missing = sorted(user_ids - users.keys())
+    if missing:
+        raise ValidationError(f"Assigned user(s) with ID {', '.join(map(str, missing))} not found.")
+    return users
+
+
+def clean_date(value, label):
+    """``value`` as a date, from a date or a ``YYYY-MM-DD`` string; ValidationError otherwise."""
+    if isinstance(value, datetime.date):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.date.fromisoformat(value.strip())
+        except ValueError:
+            pass
+    raise ValidationError(f"{label} must be a date in YYYY-MM-DD format.")
+
+
+def _user_ids(value, label):
+    """An ``assigned_to`` list as ints (numeric strings are accepted); ValidationError otherwise."""
+    error = ValidationError(f"{label}: assigned_to must be a list of user ids.")
+    if not isinstance(value, list):
+        raise error
+    user_ids = []
+    for user_id in value:
+        if isinstance(user_id, str) and user_id.isdigit():
+            user_id = int(user_id)
+        if not isinstance(user_id, int) or isinstance(user_id, bool):
+            raise error
+        user_ids.append(user_id)
+    return user_ids
+
+
+def bulk_create_tasks(sprint, tasks, batch_size=500):
+    """
+    Create many tasks for a sprint with one INSERT per batch for the Task rows
+    and one per batch for their assignee rows.
+
+    ``tasks`` is an iterable of dicts with a required ``title`` and optional
+    ``description``, ``due_date`` (defaults to the sprint end date),
+    ``status`` and ``assigned_to`` (a list of user ids). Malformed entries
+    raise ValidationError naming the task.
+    Must be called inside a transaction so a bad row rolls back the batch.
+    """
+    rows = []
+    assignments = []
+    for index, data in enumerate(tasks):
+        label = f"Task #{index + 1}"
+        if not isinstance(data, dict):
+            raise ValidationError(f"{label}: must be an object.")
+        title, description, status = data.get('title'), data.get('description') or '', data.get('status') or Task.TO_DO
+        if not isinstance(title, str) or not title.strip():
+            raise ValidationError(f"{label}: title is required.")
+        if not isinstance(description, str):
+            raise ValidationError(f"{label}: description must be text.")
+        status = Task.normalize_status(status) if isinstance(status, str) else None
+        if status is None:
+            raise ValidationError(f"{label}: invalid status {data.get('status')!r}.")
+        due_date = data.get('due_date')
+        rows.append(Task(
+            sprint=sprint,
+            title=title.strip(),
+            description=description,
+            due_date=clean_date(due_date, f"{label}: due_date") if due_date else sprint.end_date,
+            status=status,
+        ))
+        assignments.append(_user_ids(data.get('assigned_to') or [], label))
+
+    titles = [task.title for task in rows]
+    if len(set(titles)) != len(titles):
+        raise ValidationError("Task titles must be unique within a sprint.")
+    if Task.objects.filter(sprint=sprint, title__in=titles).exists():
+        raise ValidationError("A task with one of these titles already exists in this sprint.")
+
+    resolve_users({user_id for user_ids in assignments for user_id in user_ids})
+
+    created = Task.objects.bulk_create(rows, batch_size=batch_size)
+    Through = Task.assigned_to.through
+    Through.objects.bulk_create(
+        [
+            Through(task_id=task.pk, user_id=user_id)
+            for task, user_ids in zip(created, assignments)
+            for user_id in set(user_ids)
+        ],
+        batch_size=batch_size,
+    )
+    # bulk_create skips post_save and m2m_changed, so the counters, version
+    # stamps and change feed are updated and board clients notified once for
+    # the batch, with the assignees in place.
+    adjust_task_counters(sprint.pk, Counter(task.status for task in created))
+    bump_versions(sprint_ids=[sprint.pk])
+    record_tasks(created, Change.CREATED)
+    publish_task_events(sprint.pk, [{'type': 'tasks.created', 'tasks': [task_payload(task) for task in created]}])
+    return created
+
+
+def create_sprint_with_tasks(project, name, start_date, end_date, tasks=()):
+    """
+    Create a sprint and its tasks atomically. Dates are dates or
+    ``YYYY-MM-DD`` strings; any invalid input raises ValidationError.
+    """
+    name = name.strip() if isinstance(name, str) else ''
+    if not name:
+        raise ValidationError("Sprint name is required.")
+    start_date = clean_date(start_date, "Start date")
+    end_date = clean_date(end_date, "End date")
+    if end_date < start_date:
+        raise ValidationError("End date must not be before the start date.")
+    if not isinstance(tasks, (list, tuple)):
+        raise ValidationError("Tasks must be a list.")
+    with transaction.atomic():
+        if Sprint.objects.filter(project=project, name=name).exists():
+            raise ValidationError("The sprint with the sprint name already exists for this project.")
+        sprint = Sprint.objects.create(project=project, name=name, start_date=start_date, end_date=end_date)
+        created = bulk_create_tasks(sprint, tasks)
+    return sprint, created
@@ -0,0 +1,327 @@
+from django.contrib.auth.models import User
+from django.db.models import Q, QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete, pre_save
+from django.db import transaction
+from django.dispatch import receiver
+
+from . import changes
+from .blobs import release, retain
+from .counters import adjust_task_counters, subtract_sprint_counters
+from .media import enqueue_screenshot_processing
+from .models import Account, Change, Project, ScreenshotVariant, Sprint, Task
+from .realtime import publish_task_events, task_payload
+from .search import index_user
+from .versions import bump_versions
+
+NAME_FIELDS = {'first_name', 'last_name', 'username'}
+
+
+def _user_project_ids(user):
+    return list(Project.objects.filter(
+        Q(owner=user) | Q(participants=user)
+    ).values_list('pk', flat=True).distinct())
+
+
+@receiver(post_save, sender=User)
+def refresh_user_names(sender, instance, update_fields=None, raw=False, **kwargs):
+    # Saves that only touch unrelated fields (e.g. last_login on every login)
+    # leave the search terms as they are.
+    if raw or (update_fields is not None and not NAME_FIELDS.intersection(update_fields)):
+        return
+    index_user(instance)
+    # Participant directories and sprint pages show the names; both are
+    # keyed on the project version stamps.
+    bump_versions(project_ids=_user_project_ids(instance))
+
+
+@receiver(pre_delete, sender=User)
+def bump_versions_on_user_delete(sender, instance, **kwargs):
+    # The cascade drops the user from owners and participants without
+    # sending post_save or m2m_changed.
+    bump_versions(project_ids=_user_project_ids(instance))
+
+
+# Task counters ---------------------------------------------------------------
+# Counters move from the (sprint, status) the row was stored with, read under a
+# row lock in the saving transaction (see Task.save), not from the instance,
+# which may be stale or have the fields deferred.
+
+COUNTED_FIELDS = (('sprint', 'sprint_id'), ('status', 'status'))
+
+
+def _deleted_with(origin, *models):
+    """Whether a delete cascaded from an instance or queryset of one of ``models``."""
+    if isinstance(origin, QuerySet):
+        return issubclass(origin.model, models)
+    return isinstance(origin, models)
+
+
+def _stored_state(task, using):
+    return (
+        Task.objects.using(using).select_for_update().filter(pk=task.pk)
+        .values_list('sprint_id', 'status').first()
+    )
+
+
+def _saved_fields(task, update_fields):
+    """For each counted field, whether this save writes it: deferred fields and those left out of update_fields are not."""
+    return [
+        attname in task.__dict__ and (update_fields is None or name in update_fields or attname in update_fields)
+        for name, attname in COUNTED_FIELDS
+    ]
+
+
+@receiver(pre_save, sender=Task)
+def lock_counted_state(sender, instance, using=None, update_fields=None, **kwargs):
+    instance._counted_state = None
+    if not instance._state.adding and any(_saved_fields(instance, update_fields)):
+        instance._counted_state = _stored_state(instance, using)
+
+
+@receiver(post_save, sender=Task)
+def update_counters_on_save(sender, instance, created, update_fields=None, **kwargs):
+    old = None if created else instance.__dict__.pop('_counted_state', None)
+    if old is None and not created:
+        return  # the save wrote neither field
+    saved = _saved_fields(instance, update_fields)
+    new = tuple(instance.__dict__[attname] if saved[n] else old[n] for n, (_, attname) in enumerate(COUNTED_FIELDS))
+    if old == new:
+        return
+    if old:
+        adjust_task_counters(old[0], {old[1]: -1})
+    adjust_task_counters(new[0], {new[1]: 1})
+
+
+@receiver(pre_delete, sender=Task)
+def update_counters_on_delete(sender, instance, origin=None, using=None, **kwargs):
+    # Cascades from a sprint or project remove the counters with their owner.
+    if _deleted_with(origin, Sprint, Project):
+        return
+    stored = _stored_state(instance, using)
+    if stored:
+        adjust_task_counters(stored[0], {stored[1]: -1})
+
+
+@receiver(pre_delete, sender=Sprint)
+def update_counters_on_sprint_delete(sender, instance, origin=None, **kwargs):
+    if _deleted_with(origin, Project):
+        return
+    subtract_sprint_counters(instance.pk)
+
+
+# Screenshots -----------------------------------------------------------------
+
+def _screenshot_name(task):
+    value = task.__dict__.get('screenshots')
+    return getattr(value, 'name', value) or None
+
+
+@receiver(post_init, sender=Task)
+def remember_screenshot(sender, instance, **kwargs):
+    instance._screenshot_name = _screenshot_name(instance) if instance.pk else None
+
+
+@receiver(post_save, sender=Task)
+def process_new_screenshot(sender, instance, created, update_fields=None, **kwargs):
+    if 'screenshots' not in instance.__dict__:
+        return  # deferred, so unchanged
+    name, old = _screenshot_name(instance), instance._screenshot_name
+    if name == old:
+        return
+    instance._screenshot_name = name
+    if name:
+        retain(name)
+        enqueue_screenshot_processing(instance.pk)
+    else:
+        ScreenshotVariant.objects.filter(task=instance).delete()
+    if old:
+        release(old)
+
+
+@receiver(post_delete, sender=Task)
+def release_screenshot_on_delete(sender, instance, **kwargs):
+    # Covers delete_task and tasks removed with their sprint or project.
+    if instance._screenshot_name:
+        release(instance._screenshot_name)
+
+
+@receiver(post_delete, sender=ScreenshotVariant)
+def delete_variant_file(sender, instance, **kwargs):
+    if instance.image:
+        name, storage = instance.image.name, instance.image.storage
+        transaction.on_commit(lambda: storage.delete(name))
+
+
+# Board events ----------------------------------------------------------------
+# Pushed to websocket clients of the task's sprint and project (tracker.realtime).
+
+@receiver(post_init, sender=Task)
+def remember_published_status(sender, instance, **kwargs):
+    instance._published_status = instance.__dict__.get('status') if instance.pk else None
+
+
+@receiver(post_save, sender=Task)
+def publish_task_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    event = {'type': 'task.created' if created else 'task.updated', 'task': task_payload(instance)}
+    if not created and instance._published_status not in (None, instance.status):
+        event.update(type='task.status_changed', previous_status=instance._published_status)
+    instance._published_status = instance.status
+    publish_task_events(instance.sprint_id, [event])
+
+
+@receiver(post_delete, sender=Task)
+def publish_task_delete(sender, instance, origin=None, **kwargs):
+    # Tasks deleted with their sprint or project have no board left to update.
+    if _deleted_with(origin, Sprint, Project):
+        return
+    publish_task_events(instance.sprint_id, [{'type': 'task.deleted', 'task': {'id': instance.pk, 'sprint_id': instance.sprint_id}}])
+
+
+# Version stamps --------------------------------------------------------------
+# Bumped on every change a sprint, project or account page shows, for the
+# ETags of tracker.versions.
+
+@receiver(post_init, sender=Task)
+def remember_stamped_sprint(sender, instance, **kwargs):
+    instance._stamped_sprint = instance.__dict__.get('sprint_id') if instance.pk else None
+
+
+@receiver(post_save, sender=Task)
+def bump_versions_on_task_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # A task moved to another sprint changes both.
+    bump_versions(sprint_ids={instance._stamped_sprint, instance.sprint_id})
+    instance._stamped_sprint = instance.sprint_id
+
+
+@receiver(post_delete, sender=Task)
+def bump_versions_on_task_delete(sender, instance, origin=None, **kwargs):
+    if _deleted_with(origin, Sprint, Project):
+        return
+    bump_versions(sprint_ids=[instance.sprint_id])
+
+
+@receiver(m2m_changed, sender=Task.assigned_to.through)
+def bump_versions_on_assignment(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        bump_versions(sprint_ids=[instance.sprint_id])
+    elif action == 'pre_clear':
+        bump_versions(sprint_ids=set(instance.task_set.values_list('sprint_id', flat=True)))
+    elif pk_set:
+        bump_versions(sprint_ids=set(Task.objects.filter(pk__in=pk_set).values_list('sprint_id', flat=True)))
+
+
+@receiver(post_save, sender=ScreenshotVariant)
+def bump_versions_on_variant_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_versions(sprint_ids=Task.objects.filter(pk=instance.task_id).values_list('sprint_id', flat=True))
+
+
+@receiver(post_save, sender=Sprint)
+def bump_versions_on_sprint_save(sender, instance, created, raw=False, **kwargs):
+    # A new sprint starts with a fresh stamp.
+    if not raw and not created:
+        bump_versions(sprint_ids=[instance.pk])
+
+
+@receiver(post_delete, sender=Sprint)
+def bump_versions_on_sprint_delete(sender, instance, origin=None, **kwargs):
+    if not _deleted_with(origin, Project):
+        bump_versions(project_ids=[instance.project_id])
+
+
+@receiver(post_save, sender=Project)
+def bump_versions_on_project_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_versions(project_ids=[instance.pk])
+
+
+@receiver(m2m_changed, sender=Project.participants.through)
+def bump_versions_on_participants_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        bump_versions(project_ids=[instance.pk])
+    elif action == 'pre_clear':
+        bump_versions(project_ids=list(instance.project_participants.values_list('pk', flat=True)))
+    elif pk_set:
+        bump_versions(project_ids=pk_set)
+
+
+@receiver(post_save, sender=Account)
+def bump_versions_on_account_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_versions(account_ids=[instance.pk])
+
+
+
+# Change feed -----------------------------------------------------------------
+# Appended to tracker.changes in the same transaction as the change itself.
+
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=Sprint)
+@receiver(post_save, sender=Project)
+def record_save(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        changes.record(instance, Change.CREATED if created else Change.UPDATED)
+
+
+@receiver(pre_delete, sender=Sprint)
+def record_sprint_cascade(sender, instance, origin=None, **kwargs):
+    # The tasks go with the sprint: one bulk INSERT for all of them instead
+    # of one per post_delete.
+    if not _deleted_with(origin, Project, Account):
+        changes.record_queryset(Task.objects.filter(sprint_id=instance.pk), Change.DELETED)
+
+
+@receiver(pre_delete, sender=Project)
+def record_project_cascade(sender, instance, **kwargs):
+    changes.record_queryset(Task.objects.filter(sprint__project_id=instance.pk), Change.DELETED)
+    changes.record_queryset(Sprint.objects.filter(project_id=instance.pk), Change.DELETED)
+
+
+@receiver(post_delete, sender=Task)
+def record_task_delete(sender, instance, origin=None, **kwargs):
+    if not _deleted_with(origin, Sprint, Project, Account):
+        changes.record(instance, Change.DELETED)
+
+
+@receiver(post_delete, sender=Sprint)
+def record_sprint_delete(sender, instance, origin=None, **kwargs):
+    if not _deleted_with(origin, Project, Account):
+        changes.record(instance, Change.DELETED)
+
+
+@receiver(post_delete, sender=Project)
+def record_project_delete(sender, instance, **kwargs):
+    changes.record(instance, Change.DELETED)
+
+
+@receiver(m2m_changed, sender=Task.assigned_to.through)
+def record_assignment(sender, instance, action, reverse, pk_set, **kwargs):
+    # New assignees are an update of the task.
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        changes.record(instance, Change.UPDATED)
+    elif action == 'pre_clear':
+        changes.record_queryset(instance.task_set.all(), Change.UPDATED)
+    elif pk_set:
+        changes.record_queryset(Task.objects.filter(pk__in=pk_set), Change.UPDATED)
+
+
+@receiver(m2m_changed, sender=Project.participants.through)
+def record_participants_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        changes.record(instance, Change.UPDATED)
+    elif action == 'pre_clear':
+        changes.record_queryset(instance.project_participants.all(), Change.UPDATED)
+    elif pk_set:
+        changes.record_queryset(Project.objects.filter(pk__in=pk_set), Change.UPDATED)
@@ -0,0 +1,63 @@
+// Live sprint board: listens on the project's websocket and updates the
+// sprint progress bars when anyone creates, edits or deletes a task, so
+// other users' progress shows without reloading the page.
+document.addEventListener("DOMContentLoaded", () => {
+    if (!window.boardSocketPath || !("WebSocket" in window)) {
+        return;
+    }
+
+    window.trackerBoard = { connected: false };
+    let retryDelay = 1000;
+
+    // ========================== Sprint Card Updates ==========================
+    function updateSprintProgress(sprint) {
+        const card = document.querySelector(`.sprint-card[data-sprint-id="${sprint.id}"]`);
+        if (!card) {
+            return;
+        }
+        const progress = card.querySelector(".task-progress");
+        const bar = card.querySelector(".task-progress-bar");
+        const percent = sprint.task_count ? Math.round(100 * sprint.completed_count / sprint.task_count) : 0;
+        if (progress) {
+            progress.title = `${sprint.completed_count} of ${sprint.task_count} tasks completed`;
+        }
+        if (bar) {
+            bar.style.width = `${percent}%`;
+        }
+    }
+
+    function handleEvent(event) {
+        if (event.type === "resync") {
+            // Too many events were missed; start over from the server's state.
+            window.location.reload();
+            return;
+        }
+        if (event.sprint) {
+            updateSprintProgress(event.sprint);
+        }
+        // Other scripts can react to individual task events.
+        document.dispatchEvent(new CustomEvent("tracker:board", { detail: event }));
+    }
+
+    // ========================== Connection ==========================
+    function connect() {
+        const scheme = window.location.protocol === "https:" ? "wss" : "ws";
+        const socket = new WebSocket(`${scheme}://${window.location.host}${window.boardSocketPath}`);
+
+        socket.addEventListener("open", () => {
+            window.trackerBoard.connected = true;
+            retryDelay = 1000;
+        });
+        socket.addEventListener("message", (message) => {
+            handleEvent(JSON.parse(message.data));
+        });
+        socket.addEventListener("close", () => {
+            window.trackerBoard.connected = false;
+            // Reconnect with backoff, e.g. across a server restart.
+            setTimeout(connect, retryDelay);
+            retryDelay = Math.min(retryDelay * 2, 30000);
+        });
+    }
+
+    connect();
+});
@@ -65,7 +65,9 @@ document.addEventListener("DOMContentLoaded", () => {
                 console.log("Response data:", data); // Debugging
                 if (data.success) {
                     alert("Task saved successfully!");
-                    window.location.reload(); // Optional: Reload to refresh data
+                    // The board socket only refreshes sprint progress, so the
+                    // submitting tab still reloads to show the saved task.
+                    window.location.reload();
                 } else {
                     alert("Error saving task: " + data.error);
                 }
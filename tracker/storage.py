@@ -0,0 +1,64 @@
+import hashlib
+import os
+import posixpath
+import re
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+
+DIGEST_NAME_RE = re.compile(r'(?:^|/)[0-9a-f]{2}/([0-9a-f]{64})(?:\.[^/]*)?$')
+TEMP_NAME_RE = re.compile(r'(?:^|/)\.[0-9a-f]{32}\.tmp$')
+
+
+def content_digest(content):
+    """Hex SHA-256 of a File, read chunk by chunk."""
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def name_digest(name):
+    """The SHA-256 a content-addressed name was derived from, or '' for other names."""
+    match = DIGEST_NAME_RE.search(name or '')
+    return match.group(1) if match else ''
+
+
+def is_temp_name(name):
+    """Whether ``name`` is a file ContentAddressedStorage writes before linking it into place."""
+    return bool(TEMP_NAME_RE.search(name or ''))
+
+
+def addressed_name(directory, digest, ext):
+    """``<directory>/<ab>/<abcdef...><ext>``; the two-letter fan-out keeps directories small."""
+    return posixpath.join(directory, digest[:2], f'{digest}{ext.lower()}')
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Store each file under the SHA-256 of its bytes instead of its upload name,
+    so identical uploads share one file on disk. Reference counts and cleanup
+    live in tracker.blobs; this class never deletes anything on its own.
+
+    A file whose digest the caller has already verified can carry it as a
+    ``sha256`` attribute, which saves reading the content twice.
+    """
+
+    def _save(self, name, content):
+        directory, filename = posixpath.split(name)
+        digest = getattr(content, 'sha256', None) or content_digest(content)
+        name = addressed_name(directory, digest, os.path.splitext(filename)[1])
+        if self.exists(name):
+            return name
+        # Write under a private name, then link it into place. Unlike the
+        # stock save, which picks another name when the target appears
+        # meanwhile, a concurrent save of the same digest (so the same bytes)
+        # counts as success, and readers never see a half-written file.
+        temp = super()._save(posixpath.join(posixpath.dirname(name), f'.{uuid.uuid4().hex}.tmp'), content)
+        try:
+            os.link(self.path(temp), self.path(name))
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(self.path(temp))
+        return name
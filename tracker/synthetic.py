@@ -0,0 +1,120 @@
+import random
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.db import transaction
+
+from .counters import rebuild_task_counters
+from .models import Account, Project, Sprint, Task
+from .search import rebuild_user_search_index
+
+FIRST_NAMES = ('Ada', 'Alan', 'Barbara', 'Dennis', 'Edsger', 'Frances', 'Grace', 'Guido', 'Ken', 'Linus',
+               'Margaret', 'Niklaus', 'Radia', 'Sophie', 'Tim', 'Yukihiro')
+LAST_NAMES = ('Allen', 'Backus', 'Hamilton', 'Hopper', 'Kernighan', 'Knuth', 'Liskov', 'Lovelace',
+              'Perlman', 'Ritchie', 'Stroustrup', 'Thompson', 'Torvalds', 'Turing', 'Wirth', 'Wilson')
+TITLE_WORDS = ('Fix', 'Add', 'Refactor', 'Document', 'Test', 'Review', 'Migrate', 'Profile',
+               'login', 'export', 'search', 'billing', 'sprint board', 'upload', 'cache', 'report')
+SPRINT_DAYS = 14
+
+
+def generate_dataset(users=50, accounts=2, projects_per_account=5, participants_per_project=8,
+                     sprints_per_project=10, tasks_per_sprint=20, assignees_per_task=2,
+                     description_size=200, seed=0, prefix='synthetic', start=date(2025, 1, 6),
+                     batch_size=2000):
+    """
+    Bulk-create a reproducible tracker dataset: users, accounts, projects with
+    participants, back-to-back sprints and tasks with assignees. The same
+    arguments always produce the same rows. Signals are skipped, so the task
+    counters and the user search index are rebuilt at the end.
+
+    Returns a dict of the created primary keys: ``users``, ``accounts``,
+    ``projects``, ``sprints`` and ``owners`` (project id -> owner id), plus
+    the number of ``tasks``.
+    """
+    rng = random.Random(seed)
+    with transaction.atomic():
+        created_users = User.objects.bulk_create([
+            User(
+                username=f'{prefix}-user-{n}',
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                password='!',  # unusable
+            )
+            for n in range(users)
+        ], batch_size=batch_size)
+        user_ids = [user.pk for user in created_users]
+
+        created_accounts = Account.objects.bulk_create([
+            Account(name=f'{prefix} account {n}', description='', owner_id=rng.choice(user_ids))
+            for n in range(accounts)
+        ], batch_size=batch_size)
+
+        created_projects = Project.objects.bulk_create([
+            Project(
+                name=f'{prefix} project {account.pk}-{n}', description='', account=account,
+                owner_id=rng.choice(user_ids),
+            )
+            for account in created_accounts
+            for n in range(projects_per_account)
+        ], batch_size=batch_size)
+
+        members = {}
+        Participant = Project.participants.through
+        participant_rows = []
+        for project in created_projects:
+            members[project.pk] = rng.sample(user_ids, min(participants_per_project, len(user_ids)))
+            participant_rows.extend(Participant(project_id=project.pk, user_id=user_id) for user_id in members[project.pk])
+        Participant.objects.bulk_create(participant_rows, batch_size=batch_size)
+
+        created_sprints = Sprint.objects.bulk_create([
+            Sprint(
+                project=project, name=f'Sprint {n + 1}',
+                start_date=start + timedelta(days=n * SPRINT_DAYS),
+                end_date=start + timedelta(days=n * SPRINT_DAYS + SPRINT_DAYS - 1),
+            )
+            for project in created_projects
+            for n in range(sprints_per_project)
+        ], batch_size=batch_size)
+
+        description = ('Synthetic task description. ' * (description_size // 28 + 1))[:description_size]
+        statuses = [status for status, _ in Task.TASK_STATUS_CHOICES]
+        Assignee = Task.assigned_to.through
+        tasks = 0
+        batch, assignees = [], []
+
+        def flush():
+            for task in Task.objects.bulk_create(batch, batch_size=batch_size):
+                assignees.extend(Assignee(task_id=task.pk, user_id=user_id) for user_id in task._synthetic_assignees)
+            Assignee.objects.bulk_create(assignees, batch_size=batch_size)
+            batch.clear()
+            assignees.clear()
+
+        for sprint in created_sprints:
+            team = members[sprint.project_id] or user_ids
+            for n in range(tasks_per_sprint):
+                task = Task(
+                    sprint=sprint,
+                    title=f'{rng.choice(TITLE_WORDS[:8])} {rng.choice(TITLE_WORDS[8:])} #{n + 1}',
+                    description=description,
+                    due_date=sprint.start_date + timedelta(days=rng.randrange(SPRINT_DAYS)),
+                    status=rng.choice(statuses),
+                )
+                task._synthetic_assignees = rng.sample(team, min(assignees_per_task, len(team)))
+                batch.append(task)
+                tasks += 1
+                if len(batch) >= batch_size:
+                    flush()
+        if batch:
+            flush()
+
+        rebuild_task_counters()
+    rebuild_user_search_index()
+
+    return {
+        'users': user_ids,
+        'accounts': [account.pk for account in created_accounts],
+        'projects': [project.pk for project in created_projects],
+        'owners': {project.pk: project.owner_id for project in created_projects},
+        'sprints': [sprint.pk for sprint in created_sprints],
+        'tasks': tasks,
+    }
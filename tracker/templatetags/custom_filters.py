@@ -1,11 +1,17 @@
 # your_app/templatetags/custom_filters.py
 from django import template
 
+from tracker.badges import render_participant_badges, user_initials
+
 register = template.Library()
 
 @register.filter
 def split_name(value):
     """Returns the initials of a full name."""
-    name_parts = value.split()
-    initials = ''.join([part[0].upper() for part in name_parts if part])
-    return initials
+    return user_initials(value)
+
+
+@register.simple_tag
+def participant_badges(project):
+    """Renders the owner and participant badges for a project."""
+    return render_participant_badges(project.participants.all(), project.owner)
@@ -1,3 +1,1354 @@
-from django.test import TestCase
+import django
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from unittest import mock
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from datetime import date, timedelta
+import hashlib
+import importlib
+import io
+import json
+import os
+import posixpath
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, resolve, reverse
+from django.utils import timezone
 
-# Create your tests here.
+from .analytics import burndown, take_snapshots, velocity
+from .badges import badge_color, render_user_badge
+from .counters import rebuild_task_counters
+from .directory import get_participant_directory
+from .export import export_rows
+from . import async_views, changes, instrumentation, uploads
+from .realtime import get_broker, websocket_application
+from .routers import PIN_COOKIE, PrimaryPinningMiddleware, read_database, replica_reads
+from .search import search_users
+from .storage import ContentAddressedStorage
+from .services import bulk_create_tasks
+from .synthetic import generate_dataset
+from .pagination import keyset_page, stream_json_rows
+from .models import (
+    Account, AssigneeSnapshot, Blob, Change, Comment, Project, ScreenshotVariant, Sprint, SprintSnapshot, Task, UploadSession,
+)
+from PIL import Image
+from Project_tracker import settings as project_settings
+
+
+class ProjectChangelistQueryTests(TestCase):
+    # Queries for one changelist page: session, user, filter lookups, counts,
+    # the project page itself and a single participants prefetch.
+    MAX_QUERIES = 10
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        cls.account = Account.objects.create(name='Big Account', description='', owner=cls.admin)
+        cls.users = [
+            User.objects.create_user(f'user{i}', first_name=f'First{i}', last_name=f'Last{i}')
+            for i in range(5)
+        ]
+
+    def create_projects(self, count, start=0):
+        for i in range(start, start + count):
+            owner = self.users[i % len(self.users)]
+            project = Project.objects.create(
+                name=f'Project {i}', description='', account=self.account, owner=owner
+            )
+            project.participants.set(self.users)
+
+    def changelist_query_count(self):
+        self.client.force_login(self.admin)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('admin:tracker_project_changelist'))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_changelist_query_count_is_constant(self):
+        self.create_projects(5)
+        small = self.changelist_query_count()
+        self.create_projects(45, start=5)
+        large = self.changelist_query_count()
+        self.assertEqual(small, large)
+        self.assertLessEqual(large, self.MAX_QUERIES)
+
+    def test_changelist_skips_descriptions(self):
+        self.create_projects(3)
+        self.client.force_login(self.admin)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('admin:tracker_project_changelist'))
+        page_query = next(q['sql'] for q in ctx.captured_queries if '"tracker_project"."name"' in q['sql'])
+        self.assertNotIn('"tracker_project"."description"', page_query)
+        self.assertNotIn('"tracker_account"."description"', page_query)
+
+
+class ParticipantBadgeTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('jdoe', first_name='Jane', last_name='Doe')
+
+    def test_badge_is_stable(self):
+        badge = render_user_badge(self.user)
+        self.assertIn('>JD</span>', badge)
+        self.assertIn(badge_color(self.user.pk), badge)
+        self.assertEqual(badge, render_user_badge(self.user))
+
+    def test_badge_follows_renames(self):
+        render_user_badge(self.user)
+        User.objects.filter(pk=self.user.pk).update(first_name='Bob')
+        self.assertIn('>BD</span>', render_user_badge(User.objects.get(pk=self.user.pk)))
+
+    def test_badge_escapes_names(self):
+        self.user.first_name = '<b>'
+        self.user.save()
+        self.assertNotIn('<b>', render_user_badge(self.user))
+
+
+class BulkTaskCreationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner')
+        cls.users = [User.objects.create_user(f'dev{i}') for i in range(3)]
+        account = Account.objects.create(name='Bulk Account', description='', owner=cls.owner)
+        cls.project = Project.objects.create(name='Bulk', description='', account=account, owner=cls.owner)
+
+    def import_sprint(self, tasks, name='Sprint 1'):
+        return self.client.post(
+            reverse('import_sprint', args=[self.project.pk]),
+            data=json.dumps({'sprint_name': name, 'start_date': '2025-01-01', 'end_date': '2025-01-14', 'tasks': tasks}),
+            content_type='application/json',
+        )
+
+    def test_import_uses_constant_queries(self):
+        def import_queries(count, name):
+            tasks = [
+                {'title': f'Task {i}', 'status': 'in-progress', 'assigned_to': [u.pk for u in self.users]}
+                for i in range(count)
+            ]
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.import_sprint(tasks, name=name)
+            self.assertEqual(response.status_code, 201)
+            return response, len(ctx.captured_queries)
+
+        _, single = import_queries(1, 'Single')
+        # 150 tasks stay within one batch of every bulk INSERT, the change feed's included.
+        response, many = import_queries(150, 'Sprint 1')
+        self.assertEqual(many, single)
+        sprint = Sprint.objects.get(pk=response.json()['sprint_id'])
+        self.assertEqual(sprint.tasks.count(), 150)
+        self.assertEqual(Task.assigned_to.through.objects.filter(task__sprint=sprint).count(), 450)
+        self.assertEqual(sprint.tasks.filter(status=Task.IN_PROGRESS).count(), 150)
+
+    def test_import_rejects_malformed_payloads(self):
+        url = reverse('import_sprint', args=[self.project.pk])
+        valid = {'sprint_name': 'S', 'start_date': '2025-01-01', 'end_date': '2025-01-14', 'tasks': []}
+        for payload in (
+            [],
+            {**valid, 'sprint_name': 7},
+            {**valid, 'start_date': None},
+            {**valid, 'end_date': '14/01/2025'},
+            {**valid, 'end_date': '2024-12-31'},
+            {**valid, 'tasks': {'title': 'A'}},
+            {**valid, 'tasks': ['A']},
+            {**valid, 'tasks': [{'title': ['A']}]},
+            {**valid, 'tasks': [{'title': 'A', 'status': 'done-ish'}]},
+            {**valid, 'tasks': [{'title': 'A', 'status': 3}]},
+            {**valid, 'tasks': [{'title': 'A', 'due_date': 'soon'}]},
+            {**valid, 'tasks': [{'title': 'A', 'assigned_to': self.owner.pk}]},
+            {**valid, 'tasks': [{'title': 'A', 'assigned_to': ['me']}]},
+        ):
+            with self.subTest(payload=payload):
+                response = self.client.post(url, json.dumps(payload), content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+                self.assertFalse(response.json()['success'])
+        self.assertFalse(Sprint.objects.filter(project=self.project).exists())
+
+    def test_add_and_save_task_normalize_status(self):
+        sprint = Sprint.objects.create(project=self.project, name='S', start_date='2025-01-01', end_date='2025-01-14')
+        body = {'sprint_id': sprint.pk, 'title': 'Stuck', 'due_date': '2025-01-05', 'status': 'blocked'}
+        response = self.client.post(reverse('add_task'), json.dumps(body), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Task.objects.get(pk=response.json()['id']).status, Task.BLOCKED)
+        for bad in ({'status': 'done-ish'}, {'status': None}, {'title': 'Bad date', 'due_date': 'soon'}):
+            response = self.client.post(reverse('add_task'), json.dumps({**body, **bad}), content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+
+        body = {'sprint_id': sprint.pk, 'title': 'Saved', 'due_date': '2025-01-05', 'status': 'blocked', 'participants': []}
+        self.assertTrue(self.client.post(reverse('save_task'), json.dumps(body), content_type='application/json').json()['success'])
+        self.assertEqual(Task.objects.get(title='Saved').status, Task.BLOCKED)
+        response = self.client.post(reverse('save_task'), json.dumps({**body, 'status': 'done-ish'}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        sprint.refresh_from_db()
+        self.assertEqual((sprint.task_count, sprint.blocked_count), (2, 2))
+
+    def test_import_rolls_back_on_unknown_assignee(self):
+        response = self.import_sprint([{'title': 'A'}, {'title': 'B', 'assigned_to': [999999]}])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Sprint.objects.filter(project=self.project).exists())
+        self.assertFalse(Task.objects.exists())
+
+
+class TaskCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user('owner')
+        account = Account.objects.create(name='Counter Account', description='', owner=owner)
+        cls.project = Project.objects.create(name='Counters', description='', account=account, owner=owner)
+
+    def setUp(self):
+        self.sprint = Sprint.objects.create(project=self.project, name='S1', start_date='2025-01-01', end_date='2025-01-14')
+
+    def create_task(self, title, status=Task.TO_DO, sprint=None):
+        return Task.objects.create(sprint=sprint or self.sprint, title=title, due_date='2025-01-10', status=status)
+
+    def counters(self, obj):
+        obj.refresh_from_db()
+        return (obj.task_count, obj.to_do_count, obj.in_progress_count, obj.completed_count)
+
+    def test_create_update_delete(self):
+        task = self.create_task('A')
+        self.create_task('B', status='in-progress')
+        self.assertEqual(self.counters(self.sprint), (2, 1, 1, 0))
+
+        task.status = Task.COMPLETED
+        task.save()
+        task.title = 'A2'
+        task.save()
+        self.assertEqual(self.counters(self.sprint), (2, 0, 1, 1))
+        self.assertEqual(self.sprint.progress, 50)
+
+        task.delete()
+        self.assertEqual(self.counters(self.sprint), (1, 0, 1, 0))
+        self.assertEqual(self.counters(self.project), (1, 0, 1, 0))
+
+    def test_stale_instances_and_deferred_status(self):
+        task = self.create_task('A')
+        first, second = Task.objects.get(pk=task.pk), Task.objects.get(pk=task.pk)
+        first.status = Task.COMPLETED
+        first.save()
+        second.status = Task.IN_PROGRESS
+        second.save()
+        self.assertEqual(self.counters(self.sprint), (1, 0, 1, 0))
+
+        deferred = Task.objects.defer('status').get(pk=task.pk)
+        deferred.title = 'A2'
+        deferred.save()
+        self.assertEqual(self.counters(self.sprint), (1, 0, 1, 0))
+        deferred = Task.objects.only('pk').get(pk=task.pk)
+        deferred.status = Task.COMPLETED
+        deferred.save()
+        self.assertEqual(self.counters(self.sprint), (1, 0, 0, 1))
+
+        # Left out of update_fields, the new status is not stored.
+        task.status = Task.TO_DO
+        task.save(update_fields=['title'])
+        self.assertEqual(self.counters(self.sprint), (1, 0, 0, 1))
+        task.delete()  # still says to-do in memory
+        self.assertEqual(self.counters(self.sprint), (0, 0, 0, 0))
+
+    def test_move_between_sprints_and_sprint_delete(self):
+        other = Sprint.objects.create(project=self.project, name='S2', start_date='2025-01-15', end_date='2025-01-28')
+        task = self.create_task('A')
+        self.create_task('B', sprint=other)
+        task.sprint = other
+        task.save()
+        self.assertEqual(self.counters(self.sprint), (0, 0, 0, 0))
+        self.assertEqual(self.counters(other), (2, 2, 0, 0))
+
+        other.delete()
+        self.assertEqual(self.counters(self.project), (0, 0, 0, 0))
+
+    def test_rebuild(self):
+        self.create_task('A', status=Task.COMPLETED)
+        self.create_task('B')
+        Sprint.objects.update(task_count=0, completed_count=0, to_do_count=0)
+        Project.objects.update(task_count=0, completed_count=0, to_do_count=0)
+        rebuild_task_counters()
+        self.assertEqual(self.counters(self.sprint), (2, 1, 0, 1))
+        self.assertEqual(self.counters(self.project), (2, 1, 0, 1))
+
+
+class TaskListApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user('owner')
+        cls.dev = User.objects.create_user('dev')
+        account = Account.objects.create(name='List Account', description='', owner=owner)
+        cls.project = Project.objects.create(name='Listing', description='', account=account, owner=owner)
+        cls.sprint = Sprint.objects.create(project=cls.project, name='S1', start_date='2025-01-01', end_date='2025-01-31')
+        for i in range(25):
+            task = Task.objects.create(
+                sprint=cls.sprint, title=f'T{i}', due_date=f'2025-01-{i % 5 + 1:02d}',
+                status=Task.COMPLETED if i % 2 else Task.TO_DO,
+            )
+            if i % 3 == 0:
+                task.assigned_to.add(cls.dev)
+
+    def fetch_all(self, url, **params):
+        ids, cursor = [], None
+        while True:
+            query = dict(params, limit=4, **({'cursor': cursor} if cursor else {}))
+            response = self.client.get(url, query)
+            self.assertTrue(response.streaming)
+            data = json.loads(b''.join(response.streaming_content))
+            ids.extend(row['id'] for row in data['tasks'])
+            cursor = data['next_cursor']
+            if not cursor:
+                return ids, data
+
+    def test_pages_cover_all_tasks_in_keyset_order(self):
+        ids, _ = self.fetch_all(reverse('project_task_list', args=[self.project.pk]))
+        expected = list(Task.objects.order_by('due_date', 'id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_filters(self):
+        ids, _ = self.fetch_all(reverse('sprint_task_list', args=[self.sprint.pk]), status='to-do', assignee=self.dev.pk)
+        expected = set(Task.objects.filter(status=Task.TO_DO, assigned_to=self.dev).values_list('id', flat=True))
+        self.assertEqual(set(ids), expected)
+
+    def test_stream_cursor_uses_the_keyset_field(self):
+        for n in (2, 3):
+            Sprint.objects.create(project=self.project, name=f'S{n}', start_date=f'2025-0{n}-01', end_date=f'2025-0{n}-28')
+        sprints = Sprint.objects.filter(project=self.project).values('id', 'start_date')
+        ids, cursor = [], None
+        while True:
+            rows = keyset_page(sprints, cursor, 1, field='start_date')
+            data = json.loads(''.join(stream_json_rows(iter(rows), 1, 'sprints', field='start_date')))
+            ids.extend(row['id'] for row in data['sprints'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(ids, list(Sprint.objects.order_by('start_date').values_list('id', flat=True)))
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('sprint_task_list', args=[self.sprint.pk]), {'cursor': 'nope'})
+        self.assertEqual(response.status_code, 400)
+
+
+class UserSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ann = User.objects.create_user('annie', first_name='Ann', last_name='Smith')
+        cls.anna = User.objects.create_user('zed', first_name='Anna', last_name='Jones')
+        cls.dan = User.objects.create_user('dan', first_name='Dan', last_name='Annable')
+        cls.bob = User.objects.create_user('bob', first_name='Bob', last_name='Stone')
+
+    def test_prefix_search_ranks_best_matches_first(self):
+        self.assertEqual(search_users('ann'), [self.ann, self.anna, self.dan])
+        self.assertEqual(search_users('ANNA'), [self.anna, self.dan])
+        self.assertEqual(search_users('bob st'), [self.bob])
+        self.assertEqual(search_users('ann', limit=1), [self.ann])
+
+    def test_index_follows_name_changes(self):
+        self.bob.first_name = 'Annika'
+        self.bob.save()
+        self.assertIn(self.bob, search_users('annik'))
+        self.assertEqual(search_users('bob'), [self.bob])  # still matched by username
+
+    def test_suggestions_are_limited_to_participants(self):
+        account = Account.objects.create(name='Search Account', description='', owner=self.bob)
+        project = Project.objects.create(name='Search', description='', account=account, owner=self.bob)
+        project.participants.set([self.bob, self.anna, self.dan])
+        response = self.client.get(reverse('get_user_suggestions', args=[project.pk]), {'query': 'an'})
+        self.assertEqual([user['id'] for user in response.json()], [self.anna.pk, self.dan.pk])
+
+
+class ParticipantDirectoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', first_name='Olga', last_name='Owner')
+        cls.dev = User.objects.create_user('dev', first_name='Dee', last_name='Veloper')
+        account = Account.objects.create(name='Directory Account', description='', owner=cls.owner)
+        cls.project = Project.objects.create(name='Directory', description='', account=account, owner=cls.owner)
+
+    def test_directory_is_cached_and_invalidated(self):
+        self.assertEqual(get_participant_directory(self.project.pk), [(self.owner.pk, 'Olga Owner', 'owner', 'Owner')])
+        # Only the version stamp is read on a hit.
+        with self.assertNumQueries(1):
+            get_participant_directory(self.project.pk)
+
+        self.project.participants.add(self.dev)
+        self.assertIn((self.dev.pk, 'Dee Veloper', 'dev', 'Participant'), get_participant_directory(self.project.pk))
+
+        self.dev.last_name = 'Signer'
+        self.dev.save()
+        self.assertIn((self.dev.pk, 'Dee Signer', 'dev', 'Participant'), get_participant_directory(self.project.pk))
+
+        self.dev.project_participants.clear()
+        self.assertEqual(len(get_participant_directory(self.project.pk)), 1)
+
+        self.project.participants.add(self.dev)
+        self.assertEqual(len(get_participant_directory(self.project.pk)), 2)
+        self.dev.delete()
+        self.assertEqual(len(get_participant_directory(self.project.pk)), 1)
+
+    def test_suggestions_served_from_cache(self):
+        self.project.participants.add(self.dev)
+        url = reverse('get_user_suggestions', args=[self.project.pk])
+        self.client.get(url)
+        # One version lookup, shared by the ETag and the view.
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'query': 'vel'})
+        self.assertEqual(response.json(), [{'id': self.dev.pk, 'full_name': 'Dee Veloper', 'username': 'dev'}])
+        self.assertEqual(self.client.get(reverse('get_user_suggestions', args=[999999])).status_code, 404)
+
+
+class SQLiteConnectionTests(TestCase):
+    def test_pragmas_applied_to_new_connections(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite only')
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 5000)
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+
+
+class DatabasePoolSettingsTests(TestCase):
+    def databases_with(self, version=django.VERSION, **environ):
+        self.addCleanup(importlib.reload, project_settings)
+        with mock.patch.dict(os.environ, environ), mock.patch('django.VERSION', version):
+            return importlib.reload(project_settings).DATABASES['default']
+
+    def test_pool_stand_in_keeps_connections_per_thread(self):
+        self.assertEqual(self.databases_with(TRACKER_DB_ENGINE='sqlite3', TRACKER_DB_POOL='0')['CONN_MAX_AGE'], 60)
+        for engine in ('sqlite3', 'postgresql'):
+            db = self.databases_with(TRACKER_DB_ENGINE=engine, TRACKER_DB_POOL='1')
+            self.assertIsNone(db['CONN_MAX_AGE'])
+            self.assertTrue(db['CONN_HEALTH_CHECKS'])
+            self.assertNotIn('pool', db['OPTIONS'])
+
+    def test_driver_pool_on_django_5_1(self):
+        db = self.databases_with((5, 1, 0, 'final', 0), TRACKER_DB_ENGINE='postgresql', TRACKER_DB_POOL='1')
+        self.assertEqual((db['CONN_MAX_AGE'], db['OPTIONS']['pool']['max_size']), (0, 20))
+
+
+@mock.patch('tracker.routers.replica_aliases', lambda: ['replica1'])
+class ReplicaRoutingTests(TestCase):
+    def call(self, method='get', cookies=None, view=None):
+        request = getattr(RequestFactory(), method)('/')
+        request.COOKIES.update(cookies or {})
+        seen = {}
+
+        def get_response(request):
+            with replica_reads():
+                seen['db'] = read_database()
+            if view:
+                view()
+            return HttpResponse()
+
+        response = PrimaryPinningMiddleware(get_response)(request)
+        return seen['db'], response
+
+    def test_reads_go_to_replica_only_in_read_only_views(self):
+        self.assertEqual(read_database(), 'default')
+        with replica_reads():
+            self.assertEqual(read_database(), 'replica1')
+        db, response = self.call()
+        self.assertEqual(db, 'replica1')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_writes_pin_the_client_to_the_primary(self):
+        _, response = self.call(view=lambda: User.objects.create_user('writer'))
+        self.assertIn(PIN_COOKIE, response.cookies)
+        db, _ = self.call(cookies={PIN_COOKIE: response.cookies[PIN_COOKIE].value})
+        self.assertEqual(db, 'default')
+        db, _ = self.call(cookies={PIN_COOKIE: '0'})
+        self.assertEqual(db, 'replica1')
+
+
+def make_png(width=1600, height=1000):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), '#3357FF').save(buffer, 'PNG')
+    return SimpleUploadedFile('shot.png', buffer.getvalue(), content_type='image/png')
+
+
+class ScreenshotPipelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.settings_override = override_settings(MEDIA_ROOT=cls.media_root, TRACKER_MEDIA_PROCESS_INLINE=True)
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user('owner')
+        account = Account.objects.create(name='Media Account', description='', owner=owner)
+        project = Project.objects.create(name='Media', description='', account=account, owner=owner)
+        cls.sprint = Sprint.objects.create(project=project, name='S1', start_date='2025-01-01', end_date='2025-01-14')
+
+    def test_variants_generated_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(sprint=self.sprint, title='Shot', due_date='2025-01-05', screenshots=make_png())
+        variants = {v.kind: v for v in task.screenshot_variants.all()}
+        self.assertEqual(set(variants), {kind for kind, _ in ScreenshotVariant.KIND_CHOICES})
+        thumb = variants[ScreenshotVariant.THUMBNAIL_WEBP]
+        self.assertEqual((thumb.width, thumb.height), (320, 200))
+        self.assertEqual(thumb.size, thumb.image.size)
+        self.assertEqual((variants[ScreenshotVariant.WEBP].width, variants[ScreenshotVariant.WEBP].height), (1600, 1000))
+
+        response = self.client.get(reverse('sprint_task_list', args=[self.sprint.pk]))
+        row = json.loads(b''.join(response.streaming_content))['tasks'][0]
+        self.assertTrue(row['thumbnail'].endswith('.webp'))
+
+    def test_unchanged_screenshot_is_not_reprocessed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(sprint=self.sprint, title='Shot', due_date='2025-01-05', screenshots=make_png())
+        task = Task.objects.get(pk=task.pk)
+        with mock.patch('tracker.signals.enqueue_screenshot_processing') as enqueue:
+            task.title = 'Renamed'
+            task.save()
+        enqueue.assert_not_called()
+
+
+class ChunkedUploadTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.settings_override = override_settings(
+            MEDIA_ROOT=cls.media_root, TRACKER_MEDIA_PROCESS_INLINE=True, TRACKER_UPLOAD_CHUNK_SIZE=1024,
+        )
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user('owner')
+        account = Account.objects.create(name='Upload Account', description='', owner=owner)
+        project = Project.objects.create(name='Uploads', description='', account=account, owner=owner)
+        sprint = Sprint.objects.create(project=project, name='S1', start_date='2025-01-01', end_date='2025-01-14')
+        cls.task = Task.objects.create(sprint=sprint, title='Recording', due_date='2025-01-05')
+
+    def start(self, content, sha256=None):
+        response = self.client.post(reverse('start_upload'), json.dumps({
+            'task_id': self.task.pk, 'filename': 'screen recording.mp4', 'size': len(content),
+            'sha256': sha256 or hashlib.sha256(content).hexdigest(),
+        }), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        return reverse('upload_chunk', args=[response.json()['upload_id']])
+
+    def put(self, url, content, start, end):
+        return self.client.put(
+            url, content[start:end], content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f'bytes {start}-{end - 1}/{len(content)}',
+        )
+
+    def test_resumable_upload_attaches_file(self):
+        content = bytes(range(256)) * 10
+        url = self.start(content)
+        self.assertEqual(self.put(url, content, 0, 1024).status_code, 202)
+        # A retried or out-of-order chunk is rejected with the offset to resume from.
+        response = self.put(url, content, 2048, 2560)
+        self.assertEqual((response.status_code, response.json()['offset']), (409, 1024))
+        self.assertEqual(self.client.get(url).json()['offset'], 1024)
+        self.assertEqual(self.put(url, content, 1024, 2048).status_code, 202)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.put(url, content, 2048, 2560)
+        self.assertEqual(response.status_code, 201)
+        self.task.refresh_from_db()
+        with self.task.screenshots.open('rb') as f:
+            self.assertEqual(f.read(), content)
+
+    def test_losing_writer_leaves_the_counted_bytes(self):
+        content = b'a' * 1024 + b'b' * 100
+        url = self.start(content)
+        session = UploadSession.objects.get()
+        stale = UploadSession.objects.get()
+        test = self
+
+        class Racing(io.BytesIO):
+            def read(self, size=-1):
+                # A second request for the same offset while this one writes.
+                with test.assertRaises(uploads.UploadConflict):
+                    uploads.write_chunk(UploadSession.objects.get(), 0, io.BytesIO(b'z' * 1024), 1024)
+                return super().read(size)
+
+        self.assertEqual(uploads.write_chunk(session, 0, Racing(content), 1024), 1024)
+        with self.assertRaises(uploads.UploadConflict):
+            uploads.write_chunk(stale, 0, io.BytesIO(b'z' * 1024), 1024)
+        self.assertEqual(uploads.partial_path(session).read_bytes()[:1024], content[:1024])
+
+        # The partial file is moved into storage, and the verified digest is
+        # handed over rather than computed again.
+        inode = uploads.partial_path(session).stat().st_ino
+        with mock.patch('tracker.storage.content_digest') as digest, self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.put(url, content, 1024, 1124).status_code, 201)
+        digest.assert_not_called()
+        self.task.refresh_from_db()
+        self.assertIn(hashlib.sha256(content).hexdigest(), self.task.screenshots.name)
+        self.assertEqual(os.stat(self.task.screenshots.path).st_ino, inode)
+
+    def test_failed_chunk_releases_its_claim(self):
+        content = b'c' * 1024
+        url = self.start(content)
+        session = UploadSession.objects.get()
+        with self.assertRaises(ValidationError):
+            uploads.write_chunk(session, 0, io.BytesIO(content[:100]), 1024)
+        self.assertIsNone(UploadSession.objects.get().claim)
+        self.assertEqual(self.put(url, content, 0, 1024).status_code, 201)
+
+    def test_abandoned_uploads_expire(self):
+        self.start(b'x' * 100)
+        abandoned = UploadSession.objects.get()
+        UploadSession.objects.update(updated_at=timezone.now() - timedelta(days=2))
+        self.start(b'y' * 100)
+        orphan = uploads.upload_dir() / 'gone.part'
+        orphan.touch()
+        os.utime(orphan, (0, 0))
+        call_command('collect_blob_garbage', stdout=io.StringIO())
+        self.assertEqual(UploadSession.objects.count(), 1)
+        self.assertFalse(uploads.partial_path(abandoned).exists())
+        self.assertFalse(orphan.exists())
+        self.assertTrue(uploads.partial_path(UploadSession.objects.get()).exists())
+
+    def test_hash_mismatch_is_rejected(self):
+        content = b'x' * 100
+        url = self.start(content, sha256='0' * 64)
+        response = self.put(url, content, 0, 100)
+        self.assertEqual(response.status_code, 400)
+        self.task.refresh_from_db()
+        self.assertFalse(self.task.screenshots)
+
+
+class ContentAddressedStorageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.settings_override = override_settings(MEDIA_ROOT=cls.media_root, TRACKER_MEDIA_PROCESS_INLINE=True)
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user('owner')
+        account = Account.objects.create(name='Blob Account', description='', owner=owner)
+        project = Project.objects.create(name='Blobs', description='', account=account, owner=owner)
+        cls.sprint = Sprint.objects.create(project=project, name='S1', start_date='2025-01-01', end_date='2025-01-14')
+
+    def create_task(self, title, content):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Task.objects.create(
+                sprint=self.sprint, title=title, due_date='2025-01-05',
+                screenshots=SimpleUploadedFile(f'{title}.mp4', content),
+            )
+
+    def test_racing_saves_of_the_same_content_share_the_canonical_name(self):
+        storage = Task._meta.get_field('screenshots').storage
+        first = storage.save('task_screenshots/a.mp4', ContentFile(b'raced'))
+        # As if the second save checked exists() before the first file landed.
+        with mock.patch.object(ContentAddressedStorage, 'exists', return_value=False):
+            second = storage.save('task_screenshots/b.mp4', ContentFile(b'raced'))
+        self.assertEqual(second, first)
+        self.assertEqual(storage.listdir(posixpath.dirname(first))[1], [posixpath.basename(first)])
+
+    def test_duplicates_share_one_file_until_last_task_is_deleted(self):
+        first = self.create_task('first', b'same bytes')
+        second = self.create_task('second', b'same bytes')
+        self.assertEqual(first.screenshots.name, second.screenshots.name)
+        self.assertIn(hashlib.sha256(b'same bytes').hexdigest(), first.screenshots.name)
+        self.assertEqual(Blob.objects.get(name=first.screenshots.name).refcount, 2)
+        storage = first.screenshots.storage
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('delete_task', args=[first.pk]))
+        self.assertTrue(storage.exists(second.screenshots.name))
+        # The last reference goes with its sprint.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sprint.delete()
+        self.assertFalse(storage.exists(second.screenshots.name))
+        self.assertFalse(Blob.objects.exists())
+
+    def test_hash_first_upload_skips_known_content(self):
+        stored = self.create_task('stored', b'recording')
+        task = Task.objects.create(sprint=self.sprint, title='other', due_date='2025-01-05')
+        response = self.client.post(reverse('start_upload'), json.dumps({
+            'task_id': task.pk, 'filename': 'copy.mp4', 'size': 9,
+            'sha256': hashlib.sha256(b'recording').hexdigest(),
+        }), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(response.json()['completed'])
+        task.refresh_from_db()
+        self.assertEqual(task.screenshots.name, stored.screenshots.name)
+        self.assertEqual(Blob.objects.get(name=stored.screenshots.name).refcount, 2)
+
+    def test_garbage_collection_recounts_and_removes_orphans(self):
+        task = self.create_task('shot', b'orphaned soon')
+        name = task.screenshots.name
+        Task.objects.filter(pk=task.pk).update(screenshots='')  # bypasses the signals
+        call_command('collect_blob_garbage', min_age=0, stdout=io.StringIO())
+        self.assertFalse(task.screenshots.storage.exists(name))
+        self.assertFalse(Blob.objects.exists())
+
+    def test_garbage_collection_removes_stale_temporary_files(self):
+        store = Task._meta.get_field('screenshots').storage
+        stale, fresh = (f'task_screenshots/ab/.{uuid.uuid4().hex}.tmp' for _ in range(2))
+        os.makedirs(store.path('task_screenshots/ab'), exist_ok=True)
+        for name in (stale, fresh):
+            with open(store.path(name), 'wb') as f:
+                f.write(b'interrupted')
+        an_hour_ago = time.time() - 3601
+        os.utime(store.path(stale), (an_hour_ago, an_hour_ago))
+        call_command('collect_blob_garbage', stdout=io.StringIO())
+        self.assertFalse(store.exists(stale))
+        self.assertTrue(store.exists(fresh))
+
+
+class TaskCommentTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', first_name='Olive', last_name='Owner')
+        account = Account.objects.create(name='Comment Account', description='', owner=cls.owner)
+        project = Project.objects.create(name='Comments', description='', account=account, owner=cls.owner)
+        sprint = Sprint.objects.create(project=project, name='S1', start_date='2025-01-01', end_date='2025-01-14')
+        cls.task = Task.objects.create(sprint=sprint, title='Discussed', due_date='2025-01-05')
+        cls.comments = [Comment.objects.create(task=cls.task, author=cls.owner, body=f'Comment {n}') for n in range(5)]
+        cls.url = reverse('task_comments', args=[cls.task.pk])
+
+    def test_pages_newest_first_with_cursor(self):
+        first = self.client.get(self.url, {'limit': 2}).json()
+        self.assertEqual([c['body'] for c in first['comments']], ['Comment 4', 'Comment 3'])
+        self.assertEqual(first['comments'][0]['author_name'], 'Olive Owner')
+        bodies = [c['body'] for c in first['comments']]
+        cursor = first['next_cursor']
+        while cursor:
+            page = self.client.get(self.url, {'limit': 2, 'cursor': cursor}).json()
+            bodies += [c['body'] for c in page['comments']]
+            cursor = page['next_cursor']
+        self.assertEqual(bodies, [f'Comment {n}' for n in reversed(range(5))])
+
+    def test_fetch_only_newer_comments(self):
+        self.client.force_login(self.owner)
+        response = self.client.post(self.url, json.dumps({'body': 'Latest'}), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['author_id'], self.owner.pk)
+        page = self.client.get(self.url, {'after': self.comments[3].pk}).json()
+        self.assertEqual([c['body'] for c in page['comments']], ['Comment 4', 'Latest'])
+        self.assertFalse(page['has_more'])
+
+
+class RecordingBroker:
+    """Local stand-in broker that keeps every published message."""
+
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, message):
+        self.published.append((channel, json.loads(message)))
+
+
+@override_settings(TRACKER_REALTIME_BROKER='tracker.tests.RecordingBroker')
+class BoardEventTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create_user('owner')
+        account = Account.objects.create(name='Board Account', description='', owner=owner)
+        cls.project = Project.objects.create(name='Board', description='', account=account, owner=owner)
+        cls.sprint = Sprint.objects.create(project=cls.project, name='S1', start_date='2025-01-01', end_date='2025-01-14')
+
+    def setUp(self):
+        get_broker().published.clear()
+
+    def events(self, channel):
+        return [message for name, message in get_broker().published if name == channel]
+
+    def test_task_lifecycle_is_published_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(sprint=self.sprint, title='Live', due_date='2025-01-05')
+        with self.captureOnCommitCallbacks(execute=True):
+            task.status = Task.COMPLETED
+            task.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('delete_task', args=[task.pk]))
+
+        sprint_events = self.events(f'sprint:{self.sprint.pk}')
+        self.assertEqual(sprint_events, self.events(f'project:{self.project.pk}'))
+        self.assertEqual([e['type'] for e in sprint_events], ['task.created', 'task.status_changed', 'task.deleted'])
+        changed = sprint_events[1]
+        self.assertEqual((changed['previous_status'], changed['task']['status']), (Task.TO_DO, Task.COMPLETED))
+        self.assertEqual((changed['sprint']['completed_count'], changed['sprint']['task_count']), (1, 1))
+
+    def test_bulk_add_publishes_one_event(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('bulk_add_tasks'), json.dumps({
+                'sprint_id': self.sprint.pk, 'tasks': [{'title': f'Bulk {n}'} for n in range(3)],
+            }), content_type='application/json')
+        [event] = self.events(f'sprint:{self.sprint.pk}')
+        self.assertEqual((event['type'], len(event['tasks'])), ('tasks.created', 3))
+
+
+class BoardSocketTests(TransactionTestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user('owner')
+        account = Account.objects.create(name='Socket Account', description='', owner=self.owner)
+        project = Project.objects.create(name='Socket', description='', account=account, owner=self.owner)
+        self.sprint = Sprint.objects.create(project=project, name='S1', start_date='2025-01-01', end_date='2025-01-14')
+        self.client.force_login(self.owner)
+        self.session_cookie = f'sessionid={self.client.cookies["sessionid"].value}'.encode()
+
+    def connect(self, headers):
+        return ApplicationCommunicator(websocket_application, {
+            'type': 'websocket', 'path': f'/ws/sprints/{self.sprint.pk}/',
+            'headers': [(b'host', b'testserver'), *headers],
+        })
+
+    async def test_member_receives_task_events(self):
+        socket = self.connect([(b'cookie', self.session_cookie)])
+        await socket.send_input({'type': 'websocket.connect'})
+        self.assertEqual((await socket.receive_output(5))['type'], 'websocket.accept')
+
+        await sync_to_async(Task.objects.create)(sprint=self.sprint, title='Pushed', due_date='2025-01-05')
+        message = json.loads((await socket.receive_output(5))['text'])
+        self.assertEqual((message['type'], message['task']['title']), ('task.created', 'Pushed'))
+
+        await socket.send_input({'type': 'websocket.disconnect', 'code': 1000})
+        await socket.wait(5)
+
+    async def test_anonymous_and_cross_site_sockets_are_refused(self):
+        for headers in ([], [(b'cookie', self.session_cookie), (b'origin', b'https://evil.example')]):
+            socket = self.connect(headers)
+            await socket.send_input({'type': 'websocket.connect'})
+            self.assertEqual(await socket.receive_output(5), {'type': 'websocket.close', 'code': 4403})
+
+
+# URLconf for AsyncViewTests: the tracker URLs as served under ASGI.
+urlpatterns = [path('tracker/', include('tracker.async_urls'))]
+
+
+@override_settings(ROOT_URLCONF='tracker.tests')
+class AsyncViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner')
+        account = Account.objects.create(name='Async Account', description='', owner=cls.owner)
+        cls.project = Project.objects.create(name='Async', description='', account=account, owner=cls.owner)
+        cls.sprint = Sprint.objects.create(project=cls.project, name='S1', start_date='2025-01-01', end_date='2025-01-14')
+
+    def test_asgi_urls_use_async_views(self):
+        self.assertIs(resolve(reverse('save_task')).func, async_views.save_task)
+        self.assertEqual(resolve(reverse('delete_task', args=[1])).func.__module__, 'tracker.views')
+
+    async def test_sprint_endpoints(self):
+        url = reverse('save_sprint', args=[self.project.pk])
+        body = json.dumps({'sprint_name': 'S2', 'start_date': '2025-01-15', 'end_date': '2025-01-28'})
+        response = await self.async_client.post(url, body, content_type='application/json')
+        self.assertEqual(response.json(), {'success': True})
+        response = await self.async_client.post(url, body, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        response = await self.async_client.get(reverse('check_sprint_exists', args=[self.project.pk]), {'sprint_name': 'S2'})
+        self.assertEqual(response.json(), {'exists': True})
+
+    async def test_task_endpoints(self):
+        response = await self.async_client.post(reverse('add_task'), json.dumps({
+            'sprint_id': self.sprint.pk, 'title': 'Async task', 'due_date': '2025-01-05',
+            'status': 'to-do', 'assigned_to': [self.owner.pk],
+        }), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        task_id = response.json()['id']
+        response = await self.async_client.put(
+            reverse('update_task', args=[task_id]), json.dumps({'title': 'Renamed'}), content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        response = await self.async_client.post(reverse('save_task'), json.dumps({
+            'sprint_id': self.sprint.pk, 'title': 'Saved', 'due_date': '2025-01-06',
+            'status': Task.TO_DO, 'participants': [self.owner.pk],
+        }), content_type='application/json')
+        self.assertTrue(response.json()['success'])
+
+        task = await Task.objects.aget(pk=task_id)
+        self.assertEqual(task.title, 'Renamed')
+        self.assertEqual([u.pk async for u in task.assigned_to.all()], [self.owner.pk])
+        sprint = await Sprint.objects.aget(pk=self.sprint.pk)
+        self.assertEqual(sprint.task_count, 2)
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_superuser('owner', password='secret')
+        cls.dev = User.objects.create_user('dev')
+        account = Account.objects.create(name='ETag Account', description='', owner=cls.owner)
+        cls.project = Project.objects.create(name='ETags', description='', account=account, owner=cls.owner)
+        cls.sprint = Sprint.objects.create(project=cls.project, name='S1', start_date='2025-01-01', end_date='2025-01-14')
+        cls.other = Sprint.objects.create(project=cls.project, name='S2', start_date='2025-01-15', end_date='2025-01-28')
+        cls.task = Task.objects.create(sprint=cls.sprint, title='Stamped', due_date='2025-01-05')
+
+    def revalidate(self, url):
+        self.client.get(url)  # HTML pages set the CSRF cookie on first load
+        etag = self.client.get(url)['ETag']
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code
+
+    def test_task_list_is_revalidated_until_its_sprint_changes(self):
+        url = reverse('sprint_task_list', args=[self.sprint.pk])
+        self.assertEqual(self.revalidate(url), 304)
+        etag = self.client.get(url)['ETag']
+
+        Task.objects.create(sprint=self.other, title='Elsewhere', due_date='2025-01-20')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.task.assigned_to.add(self.dev)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_moving_a_task_changes_both_sprints(self):
+        urls = [reverse('sprint_task_list', args=[sprint.pk]) for sprint in (self.sprint, self.other)]
+        etags = [self.client.get(url)['ETag'] for url in urls]
+        self.task.sprint = self.other
+        self.task.save()
+        for url, etag in zip(urls, etags):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_plan_sprint_page(self):
+        self.client.force_login(self.owner)
+        url = reverse('admin:plan_sprint', args=[self.project.pk])
+        self.assertEqual(self.revalidate(url), 304)
+        etag = self.client.get(url)['ETag']
+        self.project.participants.add(self.dev)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class PlanSprintPageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', password='secret')
+        account = Account.objects.create(name='Plan Account', description='', owner=cls.admin)
+        cls.project = Project.objects.create(name='Plan', description='', account=account, owner=cls.admin)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def add_sprints(self, count):
+        start = self.project.sprints.count()
+        for i in range(start, start + count):
+            sprint = Sprint.objects.create(project=self.project, name=f'S{i}', start_date='2025-01-01', end_date='2025-01-14')
+            Task.objects.create(sprint=sprint, title='T', due_date='2025-01-05')
+
+    def render(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('admin:plan_sprint', args=[self.project.pk]))
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_sprints(self):
+        self.add_sprints(3)
+        _, small = self.render()
+        self.add_sprints(30)
+        _, large = self.render()
+        self.assertEqual(small, large)
+
+    def test_cached_card_follows_task_changes(self):
+        self.add_sprints(1)
+        response, _ = self.render()
+        self.assertContains(response, '0 of 1 tasks completed')
+        task = Task.objects.get(sprint__project=self.project)
+        task.status = Task.COMPLETED
+        task.save()
+        response, _ = self.render()
+        self.assertContains(response, '1 of 1 tasks completed')
+
+
+@override_settings(TRACKER_INSTRUMENTATION=True, INTERNAL_IPS=[])
+class InstrumentationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', password='secret')
+        account = Account.objects.create(name='Metrics Account', description='', owner=cls.admin)
+        cls.project = Project.objects.create(name='Metrics', description='', account=account, owner=cls.admin)
+        sprint = Sprint.objects.create(project=cls.project, name='S1', start_date='2025-01-01', end_date='2025-01-14')
+        for i in range(3):
+            Task.objects.create(sprint=sprint, title=f'T{i}', due_date='2025-01-05')
+
+    def setUp(self):
+        instrumentation.registry.clear()
+
+    def test_streamed_view_is_measured_once_sent(self):
+        response = self.client.get(reverse('project_task_list', args=[self.project.pk]))
+        self.assertIn('db;dur=', response['Server-Timing'])
+        body = b''.join(response.streaming_content)
+        stats = instrumentation.registry.snapshot()['project_task_list']
+        self.assertEqual(stats.requests, 1)
+        self.assertEqual(stats.response_bytes, len(body))
+        # Existence check, the page itself and the assignee lookup.
+        self.assertGreaterEqual(stats.queries, 3)
+        self.assertEqual(stats.duplicates, 0)
+
+    def test_duplicate_queries_are_counted(self):
+        metrics = instrumentation.RequestMetrics()
+        for pk in (1, 1, 2):
+            metrics.record_query('SELECT 1 WHERE id = %s', (pk,), 0.001)
+        self.assertEqual((metrics.queries, metrics.duplicates, metrics.exact_duplicates), (3, 2, 1))
+
+    @override_settings(TRACKER_INSTRUMENTATION_DUPLICATE_WARNING=2)
+    def test_n_plus_one_over_rows_is_flagged(self):
+        metrics = instrumentation.RequestMetrics()
+        instrumentation.install()
+        token = instrumentation._current.set(metrics)
+        try:
+            for task in Task.objects.all():
+                list(task.assigned_to.all())
+        finally:
+            instrumentation._current.reset(token)
+        # One query per task, each with its own id.
+        self.assertEqual((metrics.queries, metrics.duplicates, metrics.exact_duplicates), (4, 2, 0))
+        middleware = instrumentation.InstrumentationMiddleware(lambda request: HttpResponse())
+        with self.assertLogs('tracker.instrumentation', 'WARNING') as logs:
+            middleware.observe('task_list', metrics, 0)
+        self.assertIn('most repeated (3 times)', logs.output[0])
+
+    def test_metrics_endpoint(self):
+        self.client.get(reverse('sprint_task_list', args=[999]))
+        url = reverse('metrics')
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(self.admin)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('tracker_view_duration_seconds_count{view="sprint_task_list"} 1', response.content.decode())
+        with override_settings(TRACKER_INSTRUMENTATION=False):
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+    @override_settings(ROOT_URLCONF='tracker.tests')
+    async def test_async_view_queries_are_counted(self):
+        response = await self.async_client.get(reverse('check_sprint_exists', args=[self.project.pk]), {'sprint_name': 'S1'})
+        self.assertEqual(response.json(), {'exists': True})
+        stats = instrumentation.registry.snapshot()['check_sprint_exists']
+        self.assertGreaterEqual(stats.queries, 1)
+
+
+class SyntheticDatasetTests(TestCase):
+    def test_generates_consistent_rows(self):
+        data = generate_dataset(users=12, accounts=2, projects_per_account=2, participants_per_project=4,
+                                sprints_per_project=3, tasks_per_sprint=5, assignees_per_task=2, seed=7)
+        self.assertEqual((len(data['projects']), len(data['sprints']), data['tasks']), (4, 12, 60))
+        self.assertEqual(Task.assigned_to.through.objects.count(), 120)
+        sprint = Sprint.objects.get(pk=data['sprints'][0])
+        self.assertEqual(sprint.task_count, 5)
+        # Assignees are drawn from the project's participants.
+        participants = set(sprint.project.participants.values_list('pk', flat=True))
+        assignees = set(Task.assigned_to.through.objects.filter(task__sprint=sprint).values_list('user_id', flat=True))
+        self.assertLessEqual(assignees, participants)
+        # The search index is rebuilt for the bulk-created users.
+        self.assertTrue(search_users('synthetic-user', limit=5))
+
+
+class LoadDatasetTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write(self, name, content):
+        with open(f'{self.directory}/{name}', 'w') as f:
+            f.write(content)
+
+    def write_dataset(self, status='To Do'):
+        self.write('users.csv', 'id,username,first_name,last_name\n501,lead,Ada,Lovelace\n502,dev,Alan,Turing\n')
+        self.write('accounts.csv', 'id,name,description,owner_id\n601,Loaded,,\n')
+        self.write('projects.csv', 'id,name,description,account_id,owner_id\n701,Loaded,,601,501\n')
+        self.write('project_participants.csv', 'project_id,user_id\n701,502\n')
+        self.write('sprints.ndjson', json.dumps(
+            {'id': 801, 'project_id': 701, 'name': 'S1', 'start_date': '2025-01-01', 'end_date': '2025-01-14'}) + '\n')
+        self.write('tasks.ndjson', ''.join(json.dumps(
+            {'id': 900 + n, 'sprint_id': 801, 'title': f'T{n}', 'description': '', 'due_date': '2025-01-05',
+             'status': status if n == 2 else Task.COMPLETED}) + '\n' for n in range(3)))
+        self.write('task_assignees.csv', 'task_id,user_id\n900,502\n901,501\n901,502\n')
+
+    def test_loads_files_and_rebuilds_derived_state(self):
+        self.write_dataset()
+        call_command('load_dataset', self.directory, batch_size=2, stdout=io.StringIO())
+        account = Account.objects.get(pk=601)
+        self.assertIsNone(account.owner_id)
+        self.assertFalse(User.objects.get(pk=501).has_usable_password())
+        sprint = Sprint.objects.get(pk=801)
+        self.assertEqual((sprint.task_count, sprint.completed_count), (3, 2))
+        self.assertEqual(Task.objects.get(pk=901).assigned_to.count(), 2)
+        self.assertEqual([user.pk for user in search_users('Turing')], [502])
+        # The deferred indexes are back.
+        with connection.cursor() as cursor:
+            indexes = connection.introspection.get_constraints(cursor, Task._meta.db_table)
+        self.assertIn('task_sprint_status_due_idx', indexes)
+
+    def test_rejects_invalid_values(self):
+        self.write_dataset(status='Someday')
+        with self.assertRaisesMessage(CommandError, "tracker.Task row 3: 'Someday' is not one of"):
+            call_command('load_dataset', self.directory, stdout=io.StringIO())
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner')
+        cls.dev = User.objects.create_user('dev')
+        cls.account = Account.objects.create(name='Export', description='', owner=cls.owner)
+        other = Account.objects.create(name='Other', description='', owner=cls.dev)
+        project = Project.objects.create(name='P', description='', account=cls.account, owner=cls.owner)
+        cls.bare_project = Project.objects.create(name='R', description='', account=cls.account, owner=cls.owner)
+        cls.bare_account = Account.objects.create(name='Bare', description='', owner=cls.owner)
+        Project.objects.create(name='Q', description='', account=other, owner=cls.dev)
+        s1 = Sprint.objects.create(project=project, name='S1', start_date='2025-01-01', end_date='2025-01-14')
+        cls.empty = Sprint.objects.create(project=project, name='S2', start_date='2025-01-15', end_date='2025-01-28')
+        s3 = Sprint.objects.create(project=project, name='S3', start_date='2025-01-29', end_date='2025-02-11')
+        cls.tasks = [
+            Task.objects.create(sprint=sprint, title=f'T{n}', due_date='2025-01-05')
+            for n, sprint in enumerate([s1, s1, s3])
+        ]
+        cls.tasks[0].assigned_to.add(cls.owner, cls.dev)
+
+    def test_rows_follow_the_hierarchy(self):
+        rows = list(export_rows([self.account.pk], chunk_size=2))
+        self.assertEqual(
+            [(row['sprint_name'], row['task_id']) for row in rows],
+            [('S1', self.tasks[0].pk), ('S1', self.tasks[1].pk), ('S2', None), ('S3', self.tasks[2].pk), (None, None)],
+        )
+        self.assertEqual([user['username'] for user in rows[0]['assignees']], ['owner', 'dev'])
+        self.assertEqual((rows[-1]['project_name'], rows[-1]['assignees']), ('R', []))
+
+    def test_empty_accounts_and_projects_are_exported(self):
+        rows = list(export_rows([self.account.pk, self.bare_account.pk]))
+        self.assertEqual(
+            [(row['account_name'], row['project_name'], row['sprint_id']) for row in rows[-2:]],
+            [('Export', 'R', None), ('Bare', None, None)],
+        )
+
+    def test_endpoint_streams_the_users_accounts(self):
+        self.client.force_login(self.owner)
+        response = self.client.get(reverse('export_tracker'), {'format': 'csv'})
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:2], ['account_id', 'account_name'])
+        self.assertEqual(len(lines), 7)
+        self.assertTrue(lines[1].endswith(f'{self.owner.pk}:owner;{self.dev.pk}:dev'))
+
+        response = self.client.get(reverse('export_tracker'), {'format': 'ndjson'})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual({row['account_name'] for row in rows}, {'Export', 'Bare'})
+
+        other = Account.objects.get(name='Other')
+        self.assertEqual(self.client.get(reverse('export_tracker'), {'account': other.pk}).status_code, 404)
+
+    def test_command_writes_a_file(self):
+        path = f'{tempfile.mkdtemp()}/export.ndjson'
+        self.addCleanup(shutil.rmtree, path.rsplit('/', 1)[0])
+        call_command('export_tracker', format='ndjson', output=path, stderr=io.StringIO())
+        with open(path) as f:
+            # Four task or sprint rows, projects R and Q, account Bare.
+            self.assertEqual(len(f.readlines()), 7)
+
+
+class ChangeFeedTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user('staff', is_staff=True)
+        self.dev = User.objects.create_user('dev')
+        account = Account.objects.create(name='Feed', description='')
+        self.project = Project.objects.create(name='P', description='', account=account)
+        self.sprint = Sprint.objects.create(project=self.project, name='S1', start_date='2025-01-01', end_date='2025-01-14')
+
+    def log(self, since=0):
+        return [(change.kind, change.object_id, change.action) for change in Change.objects.filter(pk__gt=since).order_by('pk')]
+
+    def test_saves_and_deletes_are_recorded_in_order(self):
+        start = Change.objects.order_by('pk').last().pk
+        task = Task.objects.create(sprint=self.sprint, title='T', due_date='2025-01-05')
+        task.assigned_to.add(self.dev)
+        task.status = Task.COMPLETED
+        task.save()
+        self.client.post(reverse('delete_task', args=[task.pk]))
+        self.assertEqual(self.log(start), [
+            ('task', task.pk, 'created'), ('task', task.pk, 'updated'),
+            ('task', task.pk, 'updated'), ('task', task.pk, 'deleted'),
+        ])
+        self.assertEqual(Change.objects.order_by('pk').last().data['status'], Task.COMPLETED)
+
+    def test_cascades_are_recorded(self):
+        tasks = [Task.objects.create(sprint=self.sprint, title=f'T{n}', due_date='2025-01-05') for n in range(2)]
+        other = Sprint.objects.create(project=self.project, name='S2', start_date='2025-01-15', end_date='2025-01-28')
+        start = Change.objects.order_by('pk').last().pk
+        self.client.force_login(self.staff)
+        self.client.post(reverse('tracker_sprint_delete', args=[self.sprint.pk]))
+        self.assertEqual(self.log(start), [
+            ('task', tasks[0].pk, 'deleted'), ('task', tasks[1].pk, 'deleted'), ('sprint', self.sprint.pk, 'deleted'),
+        ])
+
+        start = Change.objects.order_by('pk').last().pk
+        self.project.account.delete()
+        self.assertEqual(self.log(start), [('sprint', other.pk, 'deleted'), ('project', self.project.pk, 'deleted')])
+
+    def test_bulk_created_tasks_are_recorded(self):
+        start = Change.objects.order_by('pk').last().pk
+        assignees = []
+        with mock.patch('tracker.services.publish_task_events', side_effect=lambda *args: assignees.extend(
+            Task.assigned_to.through.objects.filter(task__sprint=self.sprint).values_list('user_id', flat=True)
+        )):
+            created = bulk_create_tasks(self.sprint, [{'title': 'A', 'assigned_to': [self.dev.pk]}, {'title': 'B'}])
+        self.assertEqual(self.log(start), [('task', task.pk, 'created') for task in created])
+        # Published once the assignees are stored.
+        self.assertEqual(assignees, [self.dev.pk])
+
+    def test_feed_pages_through_changes(self):
+        for n in range(3):
+            Task.objects.create(sprint=self.sprint, title=f'T{n}', due_date='2025-01-05')
+        self.assertEqual(self.client.get(reverse('change_feed')).status_code, 403)
+        self.client.force_login(self.staff)
+        seen, since, has_more = [], 0, True
+        while has_more:
+            body = self.client.get(reverse('change_feed'), {'since': since, 'limit': 2}).json()
+            seen += [(change['kind'], change['id'], change['action']) for change in body['changes']]
+            since, has_more = body['next_since'], body['has_more']
+        self.assertEqual(seen, self.log())
+        self.assertEqual(self.client.get(reverse('change_feed'), {'since': since}).json()['changes'], [])
+        self.assertEqual(self.client.get(reverse('change_feed'), {'since': 'x'}).status_code, 400)
+
+
+class ChangeFeedOrderTests(TransactionTestCase):
+    def setUp(self):
+        account = Account.objects.create(name='Feed', description='')
+        project = Project.objects.create(name='P', description='', account=account)
+        self.sprint = Sprint.objects.create(project=project, name='S1', start_date='2025-01-01', end_date='2025-01-14')
+
+    def test_reader_waits_at_a_gap_until_it_settles(self):
+        since = Change.objects.order_by('pk').last().pk
+        tasks = [Task.objects.create(sprint=self.sprint, title=f'T{n}', due_date='2025-01-05') for n in range(3)]
+        # As if the middle change belonged to a transaction still open.
+        Change.objects.filter(object_id=tasks[1].pk).delete()
+        seen, has_more = changes.changes_since(since, 100)
+        self.assertEqual([change['id'] for change in seen], [tasks[0].pk])
+        self.assertFalse(has_more)
+
+        # Long enough after, the missing number is taken as rolled back.
+        Change.objects.filter(object_id=tasks[2].pk).update(created_at=timezone.now() - timedelta(minutes=5))
+        seen, _ = changes.changes_since(seen[-1]['seq'], 100)
+        self.assertEqual([change['id'] for change in seen], [tasks[2].pk])
+
+    def test_reader_never_skips_a_change_committed_late(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('Needs a database that separate connections can write concurrently.')
+        recorded, release = threading.Event(), threading.Event()
+
+        def first():
+            try:
+                with transaction.atomic():
+                    Task.objects.create(sprint=self.sprint, title='First', due_date='2025-01-05')
+                    recorded.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        def second():
+            try:
+                recorded.wait(10)
+                Task.objects.create(sprint=self.sprint, title='Second', due_date='2025-01-05')
+            finally:
+                connection.close()
+
+        since = Change.objects.order_by('pk').last().pk
+        threads = [threading.Thread(target=first), threading.Thread(target=second)]
+        for thread in threads:
+            thread.start()
+        recorded.wait(10)
+        # Whether or not the database let the second writer commit, a
+        # reader must not get past the first change while it is still open.
+        threads[1].join(0.5)
+        seen, _ = changes.changes_since(since, 100)
+        release.set()
+        for thread in threads:
+            thread.join(10)
+        rest, _ = changes.changes_since(seen[-1]['seq'] if seen else since, 100)
+        titles = [change['data']['title'] for change in seen + rest]
+        self.assertEqual(seen, [])
+        self.assertEqual(titles, ['First', 'Second'])
+
+
+class SprintAnalyticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dev = User.objects.create_user('dev')
+        cls.lead = User.objects.create_user('lead')
+        account = Account.objects.create(name='Analytics', description='')
+        cls.project = Project.objects.create(name='P', description='', account=account)
+        cls.sprints = [
+            Sprint.objects.create(
+                project=cls.project, name=f'S{n}',
+                start_date=date(2025, 1, 1) + timedelta(days=7 * n), end_date=date(2025, 1, 7) + timedelta(days=7 * n),
+            )
+            for n in range(3)
+        ]
+
+    def snapshot(self, sprint, day, total, completed, per_user=()):
+        snapshot = SprintSnapshot.objects.create(sprint=sprint, date=day, task_count=total, completed_count=completed)
+        for user, done in per_user:
+            AssigneeSnapshot.objects.create(snapshot=snapshot, user=user, task_count=total, completed_count=done)
+
+    def test_take_snapshots_counts_running_sprints(self):
+        sprint = self.sprints[0]
+        tasks = [Task.objects.create(sprint=sprint, title=f'T{n}', due_date='2025-01-05') for n in range(3)]
+        tasks[0].assigned_to.add(self.dev, self.lead)
+        tasks[1].assigned_to.add(self.dev)
+        tasks[1].status = Task.COMPLETED
+        tasks[1].save()
+
+        self.assertEqual(take_snapshots(date(2025, 1, 3)), 1)
+        tasks[2].delete()
+        call_command('snapshot_sprints', date='2025-01-03', stdout=io.StringIO())
+        snapshot = SprintSnapshot.objects.get(sprint=sprint)
+        self.assertEqual((snapshot.task_count, snapshot.completed_count, snapshot.to_do_count), (2, 1, 1))
+        self.assertEqual(
+            set(AssigneeSnapshot.objects.values_list('user__username', 'task_count', 'completed_count')),
+            {('dev', 2, 1), ('lead', 1, 0)},
+        )
+
+    def test_burndown_fills_missed_days(self):
+        sprint = self.sprints[0]
+        self.snapshot(sprint, date(2025, 1, 1), 6, 0)
+        self.snapshot(sprint, date(2025, 1, 3), 7, 3)
+        report = burndown(sprint)
+        self.assertEqual(len(report['dates']), 7)
+        self.assertEqual(report['remaining'], [6, 6, 4, None, None, None, None])
+        self.assertEqual(report['ideal'], [6, 5, 4, 3, 2, 1, 0])
+
+        response = self.client.get(reverse('sprint_burndown', args=[self.sprints[1].pk]))
+        self.assertEqual(response.json()['scope'], [None] * 7)
+
+    def test_velocity_uses_each_sprints_final_snapshot(self):
+        for sprint, done in zip(self.sprints, (4, 2, 6)):
+            self.snapshot(sprint, sprint.start_date, 8, 0, [(self.dev, 0)])
+            self.snapshot(sprint, sprint.end_date, 8, done, [(self.dev, done - 1)] + ([(self.lead, 1)] if done != 2 else []))
+        report = velocity(self.project.pk, window=2, today=date(2025, 2, 1))
+        self.assertEqual([sprint['name'] for sprint in report['sprints']], ['S0', 'S1', 'S2'])
+        self.assertEqual(report['completed'], [4, 2, 6])
+        self.assertEqual(report['rolling'], [4, 3, 4])
+        self.assertEqual(
+            [(row['username'], row['completed']) for row in report['assignees']],
+            [('dev', [3, 1, 5]), ('lead', [1, 0, 1])],
+        )
+
+        # The running sprint is not counted yet.
+        response = self.client.get(reverse('project_velocity', args=[self.project.pk]), {'window': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(velocity(self.project.pk, today=date(2025, 1, 20))['completed'], [4, 2])
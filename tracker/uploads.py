@@ -0,0 +1,196 @@
+import hashlib
+import os
+import time
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+from .models import UploadSession
+
+COPY_BUFFER_SIZE = 1024 * 1024
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+DEFAULT_MAX_UPLOAD_SIZE = 1024 * 1024 * 1024
+DEFAULT_UPLOAD_MAX_AGE = 24 * 3600
+DEFAULT_CLAIM_TIMEOUT = 300
+
+
+class UploadConflict(Exception):
+    """A chunk did not start at the number of bytes already received."""
+
+    def __init__(self, offset):
+        super().__init__(f"Expected a chunk starting at byte {offset}.")
+        self.offset = offset
+
+
+def chunk_size():
+    return getattr(settings, 'TRACKER_UPLOAD_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+
+
+def upload_dir():
+    return Path(getattr(settings, 'TRACKER_UPLOAD_TEMP_DIR', Path(settings.MEDIA_ROOT) / 'uploads'))
+
+
+def partial_path(session):
+    return upload_dir() / f'{session.pk}.part'
+
+
+def start_upload(task, filename, size, sha256):
+    """Open an upload session for a file of ``size`` bytes with the given SHA-256."""
+    filename = get_valid_filename(os.path.basename(filename or ''))
+    if not filename:
+        raise ValidationError("A file name is required.")
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise ValidationError("The file size must be an integer.")
+    if not 0 < size <= getattr(settings, 'TRACKER_MAX_UPLOAD_SIZE', DEFAULT_MAX_UPLOAD_SIZE):
+        raise ValidationError("The file size is out of range.")
+    sha256 = (sha256 or '').lower()
+    if len(sha256) != 64 or any(c not in '0123456789abcdef' for c in sha256):
+        raise ValidationError("A hex SHA-256 digest of the file is required.")
+
+    session = UploadSession.objects.create(task=task, filename=filename, size=size, sha256=sha256)
+    upload_dir().mkdir(parents=True, exist_ok=True)
+    partial_path(session).touch()
+    return session
+
+
+def _conflict(session):
+    received = UploadSession.objects.filter(pk=session.pk).values_list('received', flat=True).first()
+    if received is None:
+        raise ValidationError("This upload has expired; start it again.")
+    session.received = received
+    return UploadConflict(received)
+
+
+def write_chunk(session, offset, stream, length):
+    """
+    Copy ``length`` bytes from ``stream`` into the partial file at ``offset``
+    in fixed-size buffers, so memory use does not grow with the chunk.
+    Returns the new number of bytes received.
+
+    The request first claims the offset with a single UPDATE, so a request
+    that loses the race never touches the file, and writes outside any
+    transaction: the database stays free for other writers during the copy.
+    A failed write releases the claim; one left by a crashed process lapses
+    after TRACKER_UPLOAD_CLAIM_TIMEOUT seconds.
+    """
+    if session.completed:
+        raise ValidationError("This upload is already complete.")
+    if offset != session.received:
+        raise UploadConflict(session.received)
+    if length <= 0 or length > chunk_size() or offset + length > session.size:
+        raise ValidationError("Invalid chunk length.")
+
+    token = uuid.uuid4()
+    now = timezone.now()
+    lapsed = now - timedelta(seconds=getattr(settings, 'TRACKER_UPLOAD_CLAIM_TIMEOUT', DEFAULT_CLAIM_TIMEOUT))
+    claimed = UploadSession.objects.filter(
+        Q(claim__isnull=True) | Q(claimed_at__lt=lapsed), pk=session.pk, received=offset, completed=False,
+    ).update(claim=token, claimed_at=now)
+    if not claimed:
+        raise _conflict(session)
+
+    written = 0
+    try:
+        with open(partial_path(session), 'r+b') as partial:
+            partial.seek(offset)
+            while written < length:
+                data = stream.read(min(COPY_BUFFER_SIZE, length - written))
+                if not data:
+                    break
+                partial.write(data)
+                written += len(data)
+        if written != length:
+            raise ValidationError("The chunk ended early; resume from the last offset.")
+    except BaseException:
+        UploadSession.objects.filter(pk=session.pk, claim=token).update(claim=None, claimed_at=None)
+        raise
+
+    # Fails only if the claim lapsed and another request took the offset over;
+    # the SHA-256 check in finish_upload() catches any bytes mixed up that way.
+    moved = UploadSession.objects.filter(pk=session.pk, claim=token).update(
+        received=offset + written, claim=None, claimed_at=None, updated_at=timezone.now(),
+    )
+    if not moved:
+        raise _conflict(session)
+    session.received = offset + written
+    return session.received
+
+
+class ReceivedFile(File):
+    """A fully received partial file; FileSystemStorage moves files that have a temporary_file_path()."""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(COPY_BUFFER_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def finish_upload(session):
+    """Verify the hash of a fully received upload and attach it to the task."""
+    path = partial_path(session)
+    if session.received != session.size:
+        raise ValidationError("The upload is not complete.")
+    if file_sha256(path) != session.sha256:
+        path.unlink(missing_ok=True)
+        session.delete()
+        raise ValidationError("The file does not match its SHA-256 digest; start the upload again.")
+
+    task = session.task
+    with open(path, 'rb') as f:
+        # The storage moves the partial file into place instead of copying
+        # it, and uses the digest just verified rather than hashing again.
+        content = ReceivedFile(f)
+        content.sha256 = session.sha256
+        task.screenshots.save(session.filename, content, save=False)
+    task.save(update_fields=['screenshots'])
+    path.unlink(missing_ok=True)
+    session.completed = True
+    session.save(update_fields=['completed', 'updated_at'])
+    return task
+
+
+def expire_uploads(max_age=DEFAULT_UPLOAD_MAX_AGE, dry_run=False):
+    """
+    Delete upload sessions that received nothing for ``max_age`` seconds,
+    finished or not, with their partial files, and any file in the upload
+    directory older than that which no session owns (e.g. left behind when
+    the task was deleted). Returns the paths that were (or, with
+    ``dry_run``, would be) deleted.
+    """
+    stale = UploadSession.objects.filter(updated_at__lt=timezone.now() - timedelta(seconds=max_age))
+    expired = list(stale.values_list('pk', flat=True))
+    if not dry_run:
+        # Re-check the age in the DELETE: a chunk may have arrived since.
+        stale.filter(pk__in=expired).delete()
+        expired = set(expired) - set(UploadSession.objects.filter(pk__in=expired).values_list('pk', flat=True))
+
+    directory = upload_dir()
+    if not directory.is_dir():
+        return []
+    expired_names = {str(pk) for pk in expired}
+    live = {str(pk) for pk in UploadSession.objects.filter(~Q(pk__in=expired)).values_list('pk', flat=True)}
+    cutoff = time.time() - max_age
+    removed = []
+    for path in directory.iterdir():
+        owner = path.name.split('.', 1)[0]
+        if owner in live or (owner not in expired_names and path.stat().st_mtime > cutoff):
+            continue
+        if not dry_run:
+            path.unlink(missing_ok=True)
+        removed.append(str(path))
+    return removed
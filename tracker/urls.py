@@ -11,15 +11,33 @@ urlpatterns = [
     path('admin/tracker/sprint/delete/<int:pk>/', views.delete_sprint, name='tracker_sprint_delete'),
     path('project/<int:project_id>/sprint/save/', views.save_sprint, name='save_sprint'),
     path('project/<int:project_id>/sprint/check_exists/', views.check_sprint_exists, name='check_sprint_exists'),
+    path('project/<int:project_id>/sprint/import/', views.import_sprint, name='import_sprint'),
 
     # Task-related URLs
     path('task/<int:task_id>/delete/', views.delete_task, name='delete_task'),
     path('task/<int:task_id>/update/', views.update_task, name='update_task'),
     path('task/add/', views.add_task, name='add_task'),
+    path('task/bulk_add/', views.bulk_add_tasks, name='bulk_add_tasks'),
 
     path('api/search-users/', search_users, name='search_users'),
     path('get_user_suggestions/<int:project_id>/', views.get_user_suggestions, name='get_user_suggestions'),
 
     path('save-task/', views.save_task, name='save_task'),
+
+    # Resumable attachment uploads
+    path('uploads/', views.start_upload, name='start_upload'),
+    path('uploads/<uuid:upload_id>/', views.upload_chunk, name='upload_chunk'),
+
+    # Read APIs
+    path('api/projects/<int:project_id>/tasks/', views.task_list, name='project_task_list'),
+    path('api/sprints/<int:sprint_id>/tasks/', views.task_list, name='sprint_task_list'),
+    path('api/tasks/<int:task_id>/comments/', views.task_comments, name='task_comments'),
+    path('api/sprints/<int:sprint_id>/burndown/', views.sprint_burndown, name='sprint_burndown'),
+    path('api/projects/<int:project_id>/velocity/', views.project_velocity, name='project_velocity'),
+    path('api/export/', views.export_tracker, name='export_tracker'),
+    path('api/changes/', views.change_feed, name='change_feed'),
+
+    # Request metrics (TRACKER_INSTRUMENTATION)
+    path('metrics/', views.metrics, name='metrics'),
     
 ]
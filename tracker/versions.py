@@ -0,0 +1,137 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.db.models import Count, F, Max, Sum
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from .directory import directory_version
+from .models import Account, Comment, Project, Sprint
+
+
+def bump_versions(sprint_ids=(), project_ids=(), account_ids=()):
+    """
+    Mark sprints, projects and accounts as changed, so the next conditional
+    GET of their pages misses. A project's stamp already covers its sprints'
+    (see project_stamp()), so sprint changes need not bump the project too.
+    """
+    changed = {'version': F('version') + 1, 'updated_at': timezone.now()}
+    for model, ids in ((Sprint, sprint_ids), (Project, project_ids), (Account, account_ids)):
+        ids = {pk for pk in ids if pk is not None}
+        if ids:
+            model.objects.filter(pk__in=ids).update(**changed)
+
+
+def project_stamp(project_id):
+    """(version, updated_at) of a project together with all its sprints, or None."""
+    stamp = Project.objects.filter(pk=project_id).aggregate(
+        found=Count('pk', distinct=True),
+        sprint_count=Count('sprints', distinct=True),
+        # A sum keeps growing with every sprint bump, unlike a maximum.
+        sprint_versions=Sum('sprints__version'),
+        version=Max('version'),
+        updated_at=Max('updated_at'),
+        sprints_updated_at=Max('sprints__updated_at'),
+    )
+    if not stamp['found']:
+        return None
+    version = (stamp['version'], stamp['sprint_count'], stamp['sprint_versions'] or 0)
+    return version, max(filter(None, (stamp['updated_at'], stamp['sprints_updated_at'])))
+
+
+def make_etag(*parts):
+    # Stamps go in whole: a save through a stale instance can write an older
+    # version back, but the bump that follows still moves updated_at on.
+    return hashlib.sha1(':'.join(map(str, parts)).encode()).hexdigest()
+
+
+def _memoized(request, key, load):
+    # condition() asks for the ETag and Last-Modified separately; look the
+    # stamp up once per request.
+    stamps = request.__dict__.setdefault('_version_stamps', {})
+    if key not in stamps:
+        stamps[key] = load()
+    return stamps[key]
+
+
+def _stamp(request, model, pk):
+    if model is Project:
+        return _memoized(request, (model, pk), lambda: project_stamp(pk))
+    return _memoized(request, (model, pk), lambda: (
+        model.objects.filter(pk=pk).values_list('version', 'updated_at').first()
+    ))
+
+
+def _viewer(request):
+    # HTML pages embed the user's name and CSRF token, so each viewer gets
+    # their own ETag.
+    return getattr(request.user, 'pk', None), request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')
+
+
+# ETag / Last-Modified functions for django.views.decorators.http.condition ---
+
+def plan_sprint_etag(request, project_id):
+    stamp = _stamp(request, Project, project_id)
+    # A page carrying flash messages is never answered with 304, which would
+    # leave the messages unshown.
+    if stamp is None or len(get_messages(request)):
+        return None
+    # The project stamp also moves with the participant directory.
+    return make_etag('plan_sprint', project_id, *stamp, *_viewer(request))
+
+
+def plan_sprint_last_modified(request, project_id):
+    stamp = _stamp(request, Project, project_id)
+    return stamp and stamp[1]
+
+
+def _task_list_model(project_id, sprint_id):
+    return (Sprint, sprint_id) if sprint_id is not None else (Project, project_id)
+
+
+def task_list_etag(request, project_id=None, sprint_id=None):
+    model, pk = _task_list_model(project_id, sprint_id)
+    stamp = _stamp(request, model, pk)
+    return stamp and make_etag('tasks', model.__name__, pk, *stamp, request.GET.urlencode())
+
+
+def task_list_last_modified(request, project_id=None, sprint_id=None):
+    stamp = _stamp(request, *_task_list_model(project_id, sprint_id))
+    return stamp and stamp[1]
+
+
+def account_list_etag(request):
+    if not request.user.is_authenticated:
+        return None
+    stamp = _memoized(request, 'accounts', lambda: Account.objects.filter(owner=request.user).aggregate(
+        count=Count('pk'), last_id=Max('pk'), version=Max('version'), updated_at=Max('updated_at'),
+    ))
+    return make_etag('accounts', stamp['count'], stamp['last_id'], stamp['version'], stamp['updated_at'],
+                     *_viewer(request))
+
+
+def request_directory_version(request, project_id):
+    """directory_version() looked up once per request, for the ETag and the view."""
+    return _memoized(request, ('directory', project_id), lambda: directory_version(project_id))
+
+
+def user_suggestions_etag(request, project_id):
+    version = request_directory_version(request, project_id)
+    return version and make_etag('participants', project_id, version, request.GET.urlencode())
+
+
+def task_comments_etag(request, task_id):
+    if request.method != 'GET':
+        return None
+    stamp = Comment.objects.filter(task_id=task_id).aggregate(
+        count=Count('pk'), last_id=Max('pk'), updated_at=Max('updated_at'),
+    )
+    return make_etag('comments', task_id, stamp['count'], stamp['last_id'], stamp['updated_at'], request.GET.urlencode())
+
+
+plan_sprint_condition = condition(etag_func=plan_sprint_etag, last_modified_func=plan_sprint_last_modified)
+task_list_condition = condition(etag_func=task_list_etag, last_modified_func=task_list_last_modified)
+account_list_condition = condition(etag_func=account_list_etag)
+user_suggestions_condition = condition(etag_func=user_suggestions_etag)
+task_comments_condition = condition(etag_func=task_comments_etag)
@@ -1,15 +1,33 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from .models import Account, Project, Task, Sprint
+from .models import Account, Comment, Project, Task, Sprint, UploadSession
 from .forms import ProjectForm
 from django.contrib import messages
 from django.views.decorators.csrf import csrf_protect
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.conf import settings
+from django.db import transaction
+import datetime
 import json
-from django.http import JsonResponse
+import re
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from .routers import read_database, read_only_view, replica_reads
+from .pagination import InvalidCursor, encode_cursor, keyset_page, page_size, stream_json_rows
+from . import analytics, blobs, changes, export, instrumentation, search, uploads
+from .media import thumbnail_urls
+from .directory import filter_directory, get_participant_directory
+from .services import bulk_create_tasks, clean_date, create_sprint_with_tasks, resolve_users
+from .versions import (
+    account_list_condition, request_directory_version, task_comments_condition, task_list_condition,
+    user_suggestions_condition,
+)
 
 # View to list the accounts owned by the logged-in user
+@read_only_view
+@account_list_condition
 def account_list(request):
     accounts = Account.objects.filter(owner=request.user)  # Get accounts where the logged-in user is the owner
     return render(request, 'account_list.html', {'accounts': accounts})
@@ -29,15 +47,14 @@ def create_project(request):
 
     return render(request, 'create_project.html', {'form': form})
 
+@read_only_view
 def search_users(request):
     query = request.GET.get('q', '')
-    if query:
-        users = User.objects.filter(full_name__icontains=query)
-        user_data = [{"id": user.id, "full_name": user.get_full_name(), "username": user.username} for user in users]
-        return JsonResponse({"users": user_data})
-    return JsonResponse({"users": []})    
+    users = search.search_users(query, page_size(request.GET.get('limit'), search.DEFAULT_LIMIT))
+    return JsonResponse({"users": [search.user_data(user) for user in users]})
 
 
+@read_only_view
 def check_sprint_exists(request, project_id):
     sprint_name = request.GET.get('sprint_name')
 
@@ -108,25 +125,22 @@ def add_task(request):
             except Sprint.DoesNotExist:
                 return JsonResponse({"error": "Sprint not found."}, status=404)
 
-            # Validate assigned users exist (optional)
-            assigned_to = []
-            if assigned_to_ids:
-                for user_id in assigned_to_ids:
-                    try:
-                        user = User.objects.get(id=user_id)
-                        assigned_to.append(user)
-                    except User.DoesNotExist:
-                        return JsonResponse({"error": f"Assigned user with ID {user_id} not found."}, status=404)
-
-            # Validate status is one of the allowed values
-            if status not in ['to-do', 'in-progress', 'blocked', 'completed']:
+            # Validate assigned users exist (optional), fetching them in one query
+            try:
+                assigned_to = list(resolve_users(assigned_to_ids or []).values())
+            except ValidationError as e:
+                return JsonResponse({"error": e.messages[0]}, status=404)
+
+            # Store the canonical status, as bulk_create_tasks does; the UI slugs are accepted.
+            status = Task.normalize_status(status) if isinstance(status, str) else None
+            if status is None:
                 return JsonResponse({"error": "Invalid status."}, status=400)
 
             # Create the task
             task = Task.objects.create(
                 title=title,
                 sprint=sprint,
-                due_date=due_date,
+                due_date=clean_date(due_date, "Due date"),
                 status=status
             )
 
@@ -136,6 +150,8 @@ def add_task(request):
 
             return JsonResponse({"id": task.id, "message": "Task added successfully."}, status=201)
 
+        except ValidationError as e:
+            return JsonResponse({"error": e.messages[0]}, status=400)
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=500)
 
@@ -178,18 +194,26 @@ def save_sprint(request, project_id):
 
 
 
+@read_only_view
+@user_suggestions_condition
 def get_user_suggestions(request, project_id):
-    query = request.GET.get('query', '').lower()
-    try:
-        project = Project.objects.get(id=project_id)
-        users = project.participants.exclude(id=project.owner.id)
-    except Project.DoesNotExist:
+    """
+    Participants of a project (excluding the owner) matching ``query``, served
+    from the cached participant directory. ``?format=compact`` returns the
+    whole directory as [id, full_name, username, role] rows with its version,
+    for clients that filter locally.
+    """
+    version = request_directory_version(request, project_id)
+    directory = get_participant_directory(project_id, version)
+    if directory is None:
         return JsonResponse({'error': 'Project not found'}, status=404)
 
-    if query:
-        users = users.filter(full_name__icontains=query)
-    user_data = users.values('id', 'full_name', 'username')
-    return JsonResponse(list(user_data), safe=False)     
+    if request.GET.get('format') == 'compact':
+        return JsonResponse({'version': version, 'participants': directory})
+
+    query = request.GET.get('query', '')
+    users = [entry for entry in filter_directory(directory, query) if entry[3] != 'Owner']
+    return JsonResponse([{"id": pk, "full_name": full_name, "username": username} for pk, full_name, username, _ in users], safe=False)
 
 
 @csrf_exempt  # Temporarily disable CSRF check for testing
@@ -204,6 +228,11 @@ def save_task(request):
             sprint_id = data.get("sprint_id")
             participants = data.get("participants")
 
+            # Store the canonical status, as add_task does.
+            status = Task.normalize_status(status) if isinstance(status, str) else None
+            if status is None:
+                return JsonResponse({"success": False, "error": "Invalid status."}, status=400)
+
             # Validate sprint
             sprint = Sprint.objects.get(id=sprint_id)
 
@@ -224,4 +253,345 @@ def save_task(request):
         except Exception as e:
             return JsonResponse({"success": False, "error": str(e)}, status=400)
 
-    return JsonResponse({"success": False, "error": "Invalid request method"}, status=405)
\ No newline at end of file
+    return JsonResponse({"success": False, "error": "Invalid request method"}, status=405)
+
+
+@require_POST
+def bulk_add_tasks(request):
+    """
+    Create a batch of tasks in an existing sprint in a single transaction.
+    Body: {"sprint_id": 1, "tasks": [{"title": ..., "due_date": ..., "status": ..., "assigned_to": [ids]}, ...]}
+    """
+    try:
+        data = json.loads(request.body)
+        tasks = data.get("tasks")
+        if not isinstance(tasks, list) or not tasks:
+            return JsonResponse({"error": "A non-empty list of tasks is required."}, status=400)
+
+        try:
+            sprint = Sprint.objects.get(id=data.get("sprint_id"))
+        except (Sprint.DoesNotExist, ValueError, TypeError):
+            return JsonResponse({"error": "Sprint not found."}, status=404)
+
+        with transaction.atomic():
+            created = bulk_create_tasks(sprint, tasks)
+
+        return JsonResponse({"ids": [task.id for task in created], "message": f"{len(created)} tasks added successfully."}, status=201)
+
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON format in the request body."}, status=400)
+    except ValidationError as e:
+        return JsonResponse({"error": e.messages[0]}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+@require_POST
+def import_sprint(request, project_id):
+    """
+    Create a sprint together with its tasks in a single transaction.
+    Body: {"sprint_name": ..., "start_date": ..., "end_date": ..., "tasks": [...]}
+    """
+    try:
+        data = json.loads(request.body)
+        project = get_object_or_404(Project, pk=project_id)
+        if not isinstance(data, dict):
+            return JsonResponse({"success": False, "error": "The request body must be a JSON object."}, status=400)
+
+        # create_sprint_with_tasks validates the rest of the payload.
+        sprint, created = create_sprint_with_tasks(
+            project,
+            data.get("sprint_name"),
+            data.get("start_date"),
+            data.get("end_date"),
+            data.get("tasks") or [],
+        )
+        return JsonResponse({"success": True, "sprint_id": sprint.id, "task_ids": [task.id for task in created]}, status=201)
+
+    except json.JSONDecodeError:
+        return JsonResponse({"success": False, "error": "Invalid JSON format in the request body."}, status=400)
+    except ValidationError as e:
+        return JsonResponse({"success": False, "error": e.messages[0]}, status=400)
+
+
+TASK_LIST_FIELDS = ('id', 'sprint_id', 'title', 'status', 'due_date', 'screenshots')
+
+
+@require_GET
+@read_only_view
+@task_list_condition
+def task_list(request, project_id=None, sprint_id=None):
+    """
+    Stream a page of tasks for a project or sprint, ordered by (due_date, id).
+
+    Query parameters: ``status``, ``assignee`` (user id), ``limit`` and
+    ``cursor`` (the ``next_cursor`` of the previous page).
+    """
+    if sprint_id is not None:
+        if not Sprint.objects.filter(pk=sprint_id).exists():
+            return JsonResponse({"error": "Sprint not found."}, status=404)
+        tasks = Task.objects.filter(sprint_id=sprint_id)
+    else:
+        if not Project.objects.filter(pk=project_id).exists():
+            return JsonResponse({"error": "Project not found."}, status=404)
+        tasks = Task.objects.filter(sprint__project_id=project_id)
+
+    status = request.GET.get('status')
+    if status:
+        normalized = Task.normalize_status(status)
+        if normalized is None:
+            return JsonResponse({"error": "Invalid status."}, status=400)
+        aliases = [alias for alias, value in Task.STATUS_ALIASES.items() if value == normalized]
+        tasks = tasks.filter(status__in=[normalized, *aliases])
+
+    assignee = request.GET.get('assignee')
+    if assignee:
+        if not assignee.isdigit():
+            return JsonResponse({"error": "Invalid assignee."}, status=400)
+        tasks = tasks.filter(assigned_to=assignee)
+
+    # The body is streamed after the view returns, so pin the database now.
+    db = read_database()
+    limit = page_size(request.GET.get('limit'))
+    try:
+        rows = keyset_page(tasks.using(db), request.GET.get('cursor'), limit)
+    except InvalidCursor as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    def add_related(chunk):
+        assignees = {}
+        pairs = Task.assigned_to.through.objects.using(db).filter(
+            task_id__in=[row['id'] for row in chunk]
+        ).values_list('task_id', 'user_id')
+        for task_id, user_id in pairs:
+            assignees.setdefault(task_id, []).append(user_id)
+        # List views get the small WebP thumbnail, not the original upload.
+        thumbnails = thumbnail_urls([row['id'] for row in chunk if row['screenshots']], using=db)
+        for row in chunk:
+            row['assigned_to'] = assignees.get(row['id'], [])
+            row['screenshot'] = Task.screenshots.field.storage.url(row['screenshots']) if row['screenshots'] else None
+            row['thumbnail'] = thumbnails.get(row['id'])
+            del row['screenshots']
+
+    return StreamingHttpResponse(
+        stream_json_rows(rows.values(*TASK_LIST_FIELDS).iterator(chunk_size=2000), limit, 'tasks', enrich=add_related),
+        content_type='application/json',
+    )
+
+
+COMMENT_FIELDS = ('id', 'author_id', 'author__first_name', 'author__last_name', 'author__username', 'body', 'created_at', 'updated_at')
+COMMENT_PAGE_SIZE = 50
+MAX_COMMENT_PAGE_SIZE = 200
+
+
+def comment_data(row):
+    first_name, last_name, username = (row.pop(f'author__{field}') for field in ('first_name', 'last_name', 'username'))
+    row['author_name'] = f'{first_name or ""} {last_name or ""}'.strip() or username
+    return row
+
+
+@task_comments_condition
+def task_comments(request, task_id):
+    """
+    GET pages through a task's comments, newest first; pass the previous
+    ``next_cursor`` as ``cursor`` for older ones. With ``after=<comment id>``
+    it instead returns only comments newer than that one, oldest first, so a
+    client can poll for new replies; ``has_more`` says whether to ask again.
+    POST adds a comment: {"body": "..."}.
+    """
+    if request.method == "GET":
+        with replica_reads():
+            if not Task.objects.filter(pk=task_id).exists():
+                return JsonResponse({"error": "Task not found."}, status=404)
+            comments = Comment.objects.filter(task_id=task_id)
+            limit = page_size(request.GET.get('limit'), COMMENT_PAGE_SIZE, MAX_COMMENT_PAGE_SIZE)
+            after = request.GET.get('after')
+            if after is not None:
+                if not after.isdigit():
+                    return JsonResponse({"error": "Invalid comment id."}, status=400)
+                rows = list(comments.filter(pk__gt=after).order_by('created_at', 'pk').values(*COMMENT_FIELDS)[:limit + 1])
+                next_cursor = None
+            else:
+                try:
+                    rows = list(keyset_page(
+                        comments, request.GET.get('cursor'), limit,
+                        field='created_at', descending=True, parse=datetime.datetime.fromisoformat,
+                    ).values(*COMMENT_FIELDS))
+                except InvalidCursor as e:
+                    return JsonResponse({"error": str(e)}, status=400)
+                next_cursor = encode_cursor(rows[limit - 1]['created_at'], rows[limit - 1]['id']) if len(rows) > limit else None
+        return JsonResponse({
+            "comments": [comment_data(row) for row in rows[:limit]],
+            "has_more": len(rows) > limit,
+            "next_cursor": next_cursor,
+        })
+
+    if request.method != "POST":
+        return JsonResponse({"error": "Invalid request method"}, status=405)
+    try:
+        data = json.loads(request.body)
+        body = (data.get("body") or "").strip()
+        if not body:
+            return JsonResponse({"error": "Comment body is required."}, status=400)
+        task = get_object_or_404(Task.objects.only('pk'), pk=task_id)
+        comment = Comment.objects.create(
+            task=task, author=request.user if request.user.is_authenticated else None, body=body,
+        )
+        row = Comment.objects.filter(pk=comment.pk).values(*COMMENT_FIELDS).get()
+        return JsonResponse(comment_data(row), status=201)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON format in the request body."}, status=400)
+
+
+@require_POST
+def start_upload(request):
+    """
+    Open a resumable upload for a task attachment.
+    Body: {"task_id": 1, "filename": "recording.mp4", "size": 123456789, "sha256": "<hex digest>"}
+    If a file with that SHA-256 is already stored, it is attached right away
+    and the response says the upload is complete; nothing needs to be sent.
+    """
+    try:
+        data = json.loads(request.body)
+        try:
+            task = Task.objects.get(pk=data.get("task_id"))
+        except (Task.DoesNotExist, ValueError, TypeError):
+            return JsonResponse({"error": "Task not found."}, status=404)
+        if blobs.attach_existing(task, data.get("sha256")):
+            return JsonResponse({"completed": True, "task_id": task.pk, "file": task.screenshots.url}, status=201)
+        session = uploads.start_upload(task, data.get("filename"), data.get("size"), data.get("sha256"))
+        return JsonResponse({"upload_id": str(session.pk), "offset": 0, "chunk_size": uploads.chunk_size()}, status=201)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON format in the request body."}, status=400)
+    except ValidationError as e:
+        return JsonResponse({"error": e.messages[0]}, status=400)
+
+
+def upload_chunk(request, upload_id):
+    """
+    GET returns how many bytes have been received, so a client can resume.
+    PUT appends one chunk; the raw body is streamed to disk and the
+    ``Content-Range: bytes <start>-<end>/<size>`` header gives its position.
+    The last chunk verifies the SHA-256 and attaches the file to the task.
+    """
+    session = get_object_or_404(UploadSession, pk=upload_id)
+    if request.method == "GET":
+        return JsonResponse({"offset": session.received, "size": session.size, "completed": session.completed})
+    if request.method != "PUT":
+        return JsonResponse({"error": "Invalid request method"}, status=405)
+
+    match = re.fullmatch(r'bytes (\d+)-(\d+)/(\d+)', request.headers.get('Content-Range', ''))
+    if not match:
+        return JsonResponse({"error": "A Content-Range header is required."}, status=400)
+    start, end, total = map(int, match.groups())
+    if total != session.size or end < start:
+        return JsonResponse({"error": "Content-Range does not match this upload."}, status=400)
+
+    try:
+        received = uploads.write_chunk(session, start, request, end - start + 1)
+        if received < session.size:
+            return JsonResponse({"offset": received, "completed": False}, status=202)
+        task = uploads.finish_upload(session)
+        return JsonResponse({"offset": received, "completed": True, "task_id": task.pk, "file": task.screenshots.url}, status=201)
+    except uploads.UploadConflict as e:
+        return JsonResponse({"error": str(e), "offset": e.offset}, status=409)
+    except ValidationError as e:
+        return JsonResponse({"error": e.messages[0], "offset": session.received}, status=400)
+
+
+@require_GET
+@read_only_view
+def sprint_burndown(request, sprint_id):
+    """Daily scope, completed and remaining task counts of a sprint; see analytics.burndown()."""
+    sprint = Sprint.objects.filter(pk=sprint_id).only('start_date', 'end_date').first()
+    if sprint is None:
+        return JsonResponse({"error": "Sprint not found."}, status=404)
+    return JsonResponse(analytics.burndown(sprint))
+
+
+@require_GET
+@read_only_view
+def project_velocity(request, project_id):
+    """
+    Completed tasks per finished sprint and their rolling mean over
+    ``window`` sprints (default 3); see analytics.velocity().
+    """
+    if not Project.objects.filter(pk=project_id).exists():
+        return JsonResponse({"error": "Project not found."}, status=404)
+    window = request.GET.get('window', str(analytics.DEFAULT_WINDOW))
+    if not window.isdigit() or int(window) < 1:
+        return JsonResponse({"error": "Invalid window."}, status=400)
+    return JsonResponse(analytics.velocity(project_id, window=int(window)))
+
+
+CHANGE_PAGE_SIZE = 500
+MAX_CHANGE_PAGE_SIZE = 5000
+
+
+@require_GET
+def change_feed(request):
+    """
+    Task, sprint and project changes after sequence number ``since`` (0 for
+    all of them), oldest first, ``limit`` at a time. Ask again with
+    ``since=<next_since>`` while ``has_more`` is true. For staff users and
+    clients connecting from INTERNAL_IPS. Read from the primary, so a client
+    that just wrote sees its own changes.
+    """
+    if not (request.user.is_staff or request.META.get('REMOTE_ADDR') in settings.INTERNAL_IPS):
+        return JsonResponse({"error": "Permission denied."}, status=403)
+    since = request.GET.get('since', '0')
+    if not since.isdigit():
+        return JsonResponse({"error": "Invalid sequence number."}, status=400)
+    limit = page_size(request.GET.get('limit'), CHANGE_PAGE_SIZE, MAX_CHANGE_PAGE_SIZE)
+    rows, has_more = changes.changes_since(int(since), limit)
+    return JsonResponse({
+        "changes": rows,
+        "next_since": rows[-1]['seq'] if rows else int(since),
+        "has_more": has_more,
+    })
+
+
+@require_GET
+def metrics(request):
+    """
+    Per-view request metrics of this process in the Prometheus text format,
+    for staff users and scrapers connecting from INTERNAL_IPS.
+    """
+    if not instrumentation.enabled():
+        raise Http404("Instrumentation is off.")
+    if not (request.user.is_staff or request.META.get('REMOTE_ADDR') in settings.INTERNAL_IPS):
+        return HttpResponse(status=403)
+    return HttpResponse(instrumentation.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@require_GET
+@read_only_view
+def export_tracker(request):
+    """
+    Stream the account -> project -> sprint -> task hierarchy as CSV or NDJSON
+    (``format``). ``account`` (repeatable) picks the accounts; by default all
+    the user's own, or every account for superusers.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Authentication required."}, status=401)
+    format = request.GET.get('format', 'csv')
+    if format not in export.FORMATS:
+        return JsonResponse({"error": "Invalid format."}, status=400)
+
+    accounts = Account.objects.all() if request.user.is_superuser else Account.objects.filter(owner=request.user)
+    requested = request.GET.getlist('account')
+    if requested:
+        if not all(pk.isdigit() for pk in requested):
+            return JsonResponse({"error": "Invalid account."}, status=400)
+        requested = {int(pk) for pk in requested}
+        account_ids = set(accounts.filter(pk__in=requested).values_list('pk', flat=True))
+        if account_ids != requested:
+            return JsonResponse({"error": "Account not found."}, status=404)
+    else:
+        account_ids = None if request.user.is_superuser else list(accounts.values_list('pk', flat=True))
+
+    # The body is streamed after the view returns, so pin the database now.
+    rows = export.export_rows(account_ids, using=read_database())
+    response = StreamingHttpResponse(export.encode(rows, format), content_type=export.FORMATS[format])
+    response['Content-Disposition'] = f'attachment; filename="tracker-export.{format}"'
+    return response